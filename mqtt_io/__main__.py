@@ -72,6 +72,14 @@ def main() -> None:
     Doesn't need to contain a template section.
     """,
     )
+    parser.add_argument(
+        "--config-cache",
+        help="""
+    A directory in which to cache the validated config, to speed up starting up when
+    the config hasn't changed. The cached config includes any credentials from the
+    config, so it's only readable by the user running MQTT IO.
+    """,
+    )
     args = parser.parse_args()
 
     # Load, validate and normalise config, or quit.
@@ -87,7 +95,7 @@ def main() -> None:
                                                     raw_config["mqtt"].get("password"))
             raw_config["mqtt"]["protocol"] = getenv("MQTT_IO_PROTOCOL",
                                                     raw_config["mqtt"].get("protocol"))
-        config = validate_and_normalise_main_config(raw_config)
+        config = validate_and_normalise_main_config(raw_config, args.config_cache)
     except ConfigValidationFailed as exc:
         print(str(exc), file=sys.stderr)
         sys.exit(1)
@@ -0,0 +1,114 @@
+"""
+Windowed aggregation of sensor readings, so that a sensor can be read many times over a
+window and only have a summary of the readings published at the end of it.
+
+Everything apart from the percentiles is computed incrementally as the readings come
+in. Percentiles need all of the window's readings, so those are kept in a flat array of
+doubles rather than a list of Python floats.
+"""
+
+import math
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+# Statistics which are calculated incrementally and don't need the readings to be kept
+SIMPLE_STATISTICS = ("count", "min", "max", "mean", "stddev", "last")
+
+
+def percentile_of(statistic: str) -> Optional[float]:
+    """
+    Get the percentile that a statistic such as `p95` refers to, or None if it isn't one.
+    """
+    if not statistic.startswith("p"):
+        return None
+    try:
+        percentile = float(statistic[1:])
+    except ValueError:
+        return None
+    if not 0 <= percentile <= 100:
+        return None
+    return percentile
+
+
+class Aggregator:  # pylint: disable=too-many-instance-attributes
+    """
+    Collects readings over a window and calculates statistics from them.
+    """
+
+    def __init__(self, statistics: Iterable[str]):
+        self.statistics: List[str] = list(statistics)
+        for statistic in self.statistics:
+            if statistic not in SIMPLE_STATISTICS and percentile_of(statistic) is None:
+                raise ValueError("Unknown statistic %r" % statistic)
+        self._keep_values = any(
+            percentile_of(statistic) is not None for statistic in self.statistics
+        )
+        self._values = array("d")
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Start a new window.
+        """
+        self.count = 0
+        self._min = math.inf
+        self._max = -math.inf
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._last = math.nan
+        del self._values[:]
+
+    def add(self, value: float) -> None:
+        """
+        Add a reading to the current window.
+        """
+        self.count += 1
+        self._min = min(self._min, value)
+        self._max = max(self._max, value)
+        self._last = value
+        # Welford's algorithm for a running mean and variance
+        delta = value - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (value - self._mean)
+        if self._keep_values:
+            self._values.append(value)
+
+    def result(self) -> Dict[str, float]:
+        """
+        Calculate the configured statistics for the current window. Returns an empty
+        dict if there haven't been any readings.
+        """
+        if not self.count:
+            return {}
+        simple = {
+            "count": float(self.count),
+            "min": self._min,
+            "max": self._max,
+            "mean": self._mean,
+            "stddev": math.sqrt(self._m2 / self.count),
+            "last": self._last,
+        }
+        sorted_values = sorted(self._values) if self._keep_values else []
+        result: Dict[str, float] = {}
+        for statistic in self.statistics:
+            if statistic in simple:
+                result[statistic] = simple[statistic]
+                continue
+            percentile = percentile_of(statistic)
+            assert percentile is not None
+            result[statistic] = self._percentile(sorted_values, percentile)
+        return result
+
+    @staticmethod
+    def _percentile(sorted_values: List[float], percentile: float) -> float:
+        """
+        Linearly interpolate the given percentile from a sorted list of values.
+        """
+        rank = (len(sorted_values) - 1) * percentile / 100
+        lower = math.floor(rank)
+        upper = math.ceil(rank)
+        if lower == upper:
+            return sorted_values[int(rank)]
+        return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (
+            rank - lower
+        )
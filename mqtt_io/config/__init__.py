@@ -2,14 +2,21 @@
 Handles config validation and normalisation.
 """
 
+import hashlib
+import json
 import logging
+import os
+import re
 from collections import Counter
+from copy import deepcopy
+from functools import lru_cache
 from os.path import dirname, join, realpath
-from typing import TYPE_CHECKING, Any, Dict, List, cast
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, cast
 
 import cerberus  # type: ignore
 import yaml # type: ignore
 
+from .. import VERSION
 from ..exceptions import ConfigValidationFailed
 from ..types import ConfigType
 from .validation.gpio import (
@@ -25,6 +32,12 @@ if TYPE_CHECKING:
 
 _LOG = logging.getLogger(__name__)
 
+# Names of the files in the config cache
+CONFIG_CACHE_RE = re.compile(r"^config-[0-9a-f]{64}\.json(\.tmp)?$")
+
+# Validators for IO configs, by config section and module class
+_IO_VALIDATORS: Dict[Tuple[str, type], "ConfigValidator"] = {}
+
 # TODO: Tasks pending completion -@flyte at 02/03/2021, 10:37:38
 # Add validation to make sure that the names used for inputs/outputs/stream modules
 # are suitable for use in an MQTT topic.
@@ -67,16 +80,23 @@ def get_duplicate_names(io_conf: List[ConfigType]) -> List[str]:
     return [name for name, count in counter.items() if count > 1]
 
 
+@lru_cache(maxsize=None)
+def _load_main_schema() -> ConfigType:
+    schema_path = join(dirname(realpath(__file__)), "config.schema.yml")
+    with open(schema_path, encoding="utf8") as schema_file:
+        # We write this schema file, so we know it'll adhere to ConfigType rules
+        return cast(ConfigType, yaml.safe_load(schema_file))
+
+
 def get_main_schema() -> ConfigType:
     """
     Load the main config schema from the YAML file packaged in the same dir as this file.
+    The file is only parsed once, and a copy is returned each time so that callers can
+    modify it.
     :return: Config schema
     :rtype: dict
     """
-    schema_path = join(dirname(realpath(__file__)), "config.schema.yml")
-    with open(schema_path, encoding="utf8") as schema_file:
-        # We write this schema file, so we know it'll adhere to ConfigType rules
-        return cast(ConfigType, yaml.safe_load(schema_file))
+    return deepcopy(_load_main_schema())
 
 
 def get_main_schema_section(section: str) -> ConfigType:
@@ -85,7 +105,7 @@ def get_main_schema_section(section: str) -> ConfigType:
     """
     # We write this schema file, so we know it'll adhere to ConfigType rules.
     # Specifically, all top-level sections of the schema are also dicts.
-    return cast(ConfigType, get_main_schema()[section]["schema"]["schema"])
+    return cast(ConfigType, deepcopy(_load_main_schema()[section]["schema"]["schema"]))
 
 
 def validate_and_normalise_config(
@@ -100,12 +120,16 @@ def validate_and_normalise_config(
     :return: Normalised config
     :rtype: dict
     """
-    validator = ConfigValidator(schema, **validator_options)
+    return _validate_and_normalise(ConfigValidator(schema, **validator_options), config)
+
+
+def _validate_and_normalise(validator: ConfigValidator, config: Any) -> ConfigType:
     if not validator.validate(config):
         raise ConfigValidationFailed(
             "Config did not validate:\n%s" % yaml.dump(validator.errors)
         )
-    validated_config: ConfigType = validator.normalized(config)
+    # Validating normalises the document as it goes
+    validated_config: ConfigType = validator.document
     return validated_config
 
 
@@ -177,25 +201,101 @@ def load_main_config(path: str) -> ConfigType:
     return validate_and_normalise_main_config(raw_config)
 
 
-def validate_and_normalise_main_config(raw_config: Any) -> ConfigType:
+def validate_and_normalise_main_config(
+    raw_config: Any, cache_dir: Optional[str] = None
+) -> ConfigType:
     """
     Validate and normalise any raw config object with the main schema.
+
+    If `cache_dir` is given, then the normalised config is stored there, and used
+    instead of validating the config again the next time it's exactly the same and
+    the same version of MQTT IO is running.
     """
+    cache_path = None
+    if cache_dir is not None:
+        cache_path = _config_cache_path(raw_config, cache_dir)
+        if cache_path is not None:
+            try:
+                with open(cache_path, encoding="utf8") as cache_file:
+                    return cast(ConfigType, json.load(cache_file))
+            except (OSError, ValueError):
+                pass
     config = validate_and_normalise_config(raw_config, get_main_schema())
     config = custom_validate_main_config(config)
+    if cache_path is not None:
+        _write_config_cache(config, cache_path)
     return config
 
 
+def _config_cache_path(raw_config: Any, cache_dir: str) -> Optional[str]:
+    """
+    Get the path that the normalised version of this config is cached at, which depends
+    on the config's contents and the version of MQTT IO.
+    """
+    try:
+        key = json.dumps([VERSION, raw_config], sort_keys=True)
+    except (TypeError, ValueError):
+        _LOG.debug("Not caching config, as it can't be represented as JSON")
+        return None
+    digest = hashlib.sha256(key.encode("utf8")).hexdigest()
+    return join(cache_dir, f"config-{digest}.json")
+
+
+def _write_config_cache(config: ConfigType, cache_path: str) -> None:
+    """
+    Store the normalised config at `cache_path`, and remove any others from the cache.
+
+    The config can contain credentials, such as the MQTT password, so the cache is only
+    readable by the user that MQTT IO is running as.
+    """
+    cache_dir = dirname(cache_path)
+    tmp_path = f"{cache_path}.tmp"
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "w", encoding="utf8") as cache_file:
+            json.dump(config, cache_file)
+        os.replace(tmp_path, cache_path)
+    except (OSError, TypeError, ValueError):
+        _LOG.warning("Unable to cache normalised config at %r", cache_path, exc_info=True)
+        return
+    for name in os.listdir(cache_dir):
+        path = join(cache_dir, name)
+        if CONFIG_CACHE_RE.match(name) and path != cache_path:
+            try:
+                os.remove(path)
+            except OSError:
+                _LOG.warning("Unable to remove old cached config %r", path, exc_info=True)
+
+
+def _get_io_validator(section: str, module: Any, *module_schemas: str) -> ConfigValidator:
+    """
+    Get the validator for IO configs in a section of the main config, with the extra
+    schema from the given attributes of the module added. Validators are only built
+    once for each module class.
+    """
+    key = (section, type(module))
+    validator = _IO_VALIDATORS.get(key)
+    if validator is None:
+        schema = get_main_schema()[section]["schema"]["schema"]
+        for attr in module_schemas:
+            schema.update(getattr(module, attr, {}))
+        validator = _IO_VALIDATORS[key] = ConfigValidator(schema, allow_unknown=False)
+    return validator
+
+
 def validate_and_normalise_sensor_input_config(
     config: ConfigType, module: "GenericSensor"
 ) -> ConfigType:
     """
     Validate sensor input configs.
     """
-    schema = get_main_schema()
-    sensor_input_schema = schema["sensor_inputs"]["schema"]["schema"].copy()
-    sensor_input_schema.update(getattr(module, "SENSOR_SCHEMA", {}))
-    return validate_and_normalise_config(config, sensor_input_schema, allow_unknown=False)
+    validator = _get_io_validator("sensor_inputs", module, "SENSOR_SCHEMA")
+    return _validate_and_normalise(validator, config)
 
 
 def validate_and_normalise_digital_input_config(
@@ -204,13 +304,8 @@ def validate_and_normalise_digital_input_config(
     """
     Validate digital input configs.
     """
-    schema = get_main_schema()
-    digital_input_schema = schema["digital_inputs"]["schema"]["schema"].copy()
-    digital_input_schema.update(getattr(module, "PIN_SCHEMA", {}))
-    digital_input_schema.update(getattr(module, "INPUT_SCHEMA", {}))
-    return validate_and_normalise_config(
-        config, digital_input_schema, allow_unknown=False
-    )
+    validator = _get_io_validator("digital_inputs", module, "PIN_SCHEMA", "INPUT_SCHEMA")
+    return _validate_and_normalise(validator, config)
 
 
 def validate_and_normalise_digital_output_config(
@@ -219,10 +314,7 @@ def validate_and_normalise_digital_output_config(
     """
     Validate digital output configs.
     """
-    schema = get_main_schema()
-    digital_output_schema = schema["digital_outputs"]["schema"]["schema"].copy()
-    digital_output_schema.update(getattr(module, "PIN_SCHEMA", {}))
-    digital_output_schema.update(getattr(module, "OUTPUT_SCHEMA", {}))
-    return validate_and_normalise_config(
-        config, digital_output_schema, allow_unknown=False
+    validator = _get_io_validator(
+        "digital_outputs", module, "PIN_SCHEMA", "OUTPUT_SCHEMA"
     )
+    return _validate_and_normalise(validator, config)
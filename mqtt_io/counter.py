@@ -0,0 +1,87 @@
+"""
+Counting of pulses on digital inputs, such as from energy meters' S0 outputs or flow
+meters, for inputs in `count` mode.
+
+Pulses are counted straight from the GPIO modules' interrupt callbacks, timestamped on
+the monotonic clock, so that rates are worked out over the time that actually passed
+rather than the configured interval, and the time between pulses can be measured.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class PulseWindow:
+    """
+    The pulses counted in a window of time, and statistics of the periods between them.
+    """
+
+    count: int
+    total: int
+    elapsed: float
+    period_min: Optional[float] = None
+    period_max: Optional[float] = None
+    period_mean: Optional[float] = None
+
+    @property
+    def rate(self) -> float:
+        """
+        Pulses per second over the window.
+        """
+        return self.count / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class PulseCounter:  # pylint: disable=too-many-instance-attributes
+    """
+    Counts pulses and the periods between them. Pulses can be added from any thread.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.total = 0
+        self._count = 0
+        self._window_start = time.monotonic()
+        self._last_pulse: Optional[float] = None
+        self._period_min: Optional[float] = None
+        self._period_max: Optional[float] = None
+        self._period_sum = 0.0
+        self._periods = 0
+
+    def add(self, timestamp: float) -> None:
+        """
+        Count a pulse which happened at `timestamp` on the monotonic clock.
+        """
+        with self._lock:
+            self.total += 1
+            self._count += 1
+            if self._last_pulse is not None:
+                period = timestamp - self._last_pulse
+                if self._period_min is None or period < self._period_min:
+                    self._period_min = period
+                if self._period_max is None or period > self._period_max:
+                    self._period_max = period
+                self._period_sum += period
+                self._periods += 1
+            self._last_pulse = timestamp
+
+    def take(self, now: Optional[float] = None) -> PulseWindow:
+        """
+        Get the pulses counted since the last call, and start a new window.
+        """
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            window = PulseWindow(self._count, self.total, now - self._window_start)
+            if self._periods:
+                window.period_min = self._period_min
+                window.period_max = self._period_max
+                window.period_mean = self._period_sum / self._periods
+            self._window_start = now
+            self._count = 0
+            self._period_min = self._period_max = None
+            self._period_sum = 0.0
+            self._periods = 0
+        return window
@@ -0,0 +1,134 @@
+"""
+Software debouncing of polled digital inputs.
+
+Each filter handles all of the inputs in a poller job that have the same filter config,
+and gives each of them a bit in integer bitmaps, so that a sample of all of them is a
+single int. The consecutive-sample and majority vote filters then only cost a handful
+of big integer operations per poll, however many inputs there are.
+"""
+
+from collections import deque
+from typing import Deque, Dict, Iterator, List, Optional
+
+from .types import ConfigType
+
+CONSECUTIVE = "consecutive"
+STABLE = "stable"
+MAJORITY = "majority"
+
+
+def iter_bits(bitmap: int) -> Iterator[int]:
+    """
+    Iterate over the positions of the set bits in a bitmap.
+    """
+    while bitmap:
+        lowest = bitmap & -bitmap
+        yield lowest.bit_length() - 1
+        bitmap ^= lowest
+
+
+def count_bits(planes: Iterator[int]) -> List[int]:
+    """
+    Count the set bits at each position across some bitmaps, giving the counts as
+    bitmaps of their binary digits, least significant first.
+    """
+    counts: List[int] = []
+    for plane in planes:
+        carry = plane
+        for i, digit in enumerate(counts):
+            counts[i], carry = digit ^ carry, digit & carry
+            if not carry:
+                break
+        if carry:
+            counts.append(carry)
+    return counts
+
+
+def greater_than(counts: List[int], threshold: int, all_bits: int) -> int:
+    """
+    Get a bitmap of the positions whose count (as given by `count_bits()`) is greater
+    than `threshold`.
+    """
+    if threshold >> len(counts):
+        return 0
+    greater = 0
+    equal = all_bits
+    for i in reversed(range(len(counts))):
+        if threshold >> i & 1:
+            equal &= counts[i]
+        else:
+            greater |= equal & counts[i]
+            equal &= ~counts[i]
+    return greater
+
+
+class DebounceFilter:  # pylint: disable=too-many-instance-attributes
+    """
+    Filters the samples of up to `size` digital inputs, which are given bits 0 to
+    `size - 1` of the bitmaps passed to `update()`:
+    - `consecutive` only changes an input's value once `samples` samples in a row agree.
+    - `stable` only changes it once the samples have agreed for `stable_time` ms.
+    - `majority` sets it to the value of most of the last `samples` samples.
+
+    An input's value is unknown until the filter has first settled on one.
+    """
+
+    def __init__(self, config: ConfigType, size: int):
+        self.type: str = config["type"]
+        self.samples: int = config["samples"]
+        self.stable_time: float = config["stable_time"] / 1000
+        self.all_bits = (1 << size) - 1
+        self.planes: Deque[int] = deque(maxlen=self.samples)
+        self.state = 0
+        # Bits whose value has been settled on
+        self.settled = 0
+        self.last_sample: Optional[int] = None
+        # When each input's samples last changed, for the `stable` filter
+        self.changed_at: Dict[int, float] = {}
+
+    def update(self, sample: int, now: float) -> None:
+        """
+        Add a sample of all of the inputs, taken at `now` on the monotonic clock.
+        """
+        if self.type == STABLE:
+            self._update_stable(sample, now)
+            return
+        self.planes.append(sample)
+        if len(self.planes) < self.samples:
+            return
+        if self.type == CONSECUTIVE:
+            high = low = self.all_bits
+            for plane in self.planes:
+                high &= plane
+                low &= ~plane
+        else:
+            counts = count_bits(iter(self.planes))
+            high = greater_than(counts, self.samples // 2, self.all_bits)
+            # Ties, with an even number of samples, leave the value as it was
+            low = self.all_bits & ~greater_than(
+                counts, (self.samples - 1) // 2, self.all_bits
+            )
+        self.state = (self.state & ~low) | high
+        self.settled |= high | low
+
+    def _update_stable(self, sample: int, now: float) -> None:
+        changed = (
+            self.all_bits if self.last_sample is None else sample ^ self.last_sample
+        )
+        self.last_sample = sample
+        for bit in iter_bits(changed):
+            self.changed_at[bit] = now
+        pending = ((sample ^ self.state) | ~self.settled) & self.all_bits
+        for bit in iter_bits(pending):
+            if now - self.changed_at[bit] >= self.stable_time:
+                mask = 1 << bit
+                self.state = (self.state & ~mask) | (sample & mask)
+                self.settled |= mask
+
+    def value(self, bit: int) -> Optional[bool]:
+        """
+        The filtered value of an input, or None if it hasn't been settled on yet.
+        """
+        if not self.settled >> bit & 1:
+            return None
+        return bool(self.state >> bit & 1)
@@ -1,20 +1,49 @@
 """
-Event framework for subscribing to and firing events with asyncio callbacks.
+Event framework for subscribing to and firing events with callbacks, which may be plain
+functions or coroutine functions.
 """
 
 import asyncio
 import logging
+import threading
+import time
 from abc import ABC
-from dataclasses import dataclass
-from typing import Any, Callable, Coroutine, Dict, List, Optional, Type
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Coroutine, Deque, Dict, List, Optional, Type
 
-from .utils import create_unawaited_task_threadsafe
+from .utils import TaskSet
 
 _LOG = logging.getLogger(__name__)
 
-# Unfortunately can't use Callable[[Event], Coroutine[Any, Any, None]] here because
-# Callable[] is 'contravariant'.
-ListenerType = Callable[[Any], Coroutine[Any, Any, None]]
+# Unfortunately can't use Callable[[Event], ...] here because Callable[] is
+# 'contravariant'.
+ListenerType = Callable[[Any], Optional[Coroutine[Any, Any, None]]]
+
+
+@dataclass(frozen=True)
+class Timestamp:
+    """
+    When something happened, on the monotonic clock (for measuring intervals) and the
+    wall clock (for comparing with other machines).
+    """
+
+    monotonic: float
+    wall: float
+
+    @classmethod
+    def now(cls) -> "Timestamp":
+        """
+        The current time.
+        """
+        return cls(time.monotonic(), time.time())
+
+    @classmethod
+    def from_monotonic(cls, monotonic: float) -> "Timestamp":
+        """
+        A time which was captured earlier on the monotonic clock.
+        """
+        return cls(monotonic, time.time() - (time.monotonic() - monotonic))
 
 
 @dataclass
@@ -33,6 +62,8 @@ class DigitalInputChangedEvent(Event):
     input_name: str
     from_value: Optional[bool]
     to_value: bool
+    # When the value was captured
+    timestamp: Timestamp = field(default_factory=Timestamp.now)
 
 
 @dataclass
@@ -53,6 +84,8 @@ class SensorReadEvent(Event):
 
     sensor_name: str
     value: Any
+    # When the value was read
+    timestamp: Timestamp = field(default_factory=Timestamp.now)
 
 
 @dataclass
@@ -89,45 +122,85 @@ class DigitalSubscribeEvent(Event):
 
 class EventBus:
     """
-    Event bus that handles subscribing to specific events and firing coroutine callbacks.
+    Event bus that handles subscribing to specific events and calling their listeners.
+
+    When an event is fired from the event loop's thread, its listeners are called
+    straight away. Plain functions run to completion there and then, and coroutine
+    functions have a Task created for them. Events fired from other threads, such as
+    interrupt callbacks, are collected up and dispatched on the loop together, with a
+    single wakeup for however many arrive before it gets round to them.
     """
 
     def __init__(
         self,
         loop: asyncio.AbstractEventLoop,
-        transient_tasks: List["asyncio.Task[Any]"],
+        transient_tasks: TaskSet,
     ):
         self._loop = loop
         self._transient_tasks = transient_tasks
         self._listeners: Dict[Type[Event], List[ListenerType]] = {}
+        # Events fired from other threads, waiting to be dispatched on the loop
+        self._pending: Deque[Event] = deque()
+        self._pending_lock = threading.Lock()
+        self._pending_dispatched: Optional["asyncio.Future[None]"] = None
 
-    def fire(self, event: Event) -> List["asyncio.Future[asyncio.Task[Any]]"]:
+    def fire(self, event: Event) -> List["asyncio.Future[Any]"]:
         """
-        Add callback functions that have subscribed to this event type to the task loop.
+        Call the listeners that have subscribed to this event type.
+
+        Returns a list of futures which can be awaited on the loop: the Tasks of any
+        coroutine listeners if we're on the loop's thread, or a future which is done
+        once the event has been dispatched if we're not.
         """
-        event_class = type(event)
         try:
-            listeners = self._listeners[event_class]
-            _LOG.debug(
-                "Found %s listener(s) for event type %s",
-                len(listeners),
-                event_class.__name__,
-            )
-        except KeyError:
-            _LOG.debug("No listeners for event type %s", event_class.__name__)
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            return self._dispatch(event)
+
+        # Run threadsafe in case we're firing events from interrupt callback threads
+        with self._pending_lock:
+            self._pending.append(event)
+            dispatched = self._pending_dispatched
+            if dispatched is None:
+                dispatched = self._pending_dispatched = self._loop.create_future()
+                self._loop.call_soon_threadsafe(self._dispatch_pending)
+        return [dispatched]
+
+    def _dispatch_pending(self) -> None:
+        """
+        Dispatch the events which were fired from other threads.
+        """
+        with self._pending_lock:
+            dispatched = self._pending_dispatched
+            self._pending_dispatched = None
+            events = list(self._pending)
+            self._pending.clear()
+        for event in events:
+            self._dispatch(event)
+        if dispatched is not None and not dispatched.done():
+            dispatched.set_result(None)
+
+    def _dispatch(self, event: Event) -> List["asyncio.Future[Any]"]:
+        """
+        Call the listeners for an event. This must be done on the loop's thread.
+        """
+        listeners = self._listeners.get(type(event))
+        if not listeners:
             return []
-
-        task_futures: "List[asyncio.Future[asyncio.Task[Any]]]" = []
+        tasks: List["asyncio.Future[Any]"] = []
         for listener in listeners:
-            # Pass in a future on which the asyncio.Task will be set when the coro
-            # has been scheduled on the loop.
-            fut: "asyncio.Future[asyncio.Task[Any]]" = self._loop.create_future()
-            task_futures.append(fut)
-            # Run threadsafe in case we're firing events from interrupt callback threads
-            create_unawaited_task_threadsafe(
-                self._loop, self._transient_tasks, listener(event), fut
-            )
-        return task_futures
+            try:
+                coro = listener(event)
+            except Exception:  # pylint: disable=broad-except
+                _LOG.exception("Exception in listener for %s:", type(event).__name__)
+                continue
+            if coro is not None:
+                task = self._loop.create_task(coro)
+                self._transient_tasks.add(task)
+                tasks.append(task)
+        return tasks
 
     def subscribe(
         self,
@@ -135,7 +208,8 @@ class EventBus:
         callback: ListenerType,
     ) -> Callable[[], None]:
         """
-        Add a coroutine to be used as a callback when the given event class is fired.
+        Add a function or coroutine function to be used as a callback when the given
+        event class is fired.
         """
         if not isinstance(event_class, type):
             raise TypeError(
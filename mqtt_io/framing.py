@@ -0,0 +1,277 @@
+"""
+Splitting of stream data into frames, so that each message from a device is published
+as one MQTT message however the data happened to be chunked when it was read, and
+wrapping of data being sent to a stream in the same framing.
+
+Incoming data is appended to a buffer, and complete frames are sliced out of it through
+a memoryview. The data that's been framed is only removed from the front of the buffer
+once per chunk read, so that a chunk containing many frames isn't copied for each one.
+"""
+
+import abc
+import logging
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from typing_extensions import Literal
+
+_LOG = logging.getLogger(__name__)
+
+# A frame (or None if there's nothing to publish) and the position after it
+FoundFrameType = Optional[Tuple[Optional[bytes], int]]
+
+SLIP_END = 0xC0
+SLIP_ESC = 0xDB
+SLIP_ESC_END = 0xDC
+SLIP_ESC_ESC = 0xDD
+
+
+def cobs_encode(data: bytes) -> bytes:
+    """
+    Encode data with Consistent Overhead Byte Stuffing, so that it contains no zeros.
+    """
+    out = bytearray()
+    start = 0
+    while True:
+        zero = data.find(b"\0", start)
+        end = len(data) if zero == -1 else zero
+        while end - start >= 0xFE:
+            out.append(0xFF)
+            out += data[start : start + 0xFE]
+            start += 0xFE
+        out.append(end - start + 1)
+        out += data[start:end]
+        if zero == -1:
+            return bytes(out)
+        start = zero + 1
+
+
+def cobs_decode(data: bytes) -> bytes:
+    """
+    Decode data which was encoded with Consistent Overhead Byte Stuffing.
+    """
+    out = bytearray()
+    pos = 0
+    while pos < len(data):
+        code = data[pos]
+        end = pos + code
+        if code == 0 or end > len(data):
+            raise ValueError("Invalid COBS data")
+        out += data[pos + 1 : end]
+        pos = end
+        if code < 0xFF and pos < len(data):
+            out.append(0)
+    return bytes(out)
+
+
+class Framer(abc.ABC):
+    """
+    Base class for framers. Subclasses find the end of the next frame in the buffer.
+    """
+
+    def __init__(self, name: str, config: Dict[str, Any]):
+        self.name = name
+        self.max_frame: int = config["max_frame"]
+        self._buffer = bytearray()
+        # Whether the data up to the next frame boundary is the rest of a frame that was
+        # too long, which we've already discarded the start of
+        self._discarding = False
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """
+        Add data read from the stream, and return any frames that are now complete.
+        """
+        self._buffer += data
+        frames: List[bytes] = []
+        view = memoryview(self._buffer)
+        try:
+            pos = 0
+            while True:
+                found = self._next_frame(view, pos)
+                if found is None:
+                    break
+                frame, pos = found
+                if self._discarding:
+                    self._discarding = False
+                    continue
+                if frame is None:
+                    continue
+                if len(frame) > self.max_frame:
+                    _LOG.warning(
+                        "Discarding a frame of %s bytes from stream '%s', which is over "
+                        "the maximum frame size of %s bytes",
+                        len(frame),
+                        self.name,
+                        self.max_frame,
+                    )
+                    continue
+                frames.append(frame)
+        finally:
+            view.release()
+        if pos:
+            del self._buffer[:pos]
+        if len(self._buffer) > self.max_partial_frame():
+            _LOG.warning(
+                "Discarding %s bytes from stream '%s' which aren't a complete frame "
+                "within the maximum frame size of %s bytes",
+                len(self._buffer),
+                self.name,
+                self.max_frame,
+            )
+            self._buffer.clear()
+            self._discarding = True
+        return frames
+
+    def max_partial_frame(self) -> int:
+        """
+        The most data that can be waiting in the buffer for the rest of a frame which
+        will be no longer than `max_frame` bytes once it's decoded.
+        """
+        return self.max_frame
+
+    @abc.abstractmethod
+    def _next_frame(self, view: memoryview, pos: int) -> FoundFrameType:
+        """
+        Find the next complete frame starting at `pos`. Return None if there isn't one,
+        or the frame (or None to skip it) and the position after it.
+        """
+
+    @abc.abstractmethod
+    def encode(self, data: bytes) -> bytes:
+        """
+        Wrap data being sent to the stream in a frame.
+        """
+
+
+class DelimiterFramer(Framer):
+    """
+    Frames which end with a delimiter, such as a newline.
+    """
+
+    def __init__(self, name: str, config: Dict[str, Any]):
+        super().__init__(name, config)
+        self.delimiter: bytes = config["delimiter"].encode("utf8")
+        self.include_delimiter: bool = config["include_delimiter"]
+
+    def _next_frame(self, view: memoryview, pos: int) -> FoundFrameType:
+        end = self._buffer.find(self.delimiter, pos)
+        if end == -1:
+            return None
+        next_pos = end + len(self.delimiter)
+        return bytes(view[pos : next_pos if self.include_delimiter else end]), next_pos
+
+    def max_partial_frame(self) -> int:
+        # The start of the delimiter may have arrived already
+        return self.max_frame + len(self.delimiter) - 1
+
+    def encode(self, data: bytes) -> bytes:
+        if self.include_delimiter and data.endswith(self.delimiter):
+            return data
+        return data + self.delimiter
+
+
+class LengthFramer(Framer):
+    """
+    Frames which start with their length, as an unsigned integer.
+    """
+
+    def __init__(self, name: str, config: Dict[str, Any]):
+        super().__init__(name, config)
+        self.length_bytes: int = config["length_bytes"]
+        self.byteorder: Literal["big", "little"] = config["byteorder"]
+
+    def _next_frame(self, view: memoryview, pos: int) -> FoundFrameType:
+        start = pos + self.length_bytes
+        if len(view) < start:
+            return None
+        length = int.from_bytes(view[pos:start], self.byteorder)
+        if length > self.max_frame:
+            _LOG.warning(
+                "Discarding data from stream '%s' with a frame length of %s bytes, which "
+                "is over the maximum frame size of %s bytes",
+                self.name,
+                length,
+                self.max_frame,
+            )
+            # There's no telling where the next frame starts, so drop what we have
+            return None, len(view)
+        if len(view) < start + length:
+            return None
+        return bytes(view[start : start + length]), start + length
+
+    def max_partial_frame(self) -> int:
+        return self.length_bytes + self.max_frame
+
+    def encode(self, data: bytes) -> bytes:
+        return len(data).to_bytes(self.length_bytes, self.byteorder) + data
+
+
+class SLIPFramer(Framer):
+    """
+    Frames encoded with the Serial Line Internet Protocol (RFC 1055).
+    """
+
+    def _next_frame(self, view: memoryview, pos: int) -> FoundFrameType:
+        end = self._buffer.find(SLIP_END, pos)
+        if end == -1:
+            return None
+        if end == pos:
+            # Empty frames are just line noise flushers
+            return None, end + 1
+        frame = bytes(view[pos:end])
+        if SLIP_ESC in frame:
+            frame = frame.replace(
+                bytes((SLIP_ESC, SLIP_ESC_END)), bytes((SLIP_END,))
+            ).replace(bytes((SLIP_ESC, SLIP_ESC_ESC)), bytes((SLIP_ESC,)))
+        return frame, end + 1
+
+    def max_partial_frame(self) -> int:
+        # Every byte could be escaped
+        return self.max_frame * 2
+
+    def encode(self, data: bytes) -> bytes:
+        return (
+            data.replace(bytes((SLIP_ESC,)), bytes((SLIP_ESC, SLIP_ESC_ESC))).replace(
+                bytes((SLIP_END,)), bytes((SLIP_ESC, SLIP_ESC_END))
+            )
+            + bytes((SLIP_END,))
+        )
+
+
+class COBSFramer(Framer):
+    """
+    Frames encoded with Consistent Overhead Byte Stuffing, ending with a zero byte.
+    """
+
+    def _next_frame(self, view: memoryview, pos: int) -> FoundFrameType:
+        end = self._buffer.find(0, pos)
+        if end == -1:
+            return None
+        if end == pos:
+            return None, end + 1
+        try:
+            return cobs_decode(bytes(view[pos:end])), end + 1
+        except ValueError:
+            _LOG.warning("Discarding invalid COBS frame from stream '%s'", self.name)
+            return None, end + 1
+
+    def max_partial_frame(self) -> int:
+        # There's an overhead byte at the start and after every 254 bytes of data
+        return self.max_frame + 1 + self.max_frame // 0xFE
+
+    def encode(self, data: bytes) -> bytes:
+        return cobs_encode(data) + b"\0"
+
+
+FRAMERS: Dict[str, Type[Framer]] = {
+    "delimiter": DelimiterFramer,
+    "length": LengthFramer,
+    "slip": SLIPFramer,
+    "cobs": COBSFramer,
+}
+
+
+def make_framer(name: str, config: Dict[str, Any]) -> Framer:
+    """
+    Create the framer for a stream's `framing` config.
+    """
+    return FRAMERS[config["type"]](name, config)
@@ -132,8 +132,25 @@ def hass_announce_sensor_input(
             "state_topic": '/'.join((prefix, SENSOR_TOPIC, name)),
         }
     )
+    agg_conf = sens_conf.get("aggregate")
+    if agg_conf is not None:
+        # Announce the first of the aggregated statistics as the sensor's state
+        stat: str = agg_conf["statistics"][0]
+        if agg_conf["format"] == "json":
+            sensor_config.setdefault("value_template", "{{ value_json.%s }}" % stat)
+        else:
+            sensor_config["state_topic"] = "/".join((prefix, SENSOR_TOPIC, name, stat))
+        sensor_config.setdefault("expire_after", int(agg_conf["window"] * 2 + 5))
     if "expire_after" not in sensor_config:
-        sensor_config["expire_after"] = sens_conf["interval"] * 2 + 5
+        change_only = (
+            sens_conf.get("publish_on_change_only")
+            or sens_conf.get("deadband")
+            or sens_conf.get("deadband_percent")
+        )
+        if not change_only:
+            sensor_config["expire_after"] = int(sens_conf["interval"] * 2 + 5)
+        elif sens_conf.get("max_silence") is not None:
+            sensor_config["expire_after"] = int(sens_conf["max_silence"] * 2 + 5)
 
     return MQTTMessageSend(
         "/".join(
@@ -0,0 +1,119 @@
+"""
+Lossless hand-off of interrupts from the GPIO libraries' threads to the event loop.
+
+Interrupt callbacks append a record for each interrupt to a bounded ring buffer, and the
+first record of a batch schedules a single drain of the buffer on the event loop. The
+callbacks never wait for each other or for the loop, so interrupts which arrive while
+previous ones are still being handled are queued instead of being dropped.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Callable, Deque, List, Optional, Tuple
+
+from .events import Timestamp
+
+_LOG = logging.getLogger(__name__)
+
+# Input name, its value (or None if it's a remote interrupt) and the time of the interrupt
+InterruptRecordType = Tuple[str, Optional[bool], Timestamp]
+
+# Coalescing rules for inputs' interrupts which arrive in the same batch
+COALESCE_ALL = "all"
+COALESCE_LAST = "last"
+
+# Only warn about every this many interrupts dropped, so that we don't flood the logs
+DROP_WARNING_INTERVAL = 1000
+
+
+class InterruptQueue:
+    """
+    A bounded ring buffer of interrupt records, which is drained in batches by calling
+    `handler` on the event loop with the records that have been added since last time.
+
+    Once the buffer is full, the oldest records are dropped to make room for new ones.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        maxsize: int,
+        handler: Callable[[List[InterruptRecordType]], None],
+    ):
+        self.loop = loop
+        self.handler = handler
+        self.records: Deque[InterruptRecordType] = deque(maxlen=maxsize)
+        # Number of interrupts lost because the buffer filled up before it was drained
+        self.dropped = 0
+        # Number of interrupts which were coalesced into a later one for the same input
+        self.coalesced = 0
+        self._scheduled = False
+
+    def put(self, record: InterruptRecordType) -> None:
+        """
+        Add an interrupt record to the buffer. Can be called from any thread.
+        """
+        if len(self.records) == self.records.maxlen:
+            self.dropped += 1
+            if self.dropped % DROP_WARNING_INTERVAL == 1:
+                _LOG.warning(
+                    "Interrupt queue is full (%s), so dropped the oldest interrupt: "
+                    "%s interrupt(s) dropped so far",
+                    self.records.maxlen,
+                    self.dropped,
+                )
+        # append() and popleft() are atomic, so no lock is needed
+        self.records.append(record)
+        if not self._scheduled:
+            self._scheduled = True
+            self.loop.call_soon_threadsafe(self.drain)
+
+    def drain(self) -> None:
+        """
+        Take all of the records from the buffer and pass them to the handler. Must be
+        called on the event loop.
+        """
+        # Clear the flag before draining, so that any record added after this point is
+        # either drained now or schedules another drain.
+        self._scheduled = False
+        records: List[InterruptRecordType] = []
+        while True:
+            try:
+                records.append(self.records.popleft())
+            except IndexError:
+                break
+        if records:
+            self.handler(records)
+
+    def coalesce(
+        self, records: List[InterruptRecordType], last_only: Callable[[str], bool]
+    ) -> List[InterruptRecordType]:
+        """
+        Keep only the last record in a batch for the inputs for which `last_only` is
+        true, and all of the records for the others, in the order they arrived.
+        """
+        last_index = {}
+        for i, (name, _, _) in enumerate(records):
+            if last_only(name):
+                last_index[name] = i
+        if not last_index:
+            return records
+        kept = [
+            record
+            for i, record in enumerate(records)
+            if last_index.get(record[0], i) == i
+        ]
+        self.coalesced += len(records) - len(kept)
+        return kept
+
+    def log_counts(self) -> None:
+        """
+        Log how many interrupts have been dropped or coalesced, if there were any.
+        """
+        if self.dropped or self.coalesced:
+            _LOG.info(
+                "Interrupt queue dropped %s interrupt(s) and coalesced %s",
+                self.dropped,
+                self.coalesced,
+            )
@@ -3,23 +3,203 @@ Contains stuff useful across all modules, whether they're GPIO, sensor or stream
 """
 
 import logging
+import re
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from importlib import metadata
 from subprocess import CalledProcessError, check_call
 from types import ModuleType
-from typing import List
+from typing import Dict, Iterable, List, Optional, Tuple
 
-import pkg_resources
+from packaging.specifiers import SpecifierSet
 
 from ..exceptions import CannotInstallModuleRequirements
+from ..types import ConfigType
 
 _LOG = logging.getLogger(__name__)
 
+_INSTALL_LOCK = threading.Lock()
+
+DEFAULT_MAX_EXECUTOR_THREADS = 8
+
+# The bus used by modules which talk to the board's default I2C port with board.I2C().
+# It's swapped for the numbered bus that this is, if Blinka can tell us.
+BOARD_I2C_EXECUTOR_KEY = "i2c:board"
+
+
+@lru_cache(maxsize=None)
+def board_i2c_executor_key() -> str:
+    """
+    Get the executor key for the board's default I2C port. This is looked up from
+    Blinka's pin definitions, so that modules which use `board.I2C()` share a worker with
+    modules configured with the same `i2c_bus_num`, such as `i2c-1` on a Raspberry Pi.
+    """
+    try:
+        # pylint: disable=import-outside-toplevel,import-error
+        import board  # type: ignore
+        from microcontroller.pin import i2cPorts  # type: ignore
+    except (ImportError, NotImplementedError, RuntimeError):
+        # Blinka isn't installed, or doesn't know this board
+        return BOARD_I2C_EXECUTOR_KEY
+    for port, scl, sda in i2cPorts:
+        if scl == getattr(board, "SCL", None) and sda == getattr(board, "SDA", None):
+            return "i2c-%s" % port
+    return BOARD_I2C_EXECUTOR_KEY
+
+
+def executor_key(
+    config: ConfigType, module_type: str, default: Optional[str] = None
+) -> str:
+    """
+    Work out which physical resource a module talks to, from its config. Modules which
+    end up with the same key share a worker thread, so their transactions on the bus
+    are run one at a time, in the order they were submitted.
+
+    `default` is the key for the resource that the module uses when its config doesn't
+    say, such as the board's default I2C bus. Without one, the module gets a key of its
+    own, made from its `module_type` (gpio, sensor or stream) and name.
+    """
+    if config.get("executor"):
+        return str(config["executor"])
+    if config.get("i2c_bus_num") is not None:
+        return "i2c-%s" % config["i2c_bus_num"]
+    if config.get("spi_port") is not None:
+        return "spi-%s.%s" % (config["spi_port"], config.get("spi_device", 0))
+    for serial_key in ("device", "serial_port"):
+        if config.get(serial_key):
+            return "serial:%s" % config[serial_key]
+    if config.get("chip") is not None:
+        return "gpiochip:%s" % config["chip"]
+    if default == BOARD_I2C_EXECUTOR_KEY:
+        default = board_i2c_executor_key()
+    return default or "module:%s:%s" % (module_type, config["name"])
+
+
+class ExecutorRegistry:
+    """
+    Hands out a single-threaded executor per physical resource, up to a global limit on
+    the number of threads. Once the limit has been reached, new resources are given the
+    executor with the fewest resources already assigned to it.
+    """
+
+    def __init__(self, max_threads: int = DEFAULT_MAX_EXECUTOR_THREADS):
+        self.max_threads = max_threads
+        self._lock = threading.Lock()
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._pools: List[ThreadPoolExecutor] = []
+
+    def get(self, key: str) -> ThreadPoolExecutor:
+        """
+        Get the executor for the resource with the given key, creating it if need be.
+        """
+        with self._lock:
+            try:
+                return self._executors[key]
+            except KeyError:
+                pass
+            executor: Optional[ThreadPoolExecutor] = None
+            if len(self._pools) >= self.max_threads:
+                executor = min(
+                    self._pools,
+                    key=lambda pool: list(self._executors.values()).count(pool),
+                )
+                _LOG.debug(
+                    "Executor thread limit of %s reached, so sharing a thread for %r",
+                    self.max_threads,
+                    key,
+                )
+            else:
+                executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="mqtt_io-%s" % key
+                )
+                self._pools.append(executor)
+            self._executors[key] = executor
+            return executor
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Shut down all of the executors. Any new ones asked for afterwards are created
+        from scratch.
+        """
+        with self._lock:
+            pools = self._pools
+            self._pools = []
+            self._executors = {}
+        for pool in pools:
+            pool.shutdown(wait=wait)
+
+
+EXECUTORS = ExecutorRegistry()
+
+
+def get_module_executor(
+    config: ConfigType, module_type: str, default_key: Optional[str] = None
+) -> ThreadPoolExecutor:
+    """
+    Get the shared executor for the resource that a module's config says it uses.
+    """
+    return EXECUTORS.get(executor_key(config, module_type, default_key))
+
+
+# The distribution name and any version specifiers of a PEP 508 requirement
+REQUIREMENT_RE = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[[^\]]*\])?\s*([^;]*)")
+
+
+def normalise_dist_name(name: str) -> str:
+    """
+    Normalise a distribution name as per PEP 503, so that `RPi.GPIO` and `rpi-gpio`
+    are the same thing.
+    """
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+@lru_cache(maxsize=None)
+def installed_distributions() -> Dict[str, str]:
+    """
+    Get the versions of all of the installed distributions, by normalised name. This
+    is read once per process, and cleared when we install anything.
+    """
+    versions: Dict[str, str] = {}
+    for dist in metadata.distributions():
+        name = dist.metadata["Name"]
+        if name:
+            versions.setdefault(normalise_dist_name(name), dist.version)
+    return versions
+
+
+def parse_requirement(req: str) -> Tuple[str, str]:
+    """
+    Split a requirement into its normalised distribution name and version specifiers.
+    """
+    match = REQUIREMENT_RE.match(req)
+    if match is None:
+        raise ValueError("Invalid requirement %r" % req)
+    return normalise_dist_name(match.group(1)), match.group(2).strip()
+
+
+def requirement_satisfied(req: str) -> bool:
+    """
+    Whether a requirement is installed, at a version which matches its specifiers.
+    """
+    name, specifiers = parse_requirement(req)
+    version = installed_distributions().get(name)
+    if version is None:
+        return False
+    if not specifiers:
+        return True
+    return SpecifierSet(specifiers).contains(version, prereleases=True)
+
 
 def install_missing_requirements(pkgs_required: List[str]) -> None:
     """
     Use pip to install the list of requirements.
     """
-    check_call([sys.executable, "-m", "pip", "install"] + pkgs_required)
+    try:
+        check_call([sys.executable, "-m", "pip", "install"] + pkgs_required)
+    finally:
+        installed_distributions.cache_clear()
 
 
 def install_missing_module_requirements(module: ModuleType) -> None:
@@ -32,25 +212,38 @@ def install_missing_module_requirements(module: ModuleType) -> None:
     :return: None
     :rtype: NoneType
     """
-    reqs = getattr(module, "REQUIREMENTS", [])
-    if not reqs:
-        _LOG.debug("Module %r has no extra requirements to install.", module)
-        return
+    install_missing_modules_requirements([module])
+
 
-    pkgs_installed = pkg_resources.WorkingSet()
-    pkgs_required = []
-    for req in reqs:
-        if pkgs_installed.find(pkg_resources.Requirement.parse(req)) is None:
-            pkgs_required.append(req)
+def install_missing_modules_requirements(modules: Iterable[ModuleType]) -> None:
+    """
+    Check the `REQUIREMENTS` of all of the given modules together, and install any
+    which are missing with a single run of pip.
+    """
+    modules = list(modules)
+    # Modules may be initialised at the same time, but pip shouldn't be run in parallel
+    with _INSTALL_LOCK:
+        pkgs_required: List[str] = []
+        for module in modules:
+            reqs = getattr(module, "REQUIREMENTS", ())
+            if not reqs:
+                _LOG.debug("Module %r has no extra requirements to install.", module)
+                continue
+            missing = [req for req in reqs if not requirement_satisfied(req)]
+            if not missing:
+                _LOG.debug(
+                    "Module %r has all of its requirements installed already.", module
+                )
+            pkgs_required.extend(req for req in missing if req not in pkgs_required)
 
-    if not pkgs_required:
-        _LOG.debug("Module %r has all of its requirements installed already.", module)
-        return
+        if not pkgs_required:
+            return
 
-    try:
-        install_missing_requirements(pkgs_required)
-    except CalledProcessError as err:
-        raise CannotInstallModuleRequirements(
-            "Unable to install packages for module %r (%s): %s"
-            % (module, pkgs_required, err)
-        ) from err
+        _LOG.info("Installing missing module requirements: %s", pkgs_required)
+        try:
+            install_missing_requirements(pkgs_required)
+        except CalledProcessError as err:
+            raise CannotInstallModuleRequirements(
+                "Unable to install packages for modules %r (%s): %s"
+                % (list(modules), pkgs_required, err)
+            ) from err
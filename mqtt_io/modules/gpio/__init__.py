@@ -2,19 +2,14 @@
 Contains the base class and some enums that are shared across all GPIO modules.
 """
 
-# IDEA: Possible implementations -@flyte at 23/02/2021, 21:37:43
-# Decide which executor we should use for async functions.
-# https://docs.python.org/3/library/asyncio-eventloop.html#asyncio.loop.run_in_executor
-# Should we use the default executor, or have one per module?
-
 import abc
 import asyncio
 import logging
-from concurrent.futures import ThreadPoolExecutor
 from enum import Enum, Flag, IntFlag, auto
 from typing import Any, Callable, Dict, Iterable, List, Optional, cast
 
 from ...types import ConfigType, PinType
+from .. import get_module_executor
 
 _LOG = logging.getLogger(__name__)
 
@@ -84,7 +79,8 @@ class InterruptSupport(IntFlag):
     SET_TRIGGERS = auto()
 
 
-class GenericGPIO(abc.ABC):  # pylint: disable=too-many-instance-attributes
+# pylint: disable=too-many-instance-attributes,too-many-public-methods
+class GenericGPIO(abc.ABC):
     """
     Abstracts a generic GPIO interface to be implemented by the modules in this
     directory.
@@ -92,6 +88,9 @@ class GenericGPIO(abc.ABC):  # pylint: disable=too-many-instance-attributes
 
     INTERRUPT_SUPPORT = InterruptSupport.NONE
 
+    # The executor key for the bus the module uses if its config doesn't say otherwise
+    EXECUTOR_KEY: Optional[str] = None
+
     def __init__(self, config: ConfigType):
         self.config = config
         self.pin_configs: Dict[PinType, ConfigType] = {}
@@ -102,7 +101,7 @@ class GenericGPIO(abc.ABC):  # pylint: disable=too-many-instance-attributes
         self.pullup_map: Dict[PinPUD, Any] = {}
         self.interrupt_edge_map: Dict[InterruptEdge, Any] = {}
 
-        self.executor = ThreadPoolExecutor()
+        self.executor = get_module_executor(config, "gpio", self.EXECUTOR_KEY)
         self.setup_module()
 
     @abc.abstractmethod
@@ -136,12 +135,33 @@ class GenericGPIO(abc.ABC):  # pylint: disable=too-many-instance-attributes
         Set an individual pin to the given value.
         """
 
+    def set_pins(self, values: Dict[PinType, bool]) -> None:
+        """
+        Set a number of pins to the given values.
+
+        Modules which are able to write all of their pins in a single transaction (such as
+        port expanders) should override this. By default, each pin is set in turn using
+        set_pin().
+        """
+        for pin, value in values.items():
+            self.set_pin(pin, value)
+
     @abc.abstractmethod
     def get_pin(self, pin: PinType) -> bool:
         """
         Poll a pin for its value.
         """
 
+    def get_pins(self, pins: Iterable[PinType]) -> Dict[PinType, bool]:
+        """
+        Poll a number of pins for their values and return them as a dict.
+
+        Modules which are able to read all of their pins in a single transaction (such as
+        port expanders) should override this. By default, each pin is polled in turn
+        using get_pin().
+        """
+        return {pin: self.get_pin(pin) for pin in pins}
+
     def setup_interrupt(
         self,
         pin: PinType,
@@ -183,6 +203,12 @@ class GenericGPIO(abc.ABC):  # pylint: disable=too-many-instance-attributes
             return self.setup_interrupt(pin, edge, in_conf)
         return self.setup_interrupt_callback(pin, edge, in_conf, callback)
 
+    def start_interrupts(self) -> None:
+        """
+        Called once all of the module's interrupts have been set up, so that modules
+        can set up all of their interrupts together, instead of one at a time.
+        """
+
     def cleanup(self) -> None:
         """
         Called when closing the program to handle any cleanup operations.
@@ -260,6 +286,13 @@ class GenericGPIO(abc.ABC):  # pylint: disable=too-many-instance-attributes
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(self.executor, self.set_pin, pin, value)
 
+    async def async_set_pins(self, values: Dict[PinType, bool]) -> None:
+        """
+        Use a ThreadPoolExecutor to call the module's synchronous set_pins function.
+        """
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.executor, self.set_pins, dict(values))
+
     async def async_get_pin(self, pin: PinType) -> bool:
         """
         Use a ThreadPoolExecutor to call the module's synchronous get_pin function.
@@ -267,6 +300,13 @@ class GenericGPIO(abc.ABC):  # pylint: disable=too-many-instance-attributes
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(self.executor, self.get_pin, pin)
 
+    async def async_get_pins(self, pins: Iterable[PinType]) -> Dict[PinType, bool]:
+        """
+        Use a ThreadPoolExecutor to call the module's synchronous get_pins function.
+        """
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.executor, self.get_pins, list(pins))
+
     def get_interrupt_value(self, pin: PinType, *args: Any, **kwargs: Any) -> bool:
         """
         Called on interrupt when this module's software callback was called, in order to
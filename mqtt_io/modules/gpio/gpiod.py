@@ -1,9 +1,14 @@
 """
 Linux Kernel 4.8+ libgpiod
 """
+import logging
+import os
+import select
 import threading
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 
 from ...types import ConfigType, PinType
 from . import GenericGPIO, InterruptEdge, InterruptSupport, PinDirection, PinPUD
@@ -12,9 +17,14 @@ if TYPE_CHECKING:
     # pylint: disable=import-error
     import gpiod  # type: ignore
 
+_LOG = logging.getLogger(__name__)
+
 # Requires libgpiod-devel, libgpiod
 REQUIREMENTS = ("gpiod",)
 
+# Kernel timestamps older than this (in seconds) can't be on the monotonic clock
+KERNEL_TIMESTAMP_MAX_AGE = 60
+
 CONFIG_SCHEMA = {
     "chip": {"type": "string", "required": False, "default": "/dev/gpiochip0"}
 }
@@ -34,8 +44,10 @@ class GPIO(GenericGPIO):  # pylint: disable=too-many-instance-attributes
         self.io: gpiod = gpiod
         self.chip = gpiod.chip(self.config["chip"])
         self.pins: Dict[PinType, gpiod.line] = {}
-        self.interrupt_threads: Dict[PinType, threading.Thread] = {}
-        self.stop_event = threading.Event()
+        self.interrupts: Dict[
+            PinType, Tuple[InterruptEdge, int, Callable[..., None]]
+        ] = {}
+        self.interrupt_thread: Optional[InterruptThread] = None
 
         self.direction_map = {
             PinDirection.INPUT: gpiod.line_request.DIRECTION_INPUT,
@@ -114,18 +126,40 @@ class GPIO(GenericGPIO):  # pylint: disable=too-many-instance-attributes
         edge:       triggering edge: RISING, FALLING or BOTH
         callback:   the callback function to be called, when interrupt occurs
         bouncetime: minimum time between two interrupts
+
+        The lines are requested and watched together in `start_interrupts()`.
         """
+        self.interrupts[pin] = (edge, in_conf["bouncetime"], callback)
 
-        line_request = self.io.line_request()
-        line_request.consumer = "mqtt-io"
-        line_request.request_type = self.interrupt_edge_map[edge]
+    def start_interrupts(self) -> None:
+        """
+        Request all of the interrupt lines, in one bulk request per edge, and start a
+        single thread to watch them all.
+        """
+        if not self.interrupts:
+            return
+        by_edge: Dict[InterruptEdge, List[PinType]] = {}
+        for pin, (edge, _, _) in self.interrupts.items():
+            by_edge.setdefault(edge, []).append(pin)
 
-        bouncetime: int = in_conf["bouncetime"]
-        int_thread = InterruptThread(
-            self.chip, pin, line_request, callback, bouncetime, self.stop_event
-        )
-        int_thread.start()
-        self.interrupt_threads[pin] = int_thread
+        watched: Dict[int, WatchedLine] = {}
+        for edge, pins in by_edge.items():
+            line_request = self.io.line_request()
+            line_request.consumer = "mqtt-io"
+            line_request.request_type = self.interrupt_edge_map[edge]
+            bulk = self.chip.get_lines(pins)
+            # The lines were requested as inputs in setup_pin()
+            bulk.release()
+            bulk.request(line_request)
+            for pin in pins:
+                _, bouncetime, callback = self.interrupts[pin]
+                line = self.chip.get_line(pin)
+                watched[line.event_get_fd()] = WatchedLine(
+                    pin, line, callback, bouncetime * 1_000_000
+                )
+
+        self.interrupt_thread = InterruptThread(watched, self.io)
+        self.interrupt_thread.start()
 
     def get_interrupt_value(self, pin: PinType, *args: Any, **kwargs: Any) -> bool:
         # We established the pin's value in the InterruptThread, so we just give it back
@@ -139,55 +173,111 @@ class GPIO(GenericGPIO):  # pylint: disable=too-many-instance-attributes
         return bool(self.pins[pin].get_value())
 
     def cleanup(self) -> None:
-        self.stop_event.set()
-        for thread in self.interrupt_threads.values():
-            thread.join(timeout=10)
+        if self.interrupt_thread is not None:
+            self.interrupt_thread.stop()
+            self.interrupt_thread.join(timeout=10)
+
+
+def monotonic_from_kernel_ns(timestamp_ns: int) -> float:
+    """
+    Convert a kernel event timestamp to seconds on our monotonic clock. Kernels since 5.7
+    timestamp events on the monotonic clock, and older ones on the wall clock.
+    """
+    timestamp = timestamp_ns / 1_000_000_000
+    now = time.monotonic()
+    if 0 <= now - timestamp < KERNEL_TIMESTAMP_MAX_AGE:
+        return timestamp
+    return now - (time.time() - timestamp)
+
+
+def event_timestamp_ns(timestamp: Any) -> int:
+    """
+    Get a line event's kernel timestamp in nanoseconds. Depending on the version of the
+    bindings, this is either a datetime, a timedelta or a number of nanoseconds.
+    """
+    if isinstance(timestamp, datetime):
+        return int(timestamp.timestamp() * 1_000_000_000)
+    if isinstance(timestamp, timedelta):
+        return (
+            (timestamp.days * 86400 + timestamp.seconds) * 1_000_000_000
+            + timestamp.microseconds * 1000
+        )
+    return int(timestamp)
+
+
+@dataclass
+class WatchedLine:
+    """
+    An interrupt line, along with its callback and the timestamp of its last event.
+    """
+
+    pin: PinType
+    line: "gpiod.line"
+    callback: Callable[..., None]
+    bouncetime_ns: int
+    previous_ns: Optional[int] = None
 
 
 class InterruptThread(threading.Thread):
     """
-    Thread that waits on interrupt events for a given pin, then calls the callback.
+    Thread that waits on the interrupt events of all of a chip's interrupt lines at once,
+    using their file descriptors, then calls their callbacks.
     """
 
-    def __init__(
-        self,
-        chip: "gpiod.chip",
-        pin: PinType,
-        line_request: "gpiod.line_request",
-        callback: Callable[..., None],
-        bouncetime: int,
-        stop_event: threading.Event,
-    ):
-        super().__init__()
-        self.daemon = True
-
-        self.pin = pin
-        self.line: "gpiod.line" = chip.get_line(self.pin)
-        self.line.release()
-        self.line.request(line_request)
-        self.callback = callback
-        self.bouncetime = timedelta(milliseconds=bouncetime)
-        self.stop_event = stop_event
+    def __init__(self, lines: Dict[int, WatchedLine], io: Any):
+        super().__init__(name="mqtt_io-gpiod-interrupts", daemon=True)
+        self.lines = lines
+        self.io = io
+        # Written to by stop(), so that we wake up straight away
+        self._wake_read, self._wake_write = os.pipe()
+        self._stopping = False
+
+    def stop(self) -> None:
+        """
+        Stop watching the lines.
+        """
+        self._stopping = True
+        os.write(self._wake_write, b"\0")
 
     def run(self) -> None:
-        # pylint: disable=import-outside-toplevel,import-error
-        import gpiod
+        poller = select.poll()
+        poller.register(self._wake_read, select.POLLIN)
+        for fd in self.lines:
+            poller.register(fd, select.POLLIN | select.POLLPRI)
+        try:
+            while not self._stopping:
+                for fd, _ in poller.poll():
+                    if fd == self._wake_read:
+                        continue
+                    self._handle_events(self.lines[fd])
+        finally:
+            os.close(self._wake_read)
+            os.close(self._wake_write)
 
-        previous_event_time = datetime.now()
-        while not self.stop_event.is_set():
-            if not self.line.event_wait(timedelta(seconds=2)):
-                continue
-            event: gpiod.line_event = self.line.event_read()
-            now = datetime.now()
-            if now - previous_event_time < self.bouncetime:
+    def _handle_events(self, watched: WatchedLine) -> None:
+        """
+        Read all of the events that are waiting on a line, so that none are lost if
+        there was a burst of them since we last woke up.
+        """
+        for event in watched.line.event_read_multiple():
+            timestamp_ns = event_timestamp_ns(event.timestamp)
+            if (
+                watched.previous_ns is not None
+                and timestamp_ns - watched.previous_ns < watched.bouncetime_ns
+            ):
                 continue
-            previous_event_time = now
+            watched.previous_ns = timestamp_ns
             pin_value = None
-            if event.event_type == gpiod.line_request.EVENT_RISING_EDGE:
+            if event.event_type == self.io.line_event.RISING_EDGE:
                 pin_value = True
-            elif event.event_type == gpiod.line_request.EVENT_FALLING_EDGE:
+            elif event.event_type == self.io.line_event.FALLING_EDGE:
                 pin_value = False
             if pin_value is None:
                 # Poll the pin for its value :(
-                pin_value = bool(self.line.get_value())
-            self.callback(pin_value=pin_value)
+                pin_value = bool(watched.line.get_value())
+            try:
+                watched.callback(
+                    pin_value=pin_value, timestamp=monotonic_from_kernel_ns(timestamp_ns)
+                )
+            except Exception:  # pylint: disable=broad-except
+                _LOG.exception("Exception in interrupt callback for pin %r", watched.pin)
@@ -5,9 +5,10 @@ MCP23017 IO expander
 from __future__ import absolute_import
 
 import logging
-from typing import List, Optional, cast
+from typing import Dict, Iterable, List, Optional, cast
 
 from ...types import ConfigType, PinType
+from .. import BOARD_I2C_EXECUTOR_KEY
 from . import GenericGPIO, InterruptEdge, InterruptSupport, PinDirection, PinPUD
 
 _LOG = logging.getLogger(__name__)
@@ -25,6 +26,8 @@ class GPIO(GenericGPIO):
     Pin numbers 0 - 15.
     """
 
+    EXECUTOR_KEY = BOARD_I2C_EXECUTOR_KEY
+
     # | InterruptSupport.CAPTURE_REGISTER
     INTERRUPT_SUPPORT = (
         InterruptSupport.FLAG_REGISTER
@@ -111,8 +114,21 @@ class GPIO(GenericGPIO):
     def set_pin(self, pin: PinType, value: bool) -> None:
         self.io.get_pin(pin).value = value
 
+    def set_pins(self, values: Dict[PinType, bool]) -> None:
+        # Read-modify-write both GPIO registers (A and B) once for all of the pins
+        state: int = self.io.gpio
+        for pin, value in values.items():
+            bit = 1 << cast(int, pin)
+            state = state | bit if value else state & ~bit
+        self.io.gpio = state & 0xFFFF
+
     def get_pin(self, pin: PinType) -> bool:
         return bool(self.io.get_pin(pin).value)
 
+    def get_pins(self, pins: Iterable[PinType]) -> Dict[PinType, bool]:
+        # Read both GPIO registers (A and B) in a single transaction
+        state: int = self.io.gpio
+        return {pin: bool(state & 1 << cast(int, pin)) for pin in pins}
+
     def get_int_pins(self) -> List[PinType]:
         return cast(List[PinType], self.io.int_flag)
@@ -32,7 +32,9 @@ class GPIO(GenericGPIO):
         self.setup_pin = Mock()  # type: ignore[assignment]
         self.setup_interrupt = Mock()  # type: ignore[assignment]
         self.setup_interrupt_callback = Mock()  # type: ignore[assignment]
+        self.start_interrupts = Mock()  # type: ignore[assignment]
         self.set_pin = Mock()  # type: ignore[assignment]
+        self.set_pins = Mock()  # type: ignore[assignment]
         self.get_pin = Mock(return_value=True)  # type: ignore[assignment]
         self.get_int_pins = Mock(return_value=1)  # type: ignore[assignment]
         self.get_captured_int_pin_values = Mock(return_value={1: 1})  # type: ignore[assignment]
@@ -73,6 +75,9 @@ class GPIO(GenericGPIO):
     def set_pin(self, pin: PinType, value: bool) -> None:
         return super().set_pin(pin, value) # type: ignore[safe-super]
 
+    def set_pins(self, values: Dict[PinType, bool]) -> None:
+        return super().set_pins(values)
+
     def get_pin(self, pin: PinType) -> bool:
         return super().get_pin(pin) # type: ignore[safe-super]
 
@@ -2,7 +2,7 @@
 PCF8574 IO expander
 """
 
-from typing import Optional, cast
+from typing import Dict, Iterable, Optional, cast
 
 from ...types import ConfigType, PinType
 from . import GenericGPIO, PinDirection, PinPUD
@@ -47,5 +47,17 @@ class GPIO(GenericGPIO):
     def set_pin(self, pin: PinType, value: bool) -> None:
         self.io.port[pin] = value
 
+    def set_pins(self, values: Dict[PinType, bool]) -> None:
+        port = list(self.get_pins(range(8)).values())
+        for pin, value in values.items():
+            port[cast(int, pin)] = value
+        self.io.port = port
+
     def get_pin(self, pin: PinType) -> bool:
         return cast(bool, self.io.port[pin])
+
+    def get_pins(self, pins: Iterable[PinType]) -> Dict[PinType, bool]:
+        # The pcf8574 library reads the whole port for each pin, so read it once here.
+        # Pin 0 is the most significant bit, as per the library's IOPort.
+        state: int = self.io.bus.read_byte(self.io.address)
+        return {pin: bool(state & 1 << 7 - cast(int, pin)) for pin in pins}
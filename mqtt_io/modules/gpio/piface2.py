@@ -2,7 +2,7 @@
 PiFace Digital IO 2
 """
 
-from typing import Optional
+from typing import Dict, Iterable, Optional, cast
 
 from ...types import ConfigType, PinType
 from . import GenericGPIO, PinDirection, PinPUD
@@ -21,6 +21,9 @@ class GPIO(GenericGPIO):
 
         pfdio.init()
         self.io = pfdio
+        # Used for reading and writing whole ports at a time. The board has already been
+        # initialised by init() above.
+        self.board = pfdio.PiFaceDigital(init_board=False)
 
     def setup_pin(
         self,
@@ -35,8 +38,20 @@ class GPIO(GenericGPIO):
     def set_pin(self, pin: PinType, value: bool) -> None:
         self.io.digital_write(pin, value)
 
+    def set_pins(self, values: Dict[PinType, bool]) -> None:
+        state: int = self.board.output_port.value
+        for pin, value in values.items():
+            bit = 1 << cast(int, pin)
+            state = state | bit if value else state & (~bit & 0xFF)
+        self.board.output_port.value = state
+
     def get_pin(self, pin: PinType) -> bool:
         return bool(self.io.digital_read(pin))
 
+    def get_pins(self, pins: Iterable[PinType]) -> Dict[PinType, bool]:
+        # Inverted in the same way as digital_read(), since inputs are active low
+        state: int = self.board.input_port.value
+        return {pin: bool(state & 1 << cast(int, pin)) for pin in pins}
+
     def cleanup(self) -> None:
         self.io.deinit()
@@ -2,7 +2,7 @@
 XL9535/PCA9535/TCA9535 IO expander
 """
 
-from typing import Optional, cast
+from typing import Dict, Iterable, Optional, cast
 
 from ...exceptions import RuntimeConfigError
 from ...types import ConfigType, PinType
@@ -73,10 +73,28 @@ class GPIO(GenericGPIO):
         new_state = current_state | bit if value else current_state & (~bit & 0xffff)
         self.bus.write_word_data(self.address, XL9535_OUTPUT_PORT_0, new_state)
 
+    def set_pins(self, values: Dict[PinType, bool]) -> None:
+        assert all(
+            pin in range(16) for pin in values
+        ), "Pin numbers must be integers between 0 and 15"
+        state = self.bus.read_word_data(self.address, XL9535_OUTPUT_PORT_0)
+        for pin, value in values.items():
+            bit = 1 << cast(int, pin)
+            state = state | bit if value else state & (~bit & 0xffff)
+        self.bus.write_word_data(self.address, XL9535_OUTPUT_PORT_0, state)
+
     def get_pin(self, pin: PinType) -> bool:
         assert pin in range(16), "Pin number must be an integer between 0 and 15"
         state = self.bus.read_word_data(self.address, XL9535_OUTPUT_PORT_0)
         return bool(state & 1 << cast(int, pin))
 
+    def get_pins(self, pins: Iterable[PinType]) -> Dict[PinType, bool]:
+        pins = list(pins)
+        assert all(
+            pin in range(16) for pin in pins
+        ), "Pin numbers must be integers between 0 and 15"
+        state = self.bus.read_word_data(self.address, XL9535_OUTPUT_PORT_0)
+        return {pin: bool(state & 1 << cast(int, pin)) for pin in pins}
+
     def cleanup(self) -> None:
         self.bus.close()
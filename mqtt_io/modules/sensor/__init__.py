@@ -4,10 +4,10 @@ Contains the base class that is shared across all Sensor modules.
 
 import abc
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
-from typing import Any
+from typing import Any, Dict, List, Optional
 
 from ...types import ConfigType, SensorValueType
+from .. import get_module_executor
 
 
 class GenericSensor(abc.ABC):
@@ -16,17 +16,85 @@ class GenericSensor(abc.ABC):
     by the modules in this directory.
     """
 
+    # The executor key for the bus the module uses if its config doesn't say otherwise
+    EXECUTOR_KEY: Optional[str] = None
+
     def __init__(self, config: ConfigType):
         self.config = config
         self.sensor: Any = None
+        # The sensor inputs that use this module, added as they're set up
+        self.sensor_inputs: List[ConfigType] = []
         self.setup_module()
-        self.executor = ThreadPoolExecutor()
+        self.executor = get_module_executor(config, "sensor", self.EXECUTOR_KEY)
+
+        self._values: Optional[Dict[str, SensorValueType]] = None
+        self._values_time: Optional[float] = None
+        self._values_future: Optional[
+            "asyncio.Future[Optional[Dict[str, SensorValueType]]]"
+        ] = None
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        """
+        Modules only have to implement one of `get_value()` or `get_values()`, so fill
+        in the other one from it. If a module implements neither, both stay abstract and
+        it can't be instantiated.
+        """
+        super().__init_subclass__(**kwargs)
+        value_abstract = getattr(cls.get_value, "__isabstractmethod__", False)
+        values_abstract = getattr(cls.get_values, "__isabstractmethod__", False)
+        if value_abstract and not values_abstract:
+            setattr(cls, "get_value", GenericSensor._get_value_from_values)
+        elif values_abstract and not value_abstract:
+            setattr(cls, "get_values", GenericSensor._get_values_from_value)
 
     @abc.abstractmethod
     def get_value(self, sens_conf: ConfigType) -> SensorValueType:
         """
         Read the sensor's current value.
+
+        Modules which read more than one quantity at a time can implement `get_values()`
+        instead, in which case this picks the one for the sensor input's `type`.
+        """
+
+    @abc.abstractmethod
+    def get_values(self) -> Optional[Dict[str, SensorValueType]]:
+        """
+        Read all of the sensor's quantities from a single sample, keyed by the `type`
+        of sensor input that they're for.
+
+        When a module implements this, all of its sensor inputs share each sample, which
+        is cached for the module's `cache_ttl`. Otherwise, this calls `get_value()` for
+        each of the module's sensor inputs.
+        """
+
+    def _get_value_from_values(self, sens_conf: ConfigType) -> SensorValueType:
+        """
+        `get_value()` for modules which implement `get_values()`.
         """
+        values = self.get_values()
+        if values is None:
+            return None
+        return values[sens_conf["type"]]
+
+    def _get_values_from_value(self) -> Optional[Dict[str, SensorValueType]]:
+        """
+        `get_values()` for modules which implement `get_value()`.
+        """
+        return {
+            sens_conf["type"]: self.get_value(sens_conf)
+            for sens_conf in self.sensor_inputs
+            if "type" in sens_conf
+        }
+
+    @property
+    def reads_all_values(self) -> bool:
+        """
+        Whether the module implements `get_values()`.
+        """
+        return (
+            getattr(self.get_values, "__func__", None)
+            is not GenericSensor._get_values_from_value
+        )
 
     def setup_module(self) -> None:
         """
@@ -54,5 +122,55 @@ class GenericSensor(abc.ABC):
         """
         Use a ThreadPoolExecutor to call the module's synchronous get_value function.
         """
+        if not self.reads_all_values:
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(self.executor, self.get_value, sens_conf)
+        values = await self.async_get_values()
+        if values is None:
+            return None
+        return values[sens_conf["type"]]
+
+    def get_value_from_thread(self, sens_conf: ConfigType) -> SensorValueType:
+        """
+        Read the sensor's current value from a thread other than the event loop's, such
+        as a high-rate sampler's. The read is run on the module's executor and waited
+        for, so that it takes its turn on the bus with the module's other reads.
+        """
+        return self.executor.submit(self.get_value, sens_conf).result()
+
+    async def async_get_values(self) -> Optional[Dict[str, SensorValueType]]:
+        """
+        Use a ThreadPoolExecutor to call the module's synchronous get_values function.
+
+        The values are reused until they're older than the module's `cache_ttl`, and
+        anyone asking for them while a read is already happening waits for that read
+        instead of starting another one.
+        """
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(self.executor, self.get_value, sens_conf)
+        ttl: float = self.config.get("cache_ttl", 0)
+        if (
+            self._values is not None
+            and self._values_time is not None
+            and loop.time() - self._values_time < ttl
+        ):
+            return self._values
+
+        if self._values_future is None:
+            self._values_future = asyncio.ensure_future(
+                loop.run_in_executor(self.executor, self.get_values)
+            )
+            self._values_future.add_done_callback(self._store_values)
+        # Shield the read, so that one caller being cancelled doesn't cancel it for all
+        return await asyncio.shield(self._values_future)
+
+    def _store_values(
+        self, future: "asyncio.Future[Optional[Dict[str, SensorValueType]]]"
+    ) -> None:
+        """
+        Cache the values from a finished read, if it succeeded.
+        """
+        self._values_future = None
+        if future.cancelled() or future.exception() is not None:
+            return
+        self._values = future.result()
+        self._values_time = asyncio.get_event_loop().time() if self._values else None
@@ -6,6 +6,7 @@ import threading
 from typing import cast
 
 from ...types import CerberusSchemaType, ConfigType, SensorValueType
+from .. import BOARD_I2C_EXECUTOR_KEY
 from . import GenericSensor
 
 SENSOR_ADS1015 = "ADS1015"
@@ -31,6 +32,8 @@ class Sensor(GenericSensor):
     Implementation of Sensor class for the Adafruit_ADS1x15.
     """
 
+    EXECUTOR_KEY = BOARD_I2C_EXECUTOR_KEY
+
     SENSOR_SCHEMA: CerberusSchemaType = {
         "type": {
             "type": 'string',
@@ -2,11 +2,11 @@
 AHT20 temperature and humidity sensor
 """
 
-from typing import cast
+from typing import Dict, cast
 
-from ...types import ConfigType, SensorValueType
+from ...types import SensorValueType
+from .. import BOARD_I2C_EXECUTOR_KEY
 from . import GenericSensor
-from ...exceptions import RuntimeConfigError
 
 REQUIREMENTS = ("adafruit-circuitpython-ahtx0",)
 
@@ -16,6 +16,8 @@ class Sensor(GenericSensor):
     Implementation of Sensor class for aht20.
     """
 
+    EXECUTOR_KEY = BOARD_I2C_EXECUTOR_KEY
+
     SENSOR_SCHEMA = {
         "type": {
             "type": 'string',
@@ -35,23 +37,13 @@ class Sensor(GenericSensor):
         i2c = busio.I2C(board.SCL, board.SDA)
         self.sensor = adafruit_ahtx0.AHTx0(i2c)
 
-    @property
-    def _temperature(self) -> SensorValueType:
-        return cast(SensorValueType, self.sensor.temperature)
-
-    @property
-    def _humidity(self) -> SensorValueType:
-        return cast(SensorValueType, self.sensor.relative_humidity)
-
-    def get_value(self, sens_conf: ConfigType) -> SensorValueType:
+    def get_values(self) -> Dict[str, SensorValueType]:
         """
-        Get the temperature value from the sensor
+        Get the temperature and humidity values from the sensor
         """
-        if sens_conf["type"] == "temperature":
-            return self._temperature
-        if sens_conf["type"] == "humidity":
-            return self._humidity
-        raise RuntimeConfigError(
-            "aht20 sensor '%s' was not configured to return 'temperature' or 'humidity'"
-            % sens_conf["name"]
-        )
+        # Each of the library's properties triggers a new measurement, so the two
+        # values come from back-to-back samples.
+        return {
+            "temperature": cast(SensorValueType, self.sensor.temperature),
+            "humidity": cast(SensorValueType, self.sensor.relative_humidity),
+        }
@@ -78,6 +78,7 @@ type:                The following types are supported:
 import logging
 from typing import Dict
 from ...types import CerberusSchemaType, ConfigType, SensorValueType
+from .. import BOARD_I2C_EXECUTOR_KEY
 from . import GenericSensor
 
 _LOG = logging.getLogger(__name__)
@@ -236,6 +237,8 @@ class Sensor(GenericSensor):
     Flowsensor: Flow Rate Sensor
     """
 
+    EXECUTOR_KEY = BOARD_I2C_EXECUTOR_KEY
+
     SENSOR_SCHEMA: CerberusSchemaType = {
         "type": {
             "type": 'string',
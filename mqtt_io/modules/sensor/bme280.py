@@ -2,9 +2,9 @@
 BME280 temperature, humidity and pressure sensor
 """
 
-from typing import cast
+from typing import Dict, cast
 
-from ...types import CerberusSchemaType, ConfigType, SensorValueType
+from ...types import CerberusSchemaType, SensorValueType
 from . import GenericSensor
 
 REQUIREMENTS = ("smbus2", "RPi.bme280")
@@ -40,17 +40,13 @@ class Sensor(GenericSensor):
         self.bme = bme280
         self.calib = bme280.load_calibration_params(self.bus, self.address)
 
-    def get_value(self, sens_conf: ConfigType) -> SensorValueType:
+    def get_values(self) -> Dict[str, SensorValueType]:
         """
-        Get the temperature, humidity or pressure value from the sensor
+        Get the temperature, humidity and pressure values from a single sample
         """
-        sens_type = sens_conf["type"]
         data = self.bme.sample(self.bus, self.address, self.calib)
-        return cast(
-            float,
-            {
-                "temperature": data.temperature,
-                "humidity": data.humidity,
-                "pressure": data.pressure,
-            }[sens_type],
-        )
+        return {
+            "temperature": cast(float, data.temperature),
+            "humidity": cast(float, data.humidity),
+            "pressure": cast(float, data.pressure),
+        }
@@ -2,7 +2,7 @@
 BME680 temperature, humidity and pressure sensor
 """
 
-from typing import cast
+from typing import Dict, Optional, cast
 
 from ...types import CerberusSchemaType, ConfigType, SensorValueType
 from . import GenericSensor
@@ -59,15 +59,11 @@ class Sensor(GenericSensor):
             set_oversampling = getattr(self.sensor, f"set_{sens_type}_oversample")
             set_oversampling(self.oversampling_map[sens_conf["oversampling"]])
 
-    def get_value(self, sens_conf: ConfigType) -> SensorValueType:
-        sens_type = sens_conf["type"]
+    def get_values(self) -> Optional[Dict[str, SensorValueType]]:
         if not self.sensor.get_sensor_data():
             return None
-        return cast(
-            float,
-            {
-                "temperature": self.sensor.data.temperature,
-                "humidity": self.sensor.data.humidity,
-                "pressure": self.sensor.data.pressure,
-            }[sens_type],
-        )
+        return {
+            "temperature": cast(float, self.sensor.data.temperature),
+            "humidity": cast(float, self.sensor.data.humidity),
+            "pressure": cast(float, self.sensor.data.pressure),
+        }
@@ -2,8 +2,10 @@
 DHT11/DHT22/AM2302 temperature and humidity sensors
 """
 
+from typing import Dict
+
 from ...exceptions import RuntimeConfigError
-from ...types import CerberusSchemaType, ConfigType, PinType, SensorValueType
+from ...types import CerberusSchemaType, PinType, SensorValueType
 from . import GenericSensor
 
 REQUIREMENTS = ("adafruit-circuitpython-dht",)
@@ -52,19 +54,12 @@ class Sensor(GenericSensor):
 
         self.pin: PinType = Pin(self.config["pin"])
 
-    def get_value(self, sens_conf: ConfigType) -> SensorValueType:
+    def get_values(self) -> Dict[str, SensorValueType]:
         """
-        Get the temperature or humidity value from the sensor
+        Get the temperature and humidity values from a single read of the sensor
         """
         humidity: SensorValueType
         temperature: SensorValueType
         dht_device = self.sensor(self.pin, use_pulseio=False)
         humidity, temperature = dht_device.humidity, dht_device.temperature
-        if sens_conf["type"] == "temperature":
-            return temperature
-        if sens_conf["type"] == "humidity":
-            return humidity
-        raise RuntimeConfigError(
-            "dht22 sensor '%s' was not configured to return 'temperature' or 'humidity'"
-            % sens_conf["name"]
-        )
+        return {"temperature": temperature, "humidity": humidity}
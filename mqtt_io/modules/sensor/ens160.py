@@ -28,9 +28,10 @@ sensor_inputs:
     type: eco2
 """
 
-from typing import cast
+from typing import Dict, cast
 
-from ...types import CerberusSchemaType, ConfigType
+from ...types import CerberusSchemaType, SensorValueType
+from .. import BOARD_I2C_EXECUTOR_KEY
 from . import GenericSensor
 
 DEFAULT_CHIP_ADDR = 0x53
@@ -83,6 +84,8 @@ class Sensor(GenericSensor):
         Ideally these values would be read from a separate temperature/humdity sensor.
     """
 
+    EXECUTOR_KEY = BOARD_I2C_EXECUTOR_KEY
+
     SENSOR_SCHEMA: CerberusSchemaType = {
         "type": {
             "type": 'string',
@@ -104,8 +107,8 @@ class Sensor(GenericSensor):
         self.ens160.temperature_compensation = self.config["temperature_compensation"]
         self.ens160.humidity_compensation = self.config["humidity_compensation"]
 
-    def get_value(self, sens_conf: ConfigType) -> float:
-        """Return the sensor value in the configured type."""
+    def get_values(self) -> Dict[str, SensorValueType]:
+        """Return all of the sensor's values."""
 
         # data_validity  values:
         # NORMAL_OP - Normal operation,
@@ -119,10 +122,8 @@ class Sensor(GenericSensor):
         if self.ens160.data_validity == self.adafruit_ens160_module.INVALID_OUT:
             raise RuntimeError("ENS160 sensor is returning invalid output")
 
-        sens_type = sens_conf["type"]
-        return cast(
-            int,
-            {"aqi": self.ens160.AQI, "tvoc": self.ens160.TVOC, "eco2": self.ens160.eCO2}[
-                sens_type
-            ],
-        )
+        return {
+            "aqi": cast(int, self.ens160.AQI),
+            "tvoc": cast(int, self.ens160.TVOC),
+            "eco2": cast(int, self.ens160.eCO2),
+        }
@@ -20,10 +20,9 @@ INA219 DC current sensor
 # - shunt_voltage (in milli volt)
 
 import logging
-from typing import cast
+from typing import Dict, cast
 
-from ...exceptions import RuntimeConfigError
-from ...types import CerberusSchemaType, ConfigType, SensorValueType
+from ...types import CerberusSchemaType, SensorValueType
 from . import GenericSensor
 
 _LOG = logging.getLogger(__name__)
@@ -88,32 +87,31 @@ class Sensor(GenericSensor):
 
         self.ina.configure(vrange, gain)
 
-    def get_value(self, sens_conf: ConfigType) -> SensorValueType:
+    def get_values(self) -> Dict[str, SensorValueType]:
         # pylint: disable=import-outside-toplevel,import-error
         from ina219 import DeviceRangeError  # type: ignore
 
-        sens_type = sens_conf["type"]
+        # Only read the registers for the values that sensor inputs are configured for
+        types = {sens_conf["type"] for sens_conf in self.sensor_inputs}
 
         if self.config["low_power"]:
             self.ina.wake()
 
         try:
-            if sens_type == "power":
-                return cast(float, self.ina.power()) / 1000
-            if sens_type == "current":
-                return cast(float, self.ina.current()) / 1000
-            if sens_type == "bus_voltage":
-                return cast(float, self.ina.voltage())
-            if sens_type == "shunt_voltage":
-                return cast(float, self.ina.shunt_voltage())
-        except DeviceRangeError:
-            _LOG.exception("Current out of device range with specified shunt resistor")
-            return None
+            values: Dict[str, SensorValueType] = {}
+            if "bus_voltage" in types:
+                values["bus_voltage"] = cast(float, self.ina.voltage())
+            if "shunt_voltage" in types:
+                values["shunt_voltage"] = cast(float, self.ina.shunt_voltage())
+            try:
+                if "power" in types:
+                    values["power"] = cast(float, self.ina.power()) / 1000
+                if "current" in types:
+                    values["current"] = cast(float, self.ina.current()) / 1000
+            except DeviceRangeError:
+                _LOG.exception("Current out of device range with specified shunt resistor")
+                values["power"] = values["current"] = None
+            return values
         finally:
             if self.config["low_power"]:
                 self.ina.sleep()
-
-        raise RuntimeConfigError(
-            "ina219 sensor '%s' was not configured to return an accepted value"
-            % sens_conf["name"]
-        )
@@ -2,13 +2,18 @@
 Mock Sensor module for use with the tests.
 """
 
+import time
 from unittest.mock import Mock
 
 from ...types import ConfigType, SensorValueType
 from . import GenericSensor
 
 REQUIREMENTS = ()
-CONFIG_SCHEMA = {"test": {"type": 'boolean', "required": False, "default": False}}
+CONFIG_SCHEMA = {
+    "test": {"type": 'boolean', "required": False, "default": False},
+    # Simulate a module which takes a while to set up
+    "setup_delay": {"type": 'float', "required": False, "default": 0},
+}
 
 
 # pylint: disable=useless-super-delegation
@@ -17,10 +22,15 @@ class Sensor(GenericSensor):
     Mock Sensor class for use with the tests.
     """
 
+    SENSOR_SCHEMA = {
+        "type": {"type": 'string', "required": False, "empty": False},
+    }
+
     def __init__(self, config: ConfigType):
         self.setup_module = Mock()  # type: ignore[assignment]
         self.setup_sensor = Mock()  # type: ignore[assignment]
         self.get_value = Mock(return_value=1)  # type: ignore[assignment]
+        time.sleep(config["setup_delay"])
         super().__init__(config)
 
     def setup_module(self) -> None:
@@ -4,6 +4,7 @@ TSL2561 luminosity sensor
 from typing import cast
 
 from ...types import CerberusSchemaType, ConfigType, SensorValueType
+from .. import BOARD_I2C_EXECUTOR_KEY
 from . import GenericSensor
 
 REQUIREMENTS = ("adafruit-circuitpython-tsl2561",)
@@ -33,6 +34,8 @@ class Sensor(GenericSensor):
     Implementation of Sensor class for the Adafruit_TSL2561
     """
 
+    EXECUTOR_KEY = BOARD_I2C_EXECUTOR_KEY
+
     SENSOR_SCHEMA: CerberusSchemaType = {
         "type": {
             "type": 'string',
@@ -4,10 +4,10 @@ Contains the base class that is shared across all Stream modules.
 
 import asyncio
 from abc import ABC, abstractmethod
-from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 from ...types import ConfigType
+from .. import get_module_executor
 
 
 class GenericStream(ABC):
@@ -19,7 +19,7 @@ class GenericStream(ABC):
     def __init__(self, config: ConfigType):
         self.config = config
         self.setup_module()
-        self.executor = ThreadPoolExecutor()
+        self.executor = get_module_executor(config, "stream")
 
     @abstractmethod
     def setup_module(self) -> None:
@@ -39,6 +39,16 @@ class GenericStream(ABC):
         Write bytes to the stream.
         """
 
+    def fileno(self) -> Optional[int]:
+        """
+        Return a file descriptor which becomes readable when there's data waiting to be
+        read, so that the stream can be read as soon as data arrives. `read()` is then
+        called on the event loop, so it mustn't block.
+
+        Return None if the stream can only be polled, which is the default.
+        """
+        return None
+
     async def async_read(self) -> Optional[bytes]:
         """
         Use a ThreadPoolExecutor to call the module's synchronous read method.
@@ -0,0 +1,39 @@
+"""
+Mock Stream module for use with the tests.
+"""
+
+import os
+from typing import List, Optional
+
+from . import GenericStream
+
+REQUIREMENTS = ()
+CONFIG_SCHEMA = {"poll": {"type": 'boolean', "required": False, "default": False}}
+
+
+class Stream(GenericStream):
+    """
+    Mock Stream class for use with the tests. Data written to `pipe_in` can be read
+    from the stream, and data written to the stream is kept in `written`.
+    """
+
+    def setup_module(self) -> None:
+        self.pipe_out, self.pipe_in = os.pipe()
+        os.set_blocking(self.pipe_out, False)
+        self.written: List[bytes] = []
+
+    def fileno(self) -> Optional[int]:
+        return None if self.config["poll"] else self.pipe_out
+
+    def read(self) -> Optional[bytes]:
+        try:
+            return os.read(self.pipe_out, 4096) or None
+        except BlockingIOError:
+            return None
+
+    def write(self, data: bytes) -> None:
+        self.written.append(data)
+
+    def cleanup(self) -> None:
+        os.close(self.pipe_in)
+        os.close(self.pipe_out)
@@ -41,9 +41,6 @@ CONFIG_SCHEMA = {
 
 # pylint: disable=no-member
 
-# IDEA: Possible implementations -@flyte at 04/03/2021, 18:32:05
-# Use the asyncio event loop to fire a callback when data is available on the serial port?
-
 
 class Stream(GenericStream):
     """
@@ -82,6 +79,13 @@ class Stream(GenericStream):
     def read(self) -> Optional[bytes]:
         return self.ser.read(self.ser.in_waiting) or None
 
+    def fileno(self) -> Optional[int]:
+        # Serial ports only have a file descriptor on POSIX systems
+        try:
+            return int(self.ser.fileno())
+        except (AttributeError, OSError):
+            return None
+
     def write(self, data: bytes) -> None:
         self.ser.write(data)
 
@@ -4,7 +4,8 @@ Abstraction layer for MQTT clients to enable easier switching out.
 import abc
 import asyncio
 import ssl
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
 from enum import Enum, auto
 from importlib import import_module
 from typing import List, Optional, Tuple, Type
@@ -38,6 +39,10 @@ class MQTTMessageSend(MQTTMessage):
 
     qos: int = 0
     retain: bool = False
+    # Only sent when using MQTT v5
+    user_properties: Optional[List[Tuple[str, str]]] = None
+    # When the message was first queued to be sent, kept while it's in the outbox
+    created_at: float = field(default_factory=time.time, compare=False)
 
 
 @dataclass
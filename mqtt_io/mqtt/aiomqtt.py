@@ -10,6 +10,8 @@ from typing import Any, Callable, List, Optional, Tuple, TypeVar, cast
 
 from aiomqtt import Client, MqttError, Will, ProtocolVersion
 from paho.mqtt import client as paho
+from paho.mqtt.packettypes import PacketTypes
+from paho.mqtt.properties import Properties
 
 from . import (
     AbstractMQTTClient,
@@ -98,7 +100,10 @@ class MQTTClient(AbstractMQTTClient):
             tls_context=tls_context,
             protocol=protocol_map[options.protocol],
             will=will,
-            clean_session=options.clean_session,
+            # paho rejects clean_session under MQTT v5, which uses clean start instead
+            clean_session=(
+                None if options.protocol == MQTTProtocol.V5 else options.clean_session
+            ),
         )
         self._message_queue: Optional[asyncio.Queue[MQTTMessage]] = None
 
@@ -159,8 +164,18 @@ class MQTTClient(AbstractMQTTClient):
         Returns:
             None: This function does not return anything.
         """
+        properties = None
+        if msg.user_properties and self._options.protocol == MQTTProtocol.V5:
+            properties = Properties(  # type: ignore[no-untyped-call]
+                PacketTypes.PUBLISH
+            )
+            properties.UserProperty = msg.user_properties
         await self._client.publish(
-            topic=msg.topic, payload=msg.payload, qos=msg.qos, retain=msg.retain
+            topic=msg.topic,
+            payload=msg.payload,
+            qos=msg.qos,
+            retain=msg.retain,
+            properties=properties,
         )
 
     def _on_message(
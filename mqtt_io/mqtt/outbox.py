@@ -0,0 +1,374 @@
+"""
+Disk-backed store of MQTT messages which couldn't be sent because the broker was
+unavailable, so that they can be sent once it's back.
+
+Messages are appended to a log which is split into numbered segment files. Once the log
+grows beyond its maximum size, whole segments are deleted, oldest first. Messages are
+read back from the oldest segment in the order they were written, and the position that
+we've read up to is saved alongside the segments, so that a restart doesn't send the
+same messages again.
+"""
+
+import json
+import logging
+import os
+import struct
+import threading
+import zlib
+from dataclasses import dataclass
+from typing import BinaryIO, List, Optional, Tuple
+
+from . import MQTTMessageSend
+
+_LOG = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = ".seg"
+CURSOR_FILENAME = "cursor"
+
+# crc32, payload length, timestamp, qos, flags, topic length
+HEADER = struct.Struct("<IIdBBH")
+NO_PAYLOAD = 0xFFFFFFFF
+# Flags, which share a byte with the retain flag that older records have there
+FLAG_RETAIN = 0x01
+# The payload is followed by the user properties, as JSON prefixed with its length
+FLAG_USER_PROPERTIES = 0x02
+USER_PROPERTIES_LENGTH = struct.Struct("<I")
+
+
+@dataclass
+class OutboxRecord:
+    """
+    A message from the outbox, along with the time it was originally sent.
+    """
+
+    timestamp: float
+    msg: MQTTMessageSend
+
+
+def encode_record(record: OutboxRecord) -> bytes:
+    """
+    Serialise a record into bytes to be written to a segment.
+    """
+    msg = record.msg
+    topic = msg.topic.encode("utf8")
+    payload = b"" if msg.payload is None else bytes(msg.payload)
+    payload_len = NO_PAYLOAD if msg.payload is None else len(payload)
+    flags = FLAG_RETAIN if msg.retain else 0
+    user_properties = b""
+    if msg.user_properties:
+        flags |= FLAG_USER_PROPERTIES
+        props = json.dumps(msg.user_properties).encode("utf8")
+        user_properties = USER_PROPERTIES_LENGTH.pack(len(props)) + props
+    body = (
+        HEADER.pack(0, payload_len, record.timestamp, msg.qos, flags, len(topic))[4:]
+        + topic
+        + payload
+        + user_properties
+    )
+    return struct.pack("<I", zlib.crc32(body)) + body
+
+
+def decode_record(data: bytes, offset: int) -> Optional[Tuple[OutboxRecord, int]]:
+    """
+    Deserialise the record at `offset` in a segment's data. Returns the record and the
+    offset of the next one, or None if there isn't a complete, valid record there.
+    """
+    if len(data) - offset < HEADER.size:
+        return None
+    crc, payload_len, timestamp, qos, flags, topic_len = HEADER.unpack_from(data, offset)
+    payload_start = offset + HEADER.size + topic_len
+    end = payload_start
+    if payload_len != NO_PAYLOAD:
+        end += payload_len
+    props_end = end
+    if flags & FLAG_USER_PROPERTIES:
+        if len(data) < end + USER_PROPERTIES_LENGTH.size:
+            return None
+        props_end += USER_PROPERTIES_LENGTH.size
+        props_end += USER_PROPERTIES_LENGTH.unpack_from(data, end)[0]
+    if props_end > len(data) or zlib.crc32(data[offset + 4 : props_end]) != crc:
+        return None
+    msg = MQTTMessageSend(
+        data[offset + HEADER.size : payload_start].decode("utf8"),
+        None if payload_len == NO_PAYLOAD else data[payload_start:end],
+        qos=qos,
+        retain=bool(flags & FLAG_RETAIN),
+        created_at=timestamp,
+    )
+    if flags & FLAG_USER_PROPERTIES:
+        props = json.loads(data[end + USER_PROPERTIES_LENGTH.size : props_end])
+        msg.user_properties = [(str(name), str(value)) for name, value in props]
+    return OutboxRecord(timestamp, msg), props_end
+
+
+class Outbox:  # pylint: disable=too-many-instance-attributes
+    """
+    An append-only log of MQTT messages, split into segment files in `path`.
+    """
+
+    def __init__(self, path: str, max_size: int, segment_size: int):
+        self.path = path
+        self.max_size = max_size
+        self.segment_size = segment_size
+        os.makedirs(path, exist_ok=True)
+
+        self._segments: List[int] = sorted(
+            int(name[: -len(SEGMENT_SUFFIX)])
+            for name in os.listdir(path)
+            if name.endswith(SEGMENT_SUFFIX)
+        )
+        self._sizes = {
+            seg: os.path.getsize(self._segment_path(seg)) for seg in self._segments
+        }
+        self._writer: Optional[BinaryIO] = None
+        self._dirty = False
+        # Syncing and reading can be done from another thread, so that they don't block
+        # the loop
+        self._lock = threading.Lock()
+
+        # The segment and offset that we've read up to
+        self._read_segment, self._read_offset = self._load_cursor()
+        self._saved_cursor: Optional[Tuple[int, int]] = None
+        self._read_data: Optional[bytes] = None
+        # The segment and offset of the message last returned by peek(), and the offset
+        # of the one after it
+        self._peeked: Optional[Tuple[int, int, int]] = None
+        if not self._segments:
+            self._read_offset = 0
+        elif self._read_segment not in self._segments:
+            self._read_segment, self._read_offset = self._segments[0], 0
+        self._remove_finished_segments()
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.path, "%010d%s" % (segment, SEGMENT_SUFFIX))
+
+    def _load_cursor(self) -> Tuple[int, int]:
+        try:
+            with open(os.path.join(self.path, CURSOR_FILENAME), encoding="utf8") as cur:
+                segment, offset = cur.read().split()
+                return int(segment), int(offset)
+        except (OSError, ValueError):
+            return (self._segments[0] if self._segments else 0), 0
+
+    def _save_cursor(self) -> None:
+        cursor = (self._read_segment, self._read_offset)
+        if cursor == self._saved_cursor:
+            return
+        tmp_path = os.path.join(self.path, CURSOR_FILENAME + ".tmp")
+        with open(tmp_path, "w", encoding="utf8") as cur:
+            cur.write("%d %d" % cursor)
+        os.replace(tmp_path, os.path.join(self.path, CURSOR_FILENAME))
+        self._saved_cursor = cursor
+
+    @property
+    def size(self) -> int:
+        """
+        Total size of the segments on disk, in bytes.
+        """
+        return sum(self._sizes.values())
+
+    def empty(self) -> bool:
+        """
+        Whether there are any messages left to read.
+        """
+        with self._lock:
+            if not self._segments:
+                return True
+            last = self._segments[-1]
+            return self._read_segment == last and self._read_offset >= self._sizes[last]
+
+    def append(self, record: OutboxRecord) -> None:
+        """
+        Add a message to the end of the log. It's written to the OS straight away, but
+        isn't guaranteed to be on disk until `sync()` is called.
+        """
+        data = encode_record(record)
+        with self._lock:
+            if (
+                self._writer is None
+                or not self._segments
+                or self._sizes[self._segments[-1]] + len(data) > self.segment_size
+            ):
+                self._start_segment()
+            assert self._writer is not None
+            self._writer.write(data)
+            self._writer.flush()
+            self._sizes[self._segments[-1]] += len(data)
+            self._dirty = True
+            self._evict()
+
+    def sync(self) -> None:
+        """
+        Make sure that everything written so far is on disk, and save how far we've read.
+        """
+        with self._lock:
+            self._sync()
+
+    def _sync(self) -> None:
+        if self._writer is not None and self._dirty:
+            os.fsync(self._writer.fileno())
+            self._dirty = False
+        self._save_cursor()
+
+    def peek(self) -> Optional[OutboxRecord]:
+        """
+        Get the oldest unread message from the log, or None if there aren't any. It stays
+        unread until `commit()` is called, so it isn't lost if it can't be sent.
+
+        This reads whole segments from disk, so should be called from an executor. The
+        lock isn't held while reading, so that appending doesn't have to wait for it.
+        """
+        while True:
+            with self._lock:
+                if not self._segments:
+                    return None
+                segment, data = self._read_segment, self._read_data
+            fresh = data is None
+            if data is None:
+                try:
+                    with open(self._segment_path(segment), "rb") as seg:
+                        data = seg.read()
+                except OSError:
+                    with self._lock:
+                        if segment == self._read_segment:
+                            raise
+                    # It was evicted while we were reading it
+                    continue
+            with self._lock:
+                if segment != self._read_segment:
+                    # It was evicted while we were reading it
+                    continue
+                decoded = decode_record(data, self._read_offset)
+                if decoded is not None:
+                    record, next_offset = decoded
+                    self._peeked = (segment, self._read_offset, next_offset)
+                    self._read_data = data
+                    return record
+                self._read_data = None
+                if not fresh:
+                    # More may have been written to the segment since we read it
+                    continue
+                if segment == self._segments[-1]:
+                    # Skip over anything that was only partly written, for example if
+                    # we crashed while writing it. We're at the end of the log otherwise.
+                    self._read_offset = self._sizes[segment]
+                    return None
+                self._next_read_segment()
+
+    def commit(self) -> None:
+        """
+        Mark the message last returned by `peek()` as read, unless it has been evicted
+        since.
+        """
+        with self._lock:
+            if self._peeked is None:
+                return
+            segment, offset, next_offset = self._peeked
+            self._peeked = None
+            if (segment, offset) == (self._read_segment, self._read_offset):
+                self._read_offset = next_offset
+
+    def prepend(self, records: List[OutboxRecord]) -> None:
+        """
+        Put messages in front of the unread ones, such as those which were taken from
+        the log or never stored in it, but which weren't sent before shutting down.
+
+        The unread part of the segment being read is rewritten with the messages in
+        front of it, and the current segment is closed, so that new messages go into a
+        new one.
+        """
+        if not records:
+            return
+        with self._lock:
+            self._peeked = None
+            if self._writer is not None:
+                self._sync()
+                self._writer.close()
+                self._writer = None
+            if not self._segments:
+                self._segments.append(self._read_segment)
+                self._sizes[self._read_segment] = 0
+                self._read_offset = 0
+            segment = self._read_segment
+            path = self._segment_path(segment)
+            try:
+                with open(path, "rb") as seg:
+                    seg.seek(self._read_offset)
+                    unread = seg.read()
+            except FileNotFoundError:
+                unread = b""
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as seg:
+                for record in records:
+                    seg.write(encode_record(record))
+                seg.write(unread)
+                seg.flush()
+                os.fsync(seg.fileno())
+            # Save the cursor first, so that crashing before the segment is replaced
+            # sends the start of it again rather than losing the messages in it
+            self._read_offset = 0
+            self._read_data = None
+            self._save_cursor()
+            os.replace(tmp_path, path)
+            self._sizes[segment] = os.path.getsize(path)
+
+    def close(self) -> None:
+        """
+        Sync and close the current segment.
+        """
+        with self._lock:
+            self._sync()
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    def _start_segment(self) -> None:
+        if self._writer is not None:
+            self._sync()
+            self._writer.close()
+        segment = self._segments[-1] + 1 if self._segments else self._read_segment
+        self._segments.append(segment)
+        self._sizes[segment] = 0
+        # pylint: disable=consider-using-with
+        self._writer = open(self._segment_path(segment), "ab")
+
+    def _next_read_segment(self) -> None:
+        """
+        Move reading on to the next segment, deleting the one we've finished.
+        """
+        finished = self._read_segment
+        self._read_segment = self._segments[self._segments.index(finished) + 1]
+        self._read_offset = 0
+        self._read_data = None
+        self._delete_segment(finished)
+
+    def _remove_finished_segments(self) -> None:
+        for segment in list(self._segments):
+            if segment < self._read_segment:
+                self._delete_segment(segment)
+
+    def _delete_segment(self, segment: int) -> None:
+        self._segments.remove(segment)
+        del self._sizes[segment]
+        try:
+            os.remove(self._segment_path(segment))
+        except OSError:
+            _LOG.exception("Unable to remove outbox segment %s", segment)
+
+    def _evict(self) -> None:
+        """
+        Delete the oldest segments until we're within `max_size`, keeping the one that's
+        being written to. Must be called with the lock held.
+        """
+        while len(self._segments) > 1 and self.size > self.max_size:
+            oldest = self._segments[0]
+            _LOG.warning(
+                "MQTT outbox is over its maximum size of %s bytes, so dropping the oldest "
+                "%s bytes of messages",
+                self.max_size,
+                self._sizes[oldest],
+            )
+            if oldest == self._read_segment:
+                self._next_read_segment()
+            else:
+                self._delete_segment(oldest)
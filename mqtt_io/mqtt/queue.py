@@ -0,0 +1,185 @@
+"""
+Queue of messages and subscriptions waiting to be sent to the MQTT broker.
+"""
+
+import asyncio
+import logging
+from bisect import insort
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Union
+
+from . import MQTTMessageSend
+
+_LOG = logging.getLogger(__name__)
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+LAST_VALUE = "last_value"
+OVERFLOW_POLICIES = (DROP_OLDEST, DROP_NEWEST, LAST_VALUE)
+
+# Only warn about every this many messages dropped, so that we don't flood the logs
+DROP_WARNING_INTERVAL = 1000
+
+
+@dataclass
+class MQTTSubscribe:
+    """
+    Request to subscribe to MQTT topics.
+    """
+
+    topics: List[str]
+
+
+MQTTRequest = Union[MQTTMessageSend, MQTTSubscribe]
+
+
+@dataclass
+class MQTTQueueEntry:
+    """
+    A request waiting in the queue, along with its priority.
+    """
+
+    priority: int
+    request: MQTTRequest
+
+    @property
+    def key(self) -> Optional[str]:
+        """
+        Requests with the same key must be sent in the order they were queued. This is
+        the topic for messages, and None for subscriptions.
+        """
+        if isinstance(self.request, MQTTMessageSend):
+            return self.request.topic
+        return None
+
+
+class MQTTSendQueue:  # pylint: disable=too-many-instance-attributes
+    """
+    A priority queue of MQTT requests which is first-in-first-out within each priority.
+    Lower numbers come out first.
+
+    Subscriptions which are queued one after another are merged into one, so that they
+    can be sent to the broker together.
+
+    If `maxsize` is set, then once the queue is full, a request is dropped for every new
+    one that's added, depending on `overflow`:
+    - `drop_oldest` drops the oldest request from the lowest priority.
+    - `drop_newest` drops the new request.
+    - `last_value` replaces the queued message on the same topic with the new one, or
+      drops the oldest if there isn't one.
+    """
+
+    def __init__(self, maxsize: int = 0, overflow: str = DROP_OLDEST):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError("Unknown overflow policy %r" % overflow)
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.dropped = 0
+        self._queues: Dict[int, Deque[MQTTQueueEntry]] = {}
+        self._priorities: List[int] = []
+        self._by_topic: Dict[str, MQTTQueueEntry] = {}
+        self._size = 0
+        self._not_empty = asyncio.Event()
+
+    def qsize(self) -> int:
+        """
+        Number of requests in the queue.
+        """
+        return self._size
+
+    def empty(self) -> bool:
+        """
+        Whether the queue is empty.
+        """
+        return self._size == 0
+
+    def full(self) -> bool:
+        """
+        Whether the queue has reached its `maxsize`.
+        """
+        return bool(self.maxsize) and self._size >= self.maxsize
+
+    def put_nowait(self, request: MQTTRequest, priority: int) -> None:
+        """
+        Add a request to the queue, making room for it if the queue is full.
+        """
+        if isinstance(request, MQTTSubscribe):
+            queue = self._queues.get(priority)
+            if queue and isinstance(queue[-1].request, MQTTSubscribe):
+                queue[-1].request = MQTTSubscribe(queue[-1].request.topics + request.topics)
+                return
+
+        entry = MQTTQueueEntry(priority, request)
+        if self.full():
+            key = entry.key
+            if self.overflow == LAST_VALUE and key is not None:
+                queued = self._by_topic.get(key)
+                if queued is not None:
+                    queued.request = request
+                    return
+            if self.overflow == DROP_NEWEST:
+                self._dropped(entry)
+                return
+            self._dropped(self._pop(oldest_least_important=True))
+
+        queue = self._queues.get(priority)
+        if queue is None:
+            queue = self._queues[priority] = deque()
+            insort(self._priorities, priority)
+        queue.append(entry)
+        if entry.key is not None:
+            self._by_topic[entry.key] = entry
+        self._size += 1
+        self._not_empty.set()
+
+    def get_nowait(self) -> MQTTQueueEntry:
+        """
+        Take the oldest of the most important requests from the queue.
+        """
+        if not self._size:
+            raise asyncio.QueueEmpty()
+        return self._pop()
+
+    async def get(self) -> MQTTQueueEntry:
+        """
+        Take the oldest of the most important requests from the queue, waiting for one
+        to be added if it's empty.
+        """
+        while not self._size:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        return self._pop()
+
+    def _pop(self, oldest_least_important: bool = False) -> MQTTQueueEntry:
+        """
+        Remove and return the oldest entry from the most (or least) important priority.
+        """
+        priorities = (
+            reversed(self._priorities) if oldest_least_important else self._priorities
+        )
+        for priority in priorities:
+            queue = self._queues[priority]
+            if queue:
+                entry = queue.popleft()
+                break
+        else:
+            raise asyncio.QueueEmpty()
+        self._size -= 1
+        key = entry.key
+        if key is not None and self._by_topic.get(key) is entry:
+            del self._by_topic[key]
+        return entry
+
+    def _dropped(self, entry: MQTTQueueEntry) -> None:
+        """
+        Keep count of dropped requests, and warn about them now and then.
+        """
+        self.dropped += 1
+        if self.dropped % DROP_WARNING_INTERVAL == 1:
+            _LOG.warning(
+                "MQTT send queue is full (%s), so dropped %s: %s request(s) dropped so far",
+                self.maxsize,
+                entry.request,
+                self.dropped,
+            )
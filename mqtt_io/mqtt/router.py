@@ -0,0 +1,97 @@
+"""
+Routing of inbound MQTT messages to the handlers for the topics they were sent to.
+
+Routes are added once, when we know which topics we'll subscribe to, so that dispatching
+a message is a single dict lookup on its topic. Routes for topic filters containing
+wildcards are kept in a trie of topic levels, which is only walked if there are any.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List
+
+# Called with the topic, the payload and the route's target
+RouteHandler = Callable[[str, bytes, Any], Awaitable[None]]
+
+SINGLE_LEVEL_WILDCARD = "+"
+MULTI_LEVEL_WILDCARD = "#"
+
+
+@dataclass
+class Route:
+    """
+    A handler for messages on a topic, and the thing (such as an output's config) that
+    they're for.
+    """
+
+    handler: RouteHandler
+    target: Any = None
+
+
+@dataclass
+class _TrieNode:
+    children: Dict[str, "_TrieNode"] = field(default_factory=dict)
+    routes: List[Route] = field(default_factory=list)
+
+
+class TopicRouter:
+    """
+    Maps MQTT topics, and topic filters with `+` and `#` wildcards, to routes.
+    """
+
+    def __init__(self) -> None:
+        self._exact: Dict[str, List[Route]] = {}
+        self._wildcards = _TrieNode()
+        self._has_wildcards = False
+
+    def add(self, topic_filter: str, handler: RouteHandler, target: Any = None) -> None:
+        """
+        Route messages on topics matching `topic_filter` to `handler`.
+        """
+        route = Route(handler, target)
+        levels = topic_filter.split("/")
+        if SINGLE_LEVEL_WILDCARD not in levels and MULTI_LEVEL_WILDCARD not in levels:
+            self._exact.setdefault(topic_filter, []).append(route)
+            return
+        if MULTI_LEVEL_WILDCARD in levels[:-1]:
+            raise ValueError(
+                "%r may only be used as the last level of a topic filter: %r"
+                % (MULTI_LEVEL_WILDCARD, topic_filter)
+            )
+        node = self._wildcards
+        for level in levels:
+            node = node.children.setdefault(level, _TrieNode())
+        node.routes.append(route)
+        self._has_wildcards = True
+
+    def match(self, topic: str) -> List[Route]:
+        """
+        Get the routes for a topic, or an empty list if there aren't any.
+        """
+        routes = self._exact.get(topic, [])
+        if not self._has_wildcards:
+            return routes
+        return routes + self._match_wildcards(topic.split("/"))
+
+    def _match_wildcards(self, levels: List[str]) -> List[Route]:
+        routes: List[Route] = []
+        nodes = [self._wildcards]
+        for level in levels:
+            next_nodes: List[_TrieNode] = []
+            for node in nodes:
+                multi = node.children.get(MULTI_LEVEL_WILDCARD)
+                if multi is not None:
+                    routes.extend(multi.routes)
+                for key in (level, SINGLE_LEVEL_WILDCARD):
+                    child = node.children.get(key)
+                    if child is not None:
+                        next_nodes.append(child)
+            nodes = next_nodes
+            if not nodes:
+                return routes
+        for node in nodes:
+            routes.extend(node.routes)
+            # "a/#" also matches "a" itself
+            multi = node.children.get(MULTI_LEVEL_WILDCARD)
+            if multi is not None:
+                routes.extend(multi.routes)
+        return routes
@@ -0,0 +1,100 @@
+"""
+High-rate sampling of sensors from a thread of their own.
+
+Reading a sensor through the event loop costs a task, a trip through an executor and a
+SensorReadEvent per reading, which is fine once a second but too much at 100 Hz. A
+Sampler reads the sensor on a fixed schedule from its own thread, waiting for each read
+to be made on the module's executor, and keeps the timestamped readings in a ring buffer,
+which the event loop drains in batches.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, List, Tuple
+
+from .types import SensorValueType
+
+_LOG = logging.getLogger(__name__)
+
+# Timestamp on the monotonic clock and the value that was read
+SampleType = Tuple[float, float]
+
+
+class Sampler:  # pylint: disable=too-many-instance-attributes
+    """
+    Repeatedly calls `read` every `interval` seconds in a background thread.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        read: Callable[[], SensorValueType],
+        interval: float,
+        buffer_size: int,
+    ):
+        self.name = name
+        self.read = read
+        self.interval = interval
+        self.samples: Deque[SampleType] = deque(maxlen=buffer_size)
+        # Number of reads which failed since this was last reset by whoever drains the
+        # samples. Only the first of them is logged in full, to avoid flooding the log.
+        self.errors = 0
+        # Number of samples lost because the buffer filled up before it was drained
+        self.dropped = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=f"mqtt_io-sampler-{name}", daemon=True
+        )
+
+    def start(self) -> None:
+        """
+        Start sampling.
+        """
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop sampling and wait for the thread to finish.
+        """
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def drain(self) -> List[SampleType]:
+        """
+        Take all of the samples that have been read since the last drain.
+        """
+        samples: List[SampleType] = []
+        # popleft() is atomic, so this is safe while the thread is appending
+        while True:
+            try:
+                samples.append(self.samples.popleft())
+            except IndexError:
+                return samples
+
+    def _run(self) -> None:
+        """
+        Read the sensor at fixed deadlines until we're stopped. If a read overruns its
+        deadline, the missed deadlines are skipped rather than caught up on.
+        """
+        deadline = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                value = self.read()
+            except Exception:  # pylint: disable=broad-except
+                self.errors += 1
+                if self.errors == 1:
+                    _LOG.exception("Exception when sampling sensor %r:", self.name)
+            else:
+                if value is not None:
+                    if len(self.samples) == self.samples.maxlen:
+                        self.dropped += 1
+                    self.samples.append((time.monotonic(), value))
+
+            deadline += self.interval
+            now = time.monotonic()
+            if deadline < now:
+                deadline += ((now - deadline) // self.interval + 1) * self.interval
+            self._stop.wait(deadline - now)
@@ -0,0 +1,213 @@
+"""
+Scheduler for running periodic jobs, such as polling inputs, sensors and streams.
+
+All of the jobs are driven by a single timer on the event loop, which is always armed for
+the earliest deadline. Deadlines are absolute times on the loop's monotonic clock, so the
+time taken to run a job isn't added on to its period.
+"""
+
+import asyncio
+import heapq
+import logging
+import random
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Callable, Coroutine, List, Optional, Set, Tuple
+
+_LOG = logging.getLogger(__name__)
+
+JobCallbackType = Callable[[], Coroutine[Any, Any, None]]
+
+# Jobs which are due within this many seconds of each other are run together
+COALESCE_WINDOW = 0.001
+
+
+@dataclass
+class Job:  # pylint: disable=too-many-instance-attributes
+    """
+    A periodic job, along with the accounting of its runs.
+    """
+
+    name: str
+    interval: float
+    callback: JobCallbackType
+    phase: float = 0.0
+    jitter: float = 0.0
+
+    # The next (un-jittered) deadline for this job on the loop's clock
+    deadline: float = 0.0
+    runs: int = 0
+    # Number of runs skipped because the previous run hadn't finished yet, or because
+    # the loop was too busy to run the job before its next deadline came around.
+    overruns: int = 0
+    # The latest that the job has been started after its deadline, in seconds
+    max_lateness: float = 0.0
+    cancelled: bool = False
+    task: Optional["asyncio.Task[None]"] = field(default=None, repr=False)
+
+    def cancel(self) -> None:
+        """
+        Stop the job from being run again.
+        """
+        self.cancelled = True
+
+
+class Scheduler:  # pylint: disable=too-many-instance-attributes
+    """
+    Runs periodic jobs from a single timer on the event loop.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, jitter: float = 0.0):
+        self._loop = loop
+        self._jitter = jitter
+        self._heap: List[Tuple[float, int, Job]] = []
+        self._seq = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_when: Optional[float] = None
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        self.jobs: List[Job] = []
+
+    def add_job(
+        self,
+        name: str,
+        interval: float,
+        callback: JobCallbackType,
+        phase: float = 0.0,
+        jitter: Optional[float] = None,
+    ) -> Job:
+        """
+        Run `callback` every `interval` seconds, starting `phase` seconds from now.
+
+        If `jitter` is set (or the scheduler was created with a default jitter), then each
+        run is delayed by a random amount of up to that many seconds, without affecting
+        the deadline of the following run.
+        """
+        if interval <= 0:
+            raise ValueError("Job interval must be greater than zero. Got %r." % interval)
+        job = Job(
+            name=name,
+            interval=interval,
+            callback=callback,
+            phase=phase,
+            jitter=self._jitter if jitter is None else jitter,
+            deadline=self._loop.time() + phase,
+        )
+        self.jobs.append(job)
+        self._push(job)
+        self._arm()
+        return job
+
+    def remove_job(self, job: Job) -> None:
+        """
+        Stop running a job. It's removed from the timer lazily, next time it's due.
+        """
+        job.cancel()
+        try:
+            self.jobs.remove(job)
+        except ValueError:
+            pass
+
+    async def stop(self) -> None:
+        """
+        Stop the timer and cancel any jobs which are currently running.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+            self._timer_when = None
+        for job in self.jobs:
+            job.cancel()
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _push(self, job: Job) -> None:
+        """
+        Add the job to the heap for its next deadline.
+        """
+        when = job.deadline
+        if job.jitter:
+            when += random.uniform(0, job.jitter)
+        self._seq += 1
+        heapq.heappush(self._heap, (when, self._seq, job))
+
+    def _arm(self) -> None:
+        """
+        Make sure that the timer is armed for the earliest deadline on the heap.
+        """
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return
+        when = self._heap[0][0]
+        if self._timer_when is not None and self._timer_when <= when:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = self._loop.call_at(when, self._on_timer)
+        self._timer_when = when
+
+    def _on_timer(self) -> None:
+        """
+        Run every job that's due, schedule their next runs and re-arm the timer for the
+        earliest remaining deadline.
+        """
+        self._timer = None
+        self._timer_when = None
+        now = self._loop.time()
+        due: List[Job] = []
+        while self._heap and self._heap[0][0] <= now + COALESCE_WINDOW:
+            _, _, job = heapq.heappop(self._heap)
+            if not job.cancelled:
+                due.append(job)
+
+        for job in due:
+            self._run(job, now)
+            self._advance(job, now)
+            self._push(job)
+        self._arm()
+
+    def _run(self, job: Job, now: float) -> None:
+        """
+        Start a task for the job, unless it's still running from its last deadline.
+        """
+        if job.task is not None and not job.task.done():
+            job.overruns += 1
+            _LOG.debug(
+                "Job %r is still running from its last deadline, so skipping this run "
+                "(%s overrun(s) so far)",
+                job.name,
+                job.overruns,
+            )
+            return
+        job.runs += 1
+        job.max_lateness = max(job.max_lateness, now - job.deadline)
+        task = self._loop.create_task(job.callback())
+        job.task = task
+        self._tasks.add(task)
+        task.add_done_callback(partial(self._job_done, job))
+
+    def _job_done(self, job: Job, task: "asyncio.Task[None]") -> None:
+        """
+        Stop tracking a job's task once it's done and log any exception it raised.
+        """
+        self._tasks.discard(task)
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc is not None:
+            _LOG.error("Exception in periodic job %r:", job.name, exc_info=exc)
+
+    @staticmethod
+    def _advance(job: Job, now: float) -> None:
+        """
+        Move the job's deadline on by one interval. If we've fallen more than a whole
+        interval behind, skip the missed deadlines and count them as overruns, rather
+        than running the job several times in quick succession to catch up.
+        """
+        job.deadline += job.interval
+        if job.deadline <= now:
+            missed = int((now - job.deadline) // job.interval) + 1
+            job.overruns += missed
+            job.deadline += missed * job.interval
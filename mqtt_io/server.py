@@ -9,20 +9,36 @@ and setting their values and data, connecting to MQTT and sending/receiving MQTT
 # pylint: disable=too-many-lines
 
 import asyncio
+import json
 import logging
-import re
 import signal as signals
 import threading
+import time
 from asyncio.queues import QueueEmpty
 from functools import partial
 from hashlib import sha1
 from importlib import import_module
-from typing import Any, Dict, List, Optional, Tuple, Type, Union, overload
+from types import ModuleType
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+    cast,
+    overload,
+)
 from aiomqtt import MqttCodeError
 
 import backoff
 from typing_extensions import Literal
 
+from .aggregation import Aggregator
 from .config import (
     get_main_schema_section,
     validate_and_normalise_config,
@@ -45,6 +61,8 @@ from .constants import (
     SET_SUFFIX,
     STREAM_TOPIC,
 )
+from .counter import PulseCounter
+from .debounce import DebounceFilter
 from .events import (
     DigitalInputChangedEvent,
     DigitalOutputChangedEvent,
@@ -54,13 +72,21 @@ from .events import (
     StreamDataSentEvent,
     StreamDataSubscribeEvent,
     DigitalSubscribeEvent,
+    Timestamp,
 )
+from .exceptions import RuntimeConfigError
+from .framing import Framer, make_framer
 from .home_assistant import (
     hass_announce_digital_input,
     hass_announce_digital_output,
     hass_announce_sensor_input,
 )
-from .modules import install_missing_module_requirements
+from .modules import (
+    EXECUTORS,
+    executor_key,
+    install_missing_module_requirements,
+    install_missing_modules_requirements,
+)
 from .modules.gpio import GenericGPIO, InterruptEdge, InterruptSupport, PinDirection
 from .modules.sensor import GenericSensor
 from .modules.stream import GenericStream
@@ -69,14 +95,46 @@ from .mqtt import (
     MQTTClientOptions,
     MQTTException,
     MQTTMessageSend,
+    MQTTProtocol,
     MQTTTLSOptions,
     MQTTWill,
 )
+from .interrupts import COALESCE_LAST, InterruptQueue, InterruptRecordType
+from .mqtt.outbox import Outbox, OutboxRecord
+from .mqtt.queue import MQTTQueueEntry, MQTTSendQueue, MQTTSubscribe
+from .mqtt.router import TopicRouter
+from .sampler import Sampler
+from .scheduler import Scheduler
 from .types import ConfigType, PinType, SensorValueType
-from .utils import PriorityCoro, create_unawaited_task_threadsafe
+from .utils import TaskSet, create_unawaited_task_threadsafe
 
 _LOG = logging.getLogger(__name__)
 
+MQTT_PROTOCOLS = {
+    "3.1": MQTTProtocol.V31,
+    "3.1.1": MQTTProtocol.V311,
+    "5": MQTTProtocol.V5,
+}
+
+
+def _import_module(module_config: ConfigType, module_type: str) -> ModuleType:
+    """
+    Import the Python module for a module config.
+    """
+    return import_module(
+        "%s.%s.%s" % (MODULE_IMPORT_PATH, module_type, module_config["module"])
+    )
+
+
+def _install_modules_requirements(module_configs: List[Tuple[str, ConfigType]]) -> None:
+    """
+    Install any missing requirements for all of the modules at once.
+    """
+    install_missing_modules_requirements(
+        _import_module(module_config, module_type)
+        for module_type, module_config in module_configs
+    )
+
 
 @overload
 def _init_module(
@@ -115,30 +173,28 @@ def _init_module(
     - Installing any missing requirements for it
     - Instantiating its class
     """
-    module = import_module(
-        "%s.%s.%s" % (MODULE_IMPORT_PATH, module_type, module_config["module"])
-    )
+    module_class, module_config = _load_module(module_config, module_type)
+    if install_requirements:
+        install_missing_module_requirements(_import_module(module_config, module_type))
+    return module_class(module_config)
+
+
+def _load_module(
+    module_config: ConfigType, module_type: str
+) -> Tuple[Type[Union[GenericGPIO, GenericSensor, GenericStream]], ConfigType]:
+    """
+    Import a module and validate its config, returning its class and normalised config.
+    """
+    module = _import_module(module_config, module_type)
     # Doesn't need to be a deep copy because we're not mutating the base rules
     module_schema = get_main_schema_section(f"{module_type}_modules")
     # Add the module's config schema to the base schema
     module_schema.update(getattr(module, "CONFIG_SCHEMA", {}))
     module_config = validate_and_normalise_config(module_config, module_schema)
-    if install_requirements:
-        install_missing_module_requirements(module)
     module_class: Type[Union[GenericGPIO, GenericSensor, GenericStream]] = getattr(
         module, MODULE_CLASS_NAMES[module_type]
     )
-    return module_class(module_config)
-
-
-def output_name_from_topic(topic: str, prefix: str, topic_type: str) -> str:
-    """
-    Parses an MQTT topic and returns the name of the output that the message relates to.
-    """
-    match = re.match(f"^{prefix}/{topic_type}/(.+?)/.+$", topic)
-    if match is None:
-        raise ValueError("Topic %r does not adhere to expected structure" % topic)
-    return match.group(1)
+    return module_class, module_config
 
 
 class MqttIo:  # pylint: disable=too-many-instance-attributes
@@ -168,6 +224,11 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
         # We've completed our initialisation, connected to MQTT and are ready to send and
         # receive messages.
         self.running: threading.Event = threading.Event()
+        # All of the modules and their IO have been initialised
+        self.initialised = False
+        self._init_task: Optional["asyncio.Task[None]"] = None
+        # Modules which were constructed ahead of time, by type and name
+        self._prepared_modules: Dict[Tuple[str, str], Any] = {}
 
         # GPIO
         self.gpio_configs: Dict[str, ConfigType] = {}
@@ -175,15 +236,28 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
         self.digital_output_configs: Dict[str, ConfigType] = {}
         self.gpio_modules: Dict[str, GenericGPIO] = {}
 
+        # Handlers for the topics we subscribe to
+        self.mqtt_routes = TopicRouter()
+
         # Sensor
         self.sensor_configs: Dict[str, ConfigType] = {}
         self.sensor_input_configs: Dict[str, ConfigType] = {}
+        self.sensor_last_published: Dict[str, Tuple[SensorValueType, float]] = {}
+        self.sensor_aggregators: Dict[str, Aggregator] = {}
+        self.sensor_samplers: Dict[str, Sampler] = {}
         self.sensor_modules: Dict[str, GenericSensor] = {}
 
         # Stream
         self.stream_configs: Dict[str, ConfigType] = {}
         self.stream_modules: Dict[str, GenericStream] = {}
         self.stream_output_queues = {}  # type: Dict[str, asyncio.Queue[bytes]]
+        self.stream_framers: Dict[str, Framer] = {}
+        # File descriptors of the streams we read as soon as they have data
+        self.stream_readers: Dict[str, int] = {}
+        # Data read from streams with an idle_timeout, until the stream goes quiet
+        self.stream_buffers: Dict[str, bytearray] = {}
+        self.stream_last_read: Dict[str, float] = {}
+        self.stream_idle_timers: Dict[str, asyncio.TimerHandle] = {}
 
         self.gpio_output_queues = (
             {}
@@ -192,24 +266,59 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
         self.loop = loop or asyncio.get_event_loop()
         self._main_task: Optional["asyncio.Task[None]"] = None
         self.critical_tasks: List["asyncio.Task[Any]"] = []
-        self.transient_tasks: List["asyncio.Task[Any]"] = []
+        self.transient_tasks = TaskSet()
 
         self.event_bus = EventBus(self.loop, self.transient_tasks)
+        self.scheduler = Scheduler(self.loop, jitter=self.config["options"]["poll_jitter"])
+        EXECUTORS.max_threads = self.config["options"]["executor_threads"]
         self.mqtt: Optional[AbstractMQTTClient] = None
+        self.outbox: Optional[Outbox] = None
+        outbox_conf: Optional[ConfigType] = self.config["mqtt"]["outbox"]
+        if outbox_conf is not None:
+            self.outbox = Outbox(
+                outbox_conf["path"], outbox_conf["max_size"], outbox_conf["segment_size"]
+            )
+            self.scheduler.add_job(
+                "MQTT outbox sync", outbox_conf["fsync_interval"], self._sync_outbox
+            )
         self.interrupt_locks: Dict[str, threading.Lock] = {}
+        self.interrupt_queue = InterruptQueue(
+            self.loop, self.config["options"]["interrupt_queue_size"], self.handle_interrupts
+        )
+        self.digital_input_filters: Dict[str, Tuple[DebounceFilter, int]] = {}
+        self.pulse_counters: Dict[str, PulseCounter] = {}
+        # Pins whose remote interrupts arrived while they were already being handled
+        self.pending_remote_interrupts: Set[str] = set()
 
-        self.mqtt_task_queue: "asyncio.PriorityQueue[PriorityCoro]"
+        self.mqtt_task_queue: MQTTSendQueue
         self.mqtt_connected: asyncio.Event
 
         async def create_loop_resources() -> None:
             """
             Create non-threadsafe resources on the loop we're going to use.
             """
-            self.mqtt_task_queue = asyncio.PriorityQueue()
+            self.mqtt_task_queue = MQTTSendQueue(
+                self.config["mqtt"]["queue_size"], self.config["mqtt"]["queue_overflow"]
+            )
             self.mqtt_connected = asyncio.Event()
 
         self.loop.run_until_complete(create_loop_resources())
 
+    def _call_on_loop(self, func: Callable[[], None]) -> None:
+        """
+        Call a function which creates non-threadsafe resources, such as queues, so that
+        they're created on the loop we're going to use. If the loop's already running,
+        then we're being called from it, so the function's called straight away.
+        """
+        if self.loop.is_running():
+            func()
+            return
+
+        async def call() -> None:
+            func()
+
+        self.loop.run_until_complete(call())
+
     def _init_mqtt_config(self) -> None:
         """
         Initializes the MQTT configuration.
@@ -253,6 +362,7 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
             keepalive=config["keepalive"],
             clean_session=config["clean_session"],
             tls_options=tls_options,
+            protocol=MQTT_PROTOCOLS[config["protocol"]],
             will=MQTTWill(
                 topic="/".join((topic_prefix, config["status_topic"])),
                 payload=config["status_payload_dead"].encode("utf8"),
@@ -270,9 +380,69 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
         self.gpio_configs = {x["name"]: x for x in self.config["gpio_modules"]}
         self.gpio_modules = {}
         for gpio_config in self.config["gpio_modules"]:
-            self.gpio_modules[gpio_config["name"]] = _init_module(
-                gpio_config, "gpio", self.config["options"]["install_requirements"]
+            self.gpio_modules[gpio_config["name"]] = self._get_module(gpio_config, "gpio")
+
+    def _get_module(self, module_config: ConfigType, module_type: str) -> Any:
+        """
+        Get the module for a module config, if it was constructed ahead of time by
+        `_construct_modules()`, or construct it now otherwise.
+        """
+        module = self._prepared_modules.pop((module_type, module_config["name"]), None)
+        if module is None:
+            init_module: Callable[..., Any] = _init_module
+            module = init_module(
+                module_config, module_type, self.config["options"]["install_requirements"]
+            )
+        return module
+
+    async def _construct_modules(self) -> None:
+        """
+        Construct all of the GPIO, sensor and stream modules on the executors for the
+        buses or devices that they use, so that modules on different buses are set up
+        at the same time, and those on the same bus are set up one after another.
+        Setting a module up can take a long time, for example to install its
+        requirements or to wait for its hardware to warm up.
+        """
+        to_construct = [
+            (module_type, module_config)
+            for module_type in ("gpio", "sensor", "stream")
+            for module_config in self.config[f"{module_type}_modules"]
+        ]
+        if not to_construct:
+            return
+        if self.config["options"]["install_requirements"]:
+            # Check everything's requirements together, and run pip at most once
+            await self.loop.run_in_executor(
+                None, _install_modules_requirements, to_construct
+            )
+        loaded = await self.loop.run_in_executor(
+            None,
+            lambda: [
+                _load_module(module_config, module_type)
+                for module_type, module_config in to_construct
+            ],
+        )
+        modules = await asyncio.gather(
+            *(
+                self.loop.run_in_executor(
+                    # The same executor that the module will use once it's constructed
+                    EXECUTORS.get(
+                        executor_key(
+                            module_config,
+                            module_type,
+                            getattr(module_class, "EXECUTOR_KEY", None),
+                        )
+                    ),
+                    module_class,
+                    module_config,
+                )
+                for (module_type, _), (module_class, module_config) in zip(
+                    to_construct, loaded
+                )
             )
+        )
+        for (module_type, module_config), module in zip(to_construct, modules):
+            self._prepared_modules[(module_type, module_config["name"])] = module
 
     def _init_sensor_modules(self) -> None:
         """
@@ -281,9 +451,30 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
         self.sensor_configs = {x["name"]: x for x in self.config["sensor_modules"]}
         self.sensor_modules = {}
         for sens_config in self.config["sensor_modules"]:
-            self.sensor_modules[sens_config["name"]] = _init_module(
-                sens_config, "sensor", self.config["options"]["install_requirements"]
+            self.sensor_modules[sens_config["name"]] = self._get_module(
+                sens_config, "sensor"
+            )
+
+    async def _setup_sensor_inputs(self) -> None:
+        """
+        Validate the sensor inputs' configs and set them up on their modules' executors,
+        so that sensors on different buses are set up at the same time, and those on
+        the same bus are set up one after another.
+        """
+        setups = []
+        for sens_conf in self.config["sensor_inputs"]:
+            sensor_module = self.sensor_modules[sens_conf["module"]]
+            sens_conf = validate_and_normalise_sensor_input_config(
+                sens_conf, sensor_module
             )
+            sensor_module.sensor_inputs.append(sens_conf)
+            setups.append(
+                self.loop.run_in_executor(
+                    sensor_module.executor, sensor_module.setup_sensor, sens_conf
+                )
+            )
+            self.sensor_input_configs[sens_conf["name"]] = sens_conf
+        await asyncio.gather(*setups)
 
     def _init_stream_modules(self) -> None:
         """
@@ -293,24 +484,19 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
         # TODO: Tasks pending completion -@flyte at 01/03/2021, 14:40:10
         # Only publish if read: true and only subscribe if write: true
 
-        async def publish_stream_data_callback(event: StreamDataReadEvent) -> None:
+        def publish_stream_data_callback(event: StreamDataReadEvent) -> None:
             stream_conf = self.stream_configs[event.stream_name]
-            self.mqtt_task_queue.put_nowait(
-                PriorityCoro(
-                    self._mqtt_publish(
-                        MQTTMessageSend(
-                            "/".join(
-                                (
-                                    self.config["mqtt"]["topic_prefix"],
-                                    STREAM_TOPIC,
-                                    stream_conf["name"],
-                                )
-                            ),
-                            event.data,
-                            retain=stream_conf["retain"],
+            self._queue_mqtt_publish(
+                MQTTMessageSend(
+                    "/".join(
+                        (
+                            self.config["mqtt"]["topic_prefix"],
+                            STREAM_TOPIC,
+                            stream_conf["name"],
                         )
                     ),
-                    MQTT_PUB_PRIORITY,
+                    event.data,
+                    retain=stream_conf["retain"],
                 )
             )
 
@@ -319,28 +505,37 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
         self.stream_configs = {x["name"]: x for x in self.config["stream_modules"]}
         self.stream_modules = {}
         for stream_conf in self.config["stream_modules"]:
-            stream_module = _init_module(
-                stream_conf, "stream", self.config["options"]["install_requirements"]
-            )
+            stream_module = self._get_module(stream_conf, "stream")
             self.stream_modules[stream_conf["name"]] = stream_module
-
-            self.transient_tasks.append(
-                self.loop.create_task(self.stream_poller(stream_module, stream_conf))
+            if stream_conf["framing"] is not None:
+                self.stream_framers[stream_conf["name"]] = make_framer(
+                    stream_conf["name"], stream_conf["framing"]
+                )
+            self._start_stream_reading(stream_module, stream_conf)
+            self.mqtt_routes.add(
+                "/".join(
+                    (
+                        self.config["mqtt"]["topic_prefix"],
+                        STREAM_TOPIC,
+                        stream_conf["name"],
+                        SEND_SUFFIX,
+                    )
+                ),
+                self._handle_stream_send_msg,
+                stream_conf["name"],
             )
 
-            async def create_stream_output_queue(
-                stream_conf: ConfigType = stream_conf,
-            ) -> None:
+            def create_stream_output_queue(stream_conf: ConfigType = stream_conf) -> None:
                 """
                 Set up a stream output queue.
                 """
                 queue = asyncio.Queue()  # type: asyncio.Queue[bytes]
                 self.stream_output_queues[stream_conf["name"]] = queue
 
-            self.loop.run_until_complete(create_stream_output_queue())
+            self._call_on_loop(create_stream_output_queue)
 
             # Queue a stream output loop task
-            self.transient_tasks.append(
+            self.transient_tasks.add(
                 self.loop.create_task(
                     # Use partial to avoid late binding closure
                     partial(
@@ -353,15 +548,18 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
             )
 
         # Subscribe call back funktion: Subscribe to stream send topics
-        async def subscribe_callback(event: StreamDataSubscribeEvent) -> None:
+        def subscribe_callback(event: StreamDataSubscribeEvent) -> None:
             sub_topics: List[str] = []
-            for stream_conf in self.config["stream_modules"]:
+            stream_names = [x["name"] for x in self.config["stream_modules"]]
+            if stream_names and self.config["mqtt"]["wildcard_subscriptions"]:
+                stream_names = ["+"]
+            for stream_name in stream_names:
                 sub_topics.append(
                     "/".join(
                         (
                             self.config["mqtt"]["topic_prefix"],
                             STREAM_TOPIC,
-                            stream_conf["name"],
+                            stream_name,
                             SEND_SUFFIX,
                         )
                     )
@@ -369,7 +567,7 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
 
             if sub_topics:
                 self.mqtt_task_queue.put_nowait(
-                    PriorityCoro(self._mqtt_subscribe(sub_topics), MQTT_SUB_PRIORITY)
+                    MQTTSubscribe(sub_topics), MQTT_SUB_PRIORITY
                 )
 
         self.event_bus.subscribe(StreamDataSubscribeEvent, subscribe_callback)
@@ -381,37 +579,38 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
         For each of the inputs:
         - Set up the self.digital_input_configs dict
         - Call the module's setup_pin() method
-        - Optionally start an async task that continuously polls the input for changes
         - Optionally call the module's setup_interrupt() method, with a software callback
           if it's supported.
+        Then tell each GPIO module that its interrupts have all been set up, and schedule
+        a job for each GPIO module (and poll interval) that periodically polls all of its
+        non-interrupt inputs at once for changes.
         """
         # Set up MQTT publish callback for input event.
         # Needs to be a function, not a method, hence the closure function.
-        async def publish_callback(event: DigitalInputChangedEvent) -> None:
+        def publish_callback(event: DigitalInputChangedEvent) -> None:
             in_conf = self.digital_input_configs[event.input_name]
             value = event.to_value != in_conf["inverted"]
             val = in_conf["on_payload"] if value else in_conf["off_payload"]
-            self.mqtt_task_queue.put_nowait(
-                PriorityCoro(
-                    self._mqtt_publish(
-                        MQTTMessageSend(
-                            "/".join(
-                                (
-                                    self.config["mqtt"]["topic_prefix"],
-                                    INPUT_TOPIC,
-                                    event.input_name,
-                                )
-                            ),
-                            val.encode("utf8"),
-                            retain=in_conf["retain"],
+            self._queue_mqtt_publish(
+                self._timestamped_message(
+                    "/".join(
+                        (
+                            self.config["mqtt"]["topic_prefix"],
+                            INPUT_TOPIC,
+                            event.input_name,
                         )
                     ),
-                    MQTT_PUB_PRIORITY,
+                    val,
+                    val,
+                    event.timestamp,
+                    in_conf,
                 )
             )
 
         self.event_bus.subscribe(DigitalInputChangedEvent, publish_callback)
 
+        # Polled inputs are grouped so that each module's pins can be read in bulk
+        polled_inputs: Dict[Tuple[str, float, float], List[ConfigType]] = {}
         for in_conf in self.config["digital_inputs"]:
             gpio_module = self.gpio_modules[in_conf["module"]]
             in_conf = validate_and_normalise_digital_input_config(in_conf, gpio_module)
@@ -422,16 +621,18 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
             interrupt = in_conf.get("interrupt")
             interrupt_for = in_conf.get("interrupt_for")
 
+            if in_conf["count"] is not None:
+                self._init_pulse_counter(in_conf, gpio_module)
+
             # Only start the poller task if this _isn't_ set up with an interrupt, or if
             # it _is_ an interrupt, but it's used for triggering remote interrupts.
             if interrupt is None or (
                 interrupt_for and in_conf["poll_when_interrupt_for"]
             ):
-                self.transient_tasks.append(
-                    self.loop.create_task(
-                        partial(self.digital_input_poller, gpio_module, in_conf)()
-                    )
-                )
+                polled_inputs.setdefault(
+                    (in_conf["module"], in_conf["poll_interval"], in_conf["poll_phase"]),
+                    [],
+                ).append(in_conf)
 
             if interrupt:
                 edge = {
@@ -452,6 +653,57 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
                     in_conf["pin"], edge, in_conf, callback=callback
                 )
 
+        for gpio_module in self.gpio_modules.values():
+            gpio_module.start_interrupts()
+
+        for (module_name, poll_interval, poll_phase), in_confs in polled_inputs.items():
+            self._init_digital_input_filters(in_confs)
+            self.scheduler.add_job(
+                f"digital input poller for {module_name}",
+                poll_interval,
+                partial(
+                    self.poll_digital_inputs, self.gpio_modules[module_name], in_confs, {}
+                ),
+                phase=poll_phase,
+            )
+
+    def _init_pulse_counter(self, in_conf: ConfigType, module: GenericGPIO) -> None:
+        """
+        Count the pulses on a digital input in `count` mode, which are captured by its
+        interrupts, and schedule a job to publish them.
+        """
+        if not in_conf.get("interrupt") or not (
+            module.INTERRUPT_SUPPORT & InterruptSupport.SOFTWARE_CALLBACK
+        ):
+            raise RuntimeConfigError(
+                "Digital input %r is in count mode, so it must be configured as an "
+                "interrupt on a GPIO module which supports software callbacks"
+                % in_conf["name"]
+            )
+        self.pulse_counters[in_conf["name"]] = PulseCounter()
+        self.scheduler.add_job(
+            f"pulse count publisher for {in_conf['name']}",
+            in_conf["count"]["interval"],
+            partial(self.publish_pulse_count, in_conf),
+            phase=in_conf["count"]["interval"],
+        )
+
+    def _init_digital_input_filters(self, in_confs: List[ConfigType]) -> None:
+        """
+        Create a debounce filter for each group of inputs in a poller job which have the
+        same `filter` config, and give each of the inputs a bit in it.
+        """
+        grouped: Dict[Tuple[Any, ...], List[ConfigType]] = {}
+        for in_conf in in_confs:
+            if in_conf["filter"] is not None:
+                grouped.setdefault(tuple(sorted(in_conf["filter"].items())), []).append(
+                    in_conf
+                )
+        for group in grouped.values():
+            debounce = DebounceFilter(group[0]["filter"], len(group))
+            for bit, in_conf in enumerate(group):
+                self.digital_input_filters[in_conf["name"]] = (debounce, bit)
+
     def _init_digital_outputs(self) -> None:
         """
         Initializes the digital outputs.
@@ -470,7 +722,7 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
             None
         """
         # Set up MQTT publish callback for output event
-        async def publish_callback(event: DigitalOutputChangedEvent) -> None:
+        def publish_callback(event: DigitalOutputChangedEvent) -> None:
             """
             Publishes a callback function for the given DigitalOutputChangedEvent.
 
@@ -483,22 +735,17 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
             """
             out_conf = self.digital_output_configs[event.output_name]
             val = out_conf["on_payload"] if event.to_value else out_conf["off_payload"]
-            self.mqtt_task_queue.put_nowait(
-                PriorityCoro(
-                    self._mqtt_publish(
-                        MQTTMessageSend(
-                            "/".join(
-                                (
-                                    self.config["mqtt"]["topic_prefix"],
-                                    "output",
-                                    event.output_name,
-                                )
-                            ),
-                            val.encode("utf8"),
-                            retain=out_conf["retain"],
+            self._queue_mqtt_publish(
+                MQTTMessageSend(
+                    "/".join(
+                        (
+                            self.config["mqtt"]["topic_prefix"],
+                            "output",
+                            event.output_name,
                         )
                     ),
-                    MQTT_PUB_PRIORITY,
+                    val.encode("utf8"),
+                    retain=out_conf["retain"],
                 )
             )
 
@@ -509,24 +756,39 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
             out_conf = validate_and_normalise_digital_output_config(out_conf, gpio_module)
             self.digital_output_configs[out_conf["name"]] = out_conf
 
+            output_topic = "/".join(
+                (self.config["mqtt"]["topic_prefix"], OUTPUT_TOPIC, out_conf["name"])
+            )
+            self.mqtt_routes.add(
+                f"{output_topic}/{SET_SUFFIX}", self._handle_digital_output_msg, out_conf
+            )
+            self.mqtt_routes.add(
+                f"{output_topic}/{SET_ON_MS_SUFFIX}",
+                partial(self._handle_digital_output_ms_msg, desired_value=True),
+                out_conf,
+            )
+            self.mqtt_routes.add(
+                f"{output_topic}/{SET_OFF_MS_SUFFIX}",
+                partial(self._handle_digital_output_ms_msg, desired_value=False),
+                out_conf,
+            )
+
             gpio_module.setup_pin_internal(PinDirection.OUTPUT, out_conf)
 
             # Create queues for each module with an output
             if out_conf["module"] not in self.gpio_output_queues:
 
-                async def create_digital_output_queue(
-                    out_conf: ConfigType = out_conf,
-                ) -> None:
+                def create_digital_output_queue(out_conf: ConfigType = out_conf) -> None:
                     """
                     Create digital output queue on the right loop.
                     """
                     queue = asyncio.Queue()  # type: asyncio.Queue[Tuple[ConfigType, str]]
                     self.gpio_output_queues[out_conf["module"]] = queue
 
-                self.loop.run_until_complete(create_digital_output_queue())
+                self._call_on_loop(create_digital_output_queue)
 
                 # Use partial to avoid late binding closure
-                self.transient_tasks.append(
+                self.transient_tasks.add(
                     self.loop.create_task(
                         partial(
                             self.digital_output_loop,
@@ -558,23 +820,20 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
                 self.event_bus.fire(DigitalOutputChangedEvent(out_conf["name"], value))
 
         # Subscribe call back funktion: Add tasks to subscribe to outputs when MQTT is initialised
-        async def subscribe_callback(event: DigitalSubscribeEvent) -> None:
-            for out_conf in self.config["digital_outputs"]:
-                topics = []
-                for suffix in (SET_SUFFIX, SET_ON_MS_SUFFIX, SET_OFF_MS_SUFFIX):
-                    topics.append(
-                        "/".join(
-                            (
-                                self.config["mqtt"]["topic_prefix"],
-                                OUTPUT_TOPIC,
-                                out_conf["name"],
-                                suffix,
-                            )
+        def subscribe_callback(event: DigitalSubscribeEvent) -> None:
+            topic_prefix = self.config["mqtt"]["topic_prefix"]
+            topics = []
+            if self.config["mqtt"]["wildcard_subscriptions"]:
+                if self.config["digital_outputs"]:
+                    topics.append("/".join((topic_prefix, OUTPUT_TOPIC, "+", "+")))
+            else:
+                for out_conf in self.config["digital_outputs"]:
+                    for suffix in (SET_SUFFIX, SET_ON_MS_SUFFIX, SET_OFF_MS_SUFFIX):
+                        topics.append(
+                            "/".join((topic_prefix, OUTPUT_TOPIC, out_conf["name"], suffix))
                         )
-                    )
-                self.mqtt_task_queue.put_nowait(
-                    PriorityCoro(self._mqtt_subscribe(topics), MQTT_SUB_PRIORITY)
-                )
+            if topics:
+                self.mqtt_task_queue.put_nowait(MQTTSubscribe(topics), MQTT_SUB_PRIORITY)
 
         self.event_bus.subscribe(DigitalSubscribeEvent, subscribe_callback)
 
@@ -588,7 +847,7 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
         Returns:
             None
         """
-        async def publish_sensor_callback(event: SensorReadEvent) -> None:
+        def publish_sensor_callback(event: SensorReadEvent) -> None:
             """
             Publishes a sensor callback event to the MQTT broker.
 
@@ -599,23 +858,30 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
                 None
             """
             sens_conf = self.sensor_input_configs[event.sensor_name]
+            aggregator = self.sensor_aggregators.get(event.sensor_name)
+            if aggregator is not None:
+                if event.value is not None:
+                    aggregator.add(event.value)
+                return
+            if not self._should_publish_sensor_value(sens_conf, event.value):
+                _LOG.debug(
+                    "Not publishing unchanged value of sensor %r", event.sensor_name
+                )
+                return
             digits: int = sens_conf["digits"]
-            self.mqtt_task_queue.put_nowait(
-                PriorityCoro(
-                    self._mqtt_publish(
-                        MQTTMessageSend(
-                            "/".join(
-                                (
-                                    self.config["mqtt"]["topic_prefix"],
-                                    SENSOR_TOPIC,
-                                    event.sensor_name,
-                                )
-                            ),
-                            f"{event.value:.{digits}f}".encode("utf8"),
-                            retain=sens_conf["retain"],
+            self._queue_mqtt_publish(
+                self._timestamped_message(
+                    "/".join(
+                        (
+                            self.config["mqtt"]["topic_prefix"],
+                            SENSOR_TOPIC,
+                            event.sensor_name,
                         )
                     ),
-                    MQTT_PUB_PRIORITY,
+                    f"{event.value:.{digits}f}",
+                    event.value,
+                    event.timestamp,
+                    sens_conf,
                 )
             )
 
@@ -623,72 +889,277 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
 
         for sens_conf in self.config["sensor_inputs"]:
             sensor_module = self.sensor_modules[sens_conf["module"]]
-            sens_conf = validate_and_normalise_sensor_input_config(
-                sens_conf, sensor_module
+            if sens_conf["name"] in self.sensor_input_configs:
+                # Already set up by _setup_sensor_inputs()
+                sens_conf = self.sensor_input_configs[sens_conf["name"]]
+            else:
+                sens_conf = validate_and_normalise_sensor_input_config(
+                    sens_conf, sensor_module
+                )
+                self.sensor_input_configs[sens_conf["name"]] = sens_conf
+                sensor_module.sensor_inputs.append(sens_conf)
+                sensor_module.setup_sensor(sens_conf)
+
+            # Use default args to the function to get around the late binding closures.
+            # The backoff decorators are applied once here, rather than on every poll.
+            @backoff.on_exception(
+                backoff.expo, Exception, max_time=sens_conf["interval"]
             )
-            self.sensor_input_configs[sens_conf["name"]] = sens_conf
+            @backoff.on_predicate(
+                backoff.expo, lambda x: x is None, max_time=sens_conf["interval"]
+            )
+            async def get_sensor_value(
+                sensor_module: GenericSensor = sensor_module,
+                sens_conf: ConfigType = sens_conf,
+            ) -> SensorValueType:
+                """
+                A decorator that applies exponential backoff to the function `get_sensor_value`.
 
-            sensor_module.setup_sensor(sens_conf)
+                Parameters:
+                    sensor_module (GenericSensor): The sensor module to use for getting
+                        the sensor value.
+                    sens_conf (ConfigType): The configuration for the sensor.
+
+                Returns:
+                    SensorValueType: The value retrieved from the sensor.
+                """
+                return await sensor_module.async_get_value(sens_conf)
 
-            # Use default args to the function to get around the late binding closures
             async def poll_sensor(
-                sensor_module: GenericSensor = sensor_module,
                 sens_conf: ConfigType = sens_conf,
+                get_sensor_value: Callable[
+                    [], Coroutine[Any, Any, SensorValueType]
+                ] = get_sensor_value,
             ) -> None:
                 """
-                Asynchronously polls a sensor to retrieve its value at regular intervals.
+                Asynchronously polls a sensor to retrieve its value. This is run at regular
+                intervals by the scheduler.
 
                 Args:
-                    sensor_module (Optional[GenericSensor]): The sensor module to use.
-                    Defaults to the sensor_module provided during function call.
                     sens_conf (Optional[ConfigType]): The configuration for the sensor.
                     Defaults to the sens_conf provided during function call.
+                    get_sensor_value (Optional[Callable]): Reads the sensor's value, with
+                    backoff and retries.
 
                 Returns:
                     None
 
                 """
-                @backoff.on_exception(
-                    backoff.expo, Exception, max_time=sens_conf["interval"]
+                value = None
+                try:
+                    value = await get_sensor_value()
+                    timestamp = Timestamp.now()
+                except Exception:  # pylint: disable=broad-except
+                    _LOG.exception(
+                        "Exception when retrieving value from sensor %r:",
+                        sens_conf["name"],
+                    )
+                if value is None:
+                    return
+                if sens_conf["aggregate"] is None:
+                    value = round(value, sens_conf["digits"])
+                    _LOG.info("Read sensor '%s' value of %s", sens_conf["name"], value)
+                else:
+                    # Aggregates are rounded when they're published instead
+                    _LOG.debug("Read sensor '%s' value of %s", sens_conf["name"], value)
+                self.event_bus.fire(SensorReadEvent(sens_conf["name"], value, timestamp))
+
+            high_rate_conf: Optional[ConfigType] = sens_conf["high_rate"]
+            if high_rate_conf is None:
+                self.scheduler.add_job(
+                    f"sensor poller for {sens_conf['name']}",
+                    sens_conf["interval"],
+                    poll_sensor,
+                    phase=sens_conf["phase"],
                 )
-                @backoff.on_predicate(
-                    backoff.expo, lambda x: x is None, max_time=sens_conf["interval"]
+            else:
+                sampler = Sampler(
+                    sens_conf["name"],
+                    partial(sensor_module.get_value_from_thread, sens_conf),
+                    sens_conf["interval"],
+                    high_rate_conf["buffer_size"],
+                )
+                self.sensor_samplers[sens_conf["name"]] = sampler
+                sampler.start()
+                self.scheduler.add_job(
+                    f"sensor sample batcher for {sens_conf['name']}",
+                    high_rate_conf["batch_interval"],
+                    partial(self.handle_sensor_samples, sens_conf),
+                    phase=sens_conf["phase"] + high_rate_conf["batch_interval"],
                 )
-                async def get_sensor_value(
-                    sensor_module: GenericSensor = sensor_module,
-                    sens_conf: ConfigType = sens_conf,
-                ) -> SensorValueType:
-                    """
-                    A decorator that applies exponential backoff to the function `get_sensor_value`.
 
-                    Parameters:
-                        sensor_module (GenericSensor): The sensor module to use for getting
-                            the sensor value.
-                        sens_conf (ConfigType): The configuration for the sensor.
+            agg_conf: Optional[ConfigType] = sens_conf["aggregate"]
+            if agg_conf is not None:
+                self.sensor_aggregators[sens_conf["name"]] = Aggregator(
+                    agg_conf["statistics"]
+                )
+                self.scheduler.add_job(
+                    f"sensor aggregate publisher for {sens_conf['name']}",
+                    agg_conf["window"],
+                    partial(self.publish_sensor_aggregate, sens_conf),
+                    phase=sens_conf["phase"] + agg_conf["window"],
+                )
 
-                    Returns:
-                        SensorValueType: The value retrieved from the sensor.
-                    """
-                    return await sensor_module.async_get_value(sens_conf)
+    async def handle_sensor_samples(self, sens_conf: ConfigType) -> None:
+        """
+        Take the batch of readings from a high-rate sensor's sampler and add them to its
+        aggregate, or fire a SensorReadEvent for the latest one if it doesn't have one.
+        """
+        sampler = self.sensor_samplers[sens_conf["name"]]
+        samples = sampler.drain()
+        if sampler.dropped:
+            _LOG.warning(
+                "Dropped %s reading(s) from sensor %r because its buffer was full",
+                sampler.dropped,
+                sens_conf["name"],
+            )
+            sampler.dropped = 0
+        if sampler.errors:
+            _LOG.warning(
+                "Failed to read sensor %r %s time(s) while sampling it",
+                sens_conf["name"],
+                sampler.errors,
+            )
+            sampler.errors = 0
+        if not samples:
+            return
+        aggregator = self.sensor_aggregators.get(sens_conf["name"])
+        if aggregator is not None:
+            for _, value in samples:
+                aggregator.add(value)
+            return
+        sampled_at, value = samples[-1]
+        value = round(value, sens_conf["digits"])
+        _LOG.info("Read sensor '%s' value of %s", sens_conf["name"], value)
+        self.event_bus.fire(
+            SensorReadEvent(
+                sens_conf["name"], value, Timestamp.from_monotonic(sampled_at)
+            )
+        )
 
-                while True:
-                    value = None
-                    try:
-                        value = await get_sensor_value()
-                    except Exception:  # pylint: disable=broad-except
-                        _LOG.exception(
-                            "Exception when retrieving value from sensor %r:",
-                            sens_conf["name"],
-                        )
-                    if value is not None:
-                        value = round(value, sens_conf["digits"])
-                        _LOG.info(
-                            "Read sensor '%s' value of %s", sens_conf["name"], value
-                        )
-                        self.event_bus.fire(SensorReadEvent(sens_conf["name"], value))
-                    await asyncio.sleep(sens_conf["interval"])
+    async def publish_pulse_count(self, in_conf: ConfigType) -> None:
+        """
+        Publish the pulses counted on a digital input in `count` mode since the last
+        time, along with its total, its rate and the time between its pulses.
+        """
+        count_conf: ConfigType = in_conf["count"]
+        window = self.pulse_counters[in_conf["name"]].take()
+        digits: int = count_conf["digits"]
+        per_unit: float = count_conf["pulses_per_unit"]
+        data: Dict[str, Any] = {
+            "count": window.count,
+            "total": round(window.total / per_unit, digits),
+            "rate": round(window.rate / per_unit * count_conf["rate_per"], digits),
+        }
+        for stat in ("period_min", "period_max", "period_mean"):
+            value: Optional[float] = getattr(window, stat)
+            data[stat] = None if value is None else round(value, digits)
+        _LOG.info("Counted pulses on digital input '%s': %s", in_conf["name"], data)
+        self._queue_mqtt_publish(
+            MQTTMessageSend(
+                "/".join(
+                    (self.config["mqtt"]["topic_prefix"], INPUT_TOPIC, in_conf["name"])
+                ),
+                json.dumps(data).encode("utf8"),
+                retain=in_conf["retain"],
+            )
+        )
+
+    async def publish_sensor_aggregate(self, sens_conf: ConfigType) -> None:
+        """
+        Publish the statistics for a sensor's readings over the window that's just ended,
+        then start a new window.
+        """
+        aggregator = self.sensor_aggregators[sens_conf["name"]]
+        result = aggregator.result()
+        aggregator.reset()
+        if not result:
+            _LOG.warning(
+                "No readings from sensor %r to aggregate in the last window",
+                sens_conf["name"],
+            )
+            return
+        digits: int = sens_conf["digits"]
+        stats = {
+            stat: int(value) if stat == "count" else round(value, digits)
+            for stat, value in result.items()
+        }
+        _LOG.info("Aggregated sensor '%s' values: %s", sens_conf["name"], stats)
+        topic = "/".join(
+            (self.config["mqtt"]["topic_prefix"], SENSOR_TOPIC, sens_conf["name"])
+        )
+        if sens_conf["aggregate"]["format"] == "json":
+            messages = [(topic, json.dumps(stats))]
+        else:
+            messages = [
+                (f"{topic}/{stat}", str(value) if stat == "count" else f"{value:.{digits}f}")
+                for stat, value in stats.items()
+            ]
+        for msg_topic, payload in messages:
+            self._queue_mqtt_publish(
+                MQTTMessageSend(
+                    msg_topic, payload.encode("utf8"), retain=sens_conf["retain"]
+                )
+            )
 
-            self.transient_tasks.append(self.loop.create_task(poll_sensor()))
+    @staticmethod
+    def _timestamped_message(
+        topic: str, payload: str, value: Any, timestamp: Timestamp, conf: ConfigType
+    ) -> MQTTMessageSend:
+        """
+        Create the message to publish an input's or sensor's value with, including the
+        time that it was captured if its `publish_timestamp` config asks for it.
+        """
+        user_properties: Optional[List[Tuple[str, str]]] = None
+        if conf["publish_timestamp"] == "json":
+            payload = json.dumps(
+                {
+                    "value": value,
+                    "timestamp": timestamp.wall,
+                    "monotonic": timestamp.monotonic,
+                }
+            )
+        elif conf["publish_timestamp"] == "user_property":
+            user_properties = [
+                ("timestamp", repr(timestamp.wall)),
+                ("monotonic", repr(timestamp.monotonic)),
+            ]
+        return MQTTMessageSend(
+            topic,
+            payload.encode("utf8"),
+            retain=conf["retain"],
+            user_properties=user_properties,
+        )
+
+    def _should_publish_sensor_value(
+        self, sens_conf: ConfigType, value: SensorValueType
+    ) -> bool:
+        """
+        Decide whether a sensor's new value should be published, given the last value
+        that was published for it and its `publish_on_change_only`, `deadband`,
+        `deadband_percent` and `max_silence` config. Records the value as published if
+        it should be.
+        """
+        name: str = sens_conf["name"]
+        now = self.loop.time()
+        last = self.sensor_last_published.get(name)
+        last_value = None if last is None else last[0]
+        if last is not None and last_value is not None and value is not None:
+            last_time = last[1]
+            max_silence: Optional[float] = sens_conf["max_silence"]
+            if max_silence is None or now - last_time < max_silence:
+                change = abs(value - last_value)
+                if sens_conf["publish_on_change_only"] and change == 0:
+                    return False
+                if sens_conf["deadband"] and change <= sens_conf["deadband"]:
+                    return False
+                if (
+                    sens_conf["deadband_percent"]
+                    and change <= abs(last_value) * sens_conf["deadband_percent"] / 100
+                ):
+                    return False
+        self.sensor_last_published[name] = (value, now)
+        return True
 
     async def _connect_mqtt(self) -> None:
         """
@@ -698,7 +1169,6 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
             None
         """
         config: ConfigType = self.config["mqtt"]
-        topic_prefix: str = config["topic_prefix"]
         self.mqtt = AbstractMQTTClient.get_implementation(config["client_module"])(
             self.mqtt_client_options
         )
@@ -706,23 +1176,30 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
         _LOG.info("Connecting to MQTT...")
         await self.mqtt.connect()
         _LOG.info("Connected to MQTT")
+        self.mqtt_connected.set()
 
+    def _announce_ready(self) -> None:
+        """
+        Once we're both initialised and connected to MQTT, publish the running status,
+        subscribe to our topics and announce ourselves to Home Assistant. Until then,
+        anything watching the status topic sees us as unavailable.
+        """
+        config: ConfigType = self.config["mqtt"]
+        # Sent straight away, rather than after anything waiting in the outbox
         self.mqtt_task_queue.put_nowait(
-            PriorityCoro(
-                self._mqtt_publish(
-                    MQTTMessageSend(
-                        "/".join((topic_prefix, config["status_topic"])),
-                        config["status_payload_running"].encode("utf8"),
-                        qos=1,
-                        retain=True,
-                    )
-                ),
-                MQTT_PUB_PRIORITY,
-            )
+            MQTTMessageSend(
+                "/".join((config["topic_prefix"], config["status_topic"])),
+                config["status_payload_running"].encode("utf8"),
+                qos=1,
+                retain=True,
+            ),
+            MQTT_PUB_PRIORITY,
         )
-        self.mqtt_connected.set()
         self.event_bus.fire(StreamDataSubscribeEvent())
         self.event_bus.fire(DigitalSubscribeEvent())
+        self.running.set()
+        if config.get("ha_discovery", {}).get("enabled"):
+            self._ha_discovery_announce()
 
 
     def _ha_discovery_announce(self) -> None:
@@ -733,6 +1210,9 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
         mqtt_config: ConfigType = self.config["mqtt"]
 
         for in_conf in self.digital_input_configs.values():
+            if in_conf["count"] is not None:
+                # Not a binary sensor
+                continue
             messages.append(
                 hass_announce_digital_input(
                     in_conf, mqtt_config, self.mqtt_client_options
@@ -751,9 +1231,58 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
                 )
             )
         for msg in messages:
-            self.mqtt_task_queue.put_nowait(
-                PriorityCoro(self._mqtt_publish(msg), MQTT_ANNOUNCE_PRIORITY)
+            self._queue_mqtt_publish(msg, MQTT_ANNOUNCE_PRIORITY)
+
+    def _queue_mqtt_publish(
+        self, msg: MQTTMessageSend, priority: int = MQTT_PUB_PRIORITY
+    ) -> None:
+        """
+        Queue an MQTT message to be published by `_mqtt_task_loop`. Messages on the same
+        topic are published in the order they're queued.
+
+        If there's an outbox, then messages are stored in it instead while we're not
+        connected to the broker, or while it's still being replayed.
+        """
+        if self.outbox is not None and (
+            not self.mqtt_connected.is_set() or not self.outbox.empty()
+        ):
+            self.outbox.append(OutboxRecord(msg.created_at, msg))
+            return
+        self.mqtt_task_queue.put_nowait(msg, priority)
+
+    async def _sync_outbox(self) -> None:
+        """
+        Make sure that the messages in the outbox have been written to disk.
+        """
+        if self.outbox is not None:
+            await self.loop.run_in_executor(None, self.outbox.sync)
+
+    async def _mqtt_outbox_replay_loop(self) -> None:
+        """
+        Publish the messages that were stored in the outbox while we weren't connected,
+        at no more than `mqtt.outbox.replay_rate` messages per second.
+        """
+        if self.outbox is None:
+            return
+        await self.mqtt_connected.wait()
+        delay = 1 / self.config["mqtt"]["outbox"]["replay_rate"]
+        replayed = 0
+        while True:
+            record = await self.loop.run_in_executor(None, self.outbox.peek)
+            if record is None:
+                break
+            _LOG.debug(
+                "Replaying MQTT message on topic %r from %.1f second(s) ago",
+                record.msg.topic,
+                time.time() - record.timestamp,
             )
+            self.mqtt_task_queue.put_nowait(record.msg, MQTT_PUB_PRIORITY)
+            # Only now that it's queued, so that newer messages can't overtake it
+            self.outbox.commit()
+            replayed += 1
+            await asyncio.sleep(delay)
+        if replayed:
+            _LOG.info("Replayed %s message(s) from the MQTT outbox", replayed)
 
     async def _mqtt_subscribe(self, topics: List[str]) -> None:
         """
@@ -767,7 +1296,8 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
             raise RuntimeError("MQTT client was None when trying to subscribe.")
         await self.mqtt.subscribe([(topic, 1) for topic in topics])
         for topic in topics:
-            _LOG.info("Subscribed to topic: %r", topic)
+            _LOG.debug("Subscribed to topic: %r", topic)
+        _LOG.info("Subscribed to %s topic(s)", len(topics))
 
     async def _mqtt_publish(self, msg: MQTTMessageSend, wait: bool = True) -> None:
         """
@@ -820,9 +1350,10 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
         in_conf: ConfigType,
         value: bool,
         last_value: Optional[bool],
+        timestamp: Optional[Timestamp] = None,
     ) -> None:
         """
-        Handles values read from a digital input.
+        Handles values read from a digital input at `timestamp`.
 
         Fires a DigitalInputchangedEvent when it changes.
 
@@ -839,7 +1370,9 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
         if value != last_value:
             _LOG.info("Digital input '%s' value changed to %s", in_conf["name"], value)
             self.event_bus.fire(
-                DigitalInputChangedEvent(in_conf["name"], last_value, value)
+                DigitalInputChangedEvent(
+                    in_conf["name"], last_value, value, timestamp or Timestamp.now()
+                )
             )
         # If the value is now the same as the 'interrupt' value (falling, rising)
         # and we're a remote interrupt then just trigger the remote interrupt
@@ -875,35 +1408,159 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
         )
         self.handle_remote_interrupt(interrupt_for, interrupt_lock)
 
-    async def digital_input_poller(
-        self, module: GenericGPIO, in_conf: ConfigType
+    async def poll_digital_inputs(
+        self,
+        module: GenericGPIO,
+        in_confs: List[ConfigType],
+        last_values: Dict[str, Optional[bool]],
     ) -> None:
         """
-        Polls a single digital input for changes and calls the handler function when it's
-        been read.
+        Polls a GPIO module's digital inputs for changes by reading all of their pins at
+        once, then calls the handler function for each of them with its value compared to
+        the last snapshot in `last_values`, which is then updated. The values of inputs
+        with a `filter` are passed through their debounce filters first.
+
+        This is run periodically by the scheduler.
         """
-        last_value: Optional[bool] = None
-        while True:
-            value = await module.async_get_pin(in_conf["pin"])
-            await self._handle_digital_input_value(in_conf, value, last_value)
-            last_value = value
-            await asyncio.sleep(in_conf["poll_interval"])
+        pins = list(dict.fromkeys(in_conf["pin"] for in_conf in in_confs))
+        values = await module.async_get_pins(pins)
+        timestamp = Timestamp.now()
+        samples: Dict[DebounceFilter, int] = {}
+        for in_conf in in_confs:
+            filtered = self.digital_input_filters.get(in_conf["name"])
+            if filtered is not None:
+                debounce, bit = filtered
+                samples[debounce] = samples.get(debounce, 0) | (
+                    values[in_conf["pin"]] << bit
+                )
+        for debounce, sample in samples.items():
+            debounce.update(sample, timestamp.monotonic)
+
+        for in_conf in in_confs:
+            value = values[in_conf["pin"]]
+            filtered = self.digital_input_filters.get(in_conf["name"])
+            if filtered is not None:
+                filtered_value = filtered[0].value(filtered[1])
+                if filtered_value is None:
+                    # The filter hasn't settled on a value yet
+                    continue
+                value = filtered_value
+            await self._handle_digital_input_value(
+                in_conf, value, last_values.get(in_conf["name"]), timestamp
+            )
+            last_values[in_conf["name"]] = value
 
-    async def stream_poller(self, module: GenericStream, stream_conf: ConfigType) -> None:
+    def _start_stream_reading(self, module: GenericStream, stream_conf: ConfigType) -> None:
         """
-        Poll a stream at a given interval and fire the StreamDataReadEvent with read data.
+        Read from a stream as soon as its file descriptor becomes readable, if it has
+        one and the event loop supports watching it. Poll it every `read_interval`
+        seconds otherwise.
         """
-        while True:
+        fileno = module.fileno()
+        if fileno is not None:
             try:
-                data = await module.async_read()
-            except Exception:  # pylint: disable=broad-except
-                _LOG.exception(
-                    "Exception while polling stream '%s':", stream_conf["name"]
-                )
+                self.loop.add_reader(fileno, self._read_stream, module, stream_conf)
+            except NotImplementedError:
+                pass
             else:
-                if data is not None:
-                    self.event_bus.fire(StreamDataReadEvent(stream_conf["name"], data))
-            await asyncio.sleep(stream_conf["read_interval"])
+                self.stream_readers[stream_conf["name"]] = fileno
+                return
+        self._add_stream_poller(module, stream_conf)
+
+    def _add_stream_poller(self, module: GenericStream, stream_conf: ConfigType) -> None:
+        """
+        Schedule a stream to be polled every `read_interval` seconds.
+        """
+        self.scheduler.add_job(
+            f"stream poller for {stream_conf['name']}",
+            stream_conf["read_interval"],
+            partial(self.poll_stream, module, stream_conf),
+            phase=stream_conf["read_phase"],
+        )
+
+    def _stop_stream_reading(self) -> None:
+        """
+        Stop watching streams' file descriptors, and waiting for them to go idle.
+        """
+        for fileno in self.stream_readers.values():
+            self.loop.remove_reader(fileno)
+        self.stream_readers.clear()
+        for timer in self.stream_idle_timers.values():
+            timer.cancel()
+        self.stream_idle_timers.clear()
+
+    def _read_stream(self, module: GenericStream, stream_conf: ConfigType) -> None:
+        """
+        Read the data that's waiting on a stream. This is called by the event loop when
+        the stream's file descriptor becomes readable, so the read won't block.
+        """
+        try:
+            data = module.read()
+        except Exception:  # pylint: disable=broad-except
+            _LOG.exception(
+                "Exception while reading stream '%s', so polling it instead:",
+                stream_conf["name"],
+            )
+            self.loop.remove_reader(self.stream_readers.pop(stream_conf["name"]))
+            self._add_stream_poller(module, stream_conf)
+            return
+        if data is not None:
+            self._handle_stream_data(stream_conf, data)
+
+    async def poll_stream(self, module: GenericStream, stream_conf: ConfigType) -> None:
+        """
+        Poll a stream and handle any data that was read.
+
+        This is run periodically by the scheduler, for streams that can't be read as
+        soon as they have data.
+        """
+        try:
+            data = await module.async_read()
+        except Exception:  # pylint: disable=broad-except
+            _LOG.exception("Exception while polling stream '%s':", stream_conf["name"])
+        else:
+            if data is not None:
+                self._handle_stream_data(stream_conf, data)
+
+    def _handle_stream_data(self, stream_conf: ConfigType, data: bytes) -> None:
+        """
+        Fire a StreamDataReadEvent with data read from a stream. If the stream has
+        `framing`, then an event is fired for each complete frame instead. If it has an
+        `idle_timeout`, then the data is held back until nothing more has been read for
+        that long, and fired as one event.
+        """
+        stream_name: str = stream_conf["name"]
+        framer = self.stream_framers.get(stream_name)
+        if framer is not None:
+            for frame in framer.feed(data):
+                self.event_bus.fire(StreamDataReadEvent(stream_name, frame))
+            return
+        if stream_conf["idle_timeout"] is None:
+            self.event_bus.fire(StreamDataReadEvent(stream_name, data))
+            return
+        self.stream_buffers.setdefault(stream_name, bytearray()).extend(data)
+        self.stream_last_read[stream_name] = self.loop.time()
+        if stream_name not in self.stream_idle_timers:
+            self.stream_idle_timers[stream_name] = self.loop.call_later(
+                stream_conf["idle_timeout"], self._check_stream_idle, stream_conf
+            )
+
+    def _check_stream_idle(self, stream_conf: ConfigType) -> None:
+        """
+        Fire a StreamDataReadEvent with the data buffered from a stream if it's been
+        idle for `idle_timeout`, or check again when it will have been otherwise.
+        """
+        stream_name: str = stream_conf["name"]
+        idle = self.loop.time() - self.stream_last_read[stream_name]
+        if idle < stream_conf["idle_timeout"]:
+            # Rather than a timer per read, keep one going until the stream goes quiet
+            self.stream_idle_timers[stream_name] = self.loop.call_later(
+                stream_conf["idle_timeout"] - idle, self._check_stream_idle, stream_conf
+            )
+            return
+        del self.stream_idle_timers[stream_name]
+        data = bytes(self.stream_buffers.pop(stream_name))
+        self.event_bus.fire(StreamDataReadEvent(stream_name, data))
 
     def interrupt_callback(
         self,
@@ -919,56 +1576,84 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
         any *args and **kwargs supplied by the GPIO library will get passed directly
         back to our GPIO module's get_interrupt_value() method.
 
-        If the pin is configured as a remote interrupt for another pin or pins, then the
-        execution, along with the interrupt lock is handed off to
-        self.handle_remote_interrupt(), instead of getting the pin value, firing the
-        DigitalInputChangedEvent and unlocking the interrupt lock.
+        Interrupts on inputs in `count` mode are just counted by their PulseCounter.
+        Otherwise, the pin's value is captured straight away and queued on
+        self.interrupt_queue, along with the time of the interrupt, to be handled on the
+        event loop by self.handle_interrupts(). If the pin is configured as a remote
+        interrupt for another pin or pins, then it's queued without a value.
 
         This can potentially be called from any thread.
         """
         pin_name = module.pin_configs[pin]["name"]
+        # Modules can pass the time that the interrupt was captured, on the monotonic clock
+        captured: Optional[float] = kwargs.pop("timestamp", None)
+        timestamp = (
+            Timestamp.now() if captured is None else Timestamp.from_monotonic(captured)
+        )
+        counter = self.pulse_counters.get(pin_name)
+        if counter is not None:
+            # Counted straight away, so that no pulses are missed while starting up
+            counter.add(timestamp.monotonic)
+            return
         if not self.running.is_set():
             # Not yet ready to handle interrupts
             _LOG.warning(
                 "Ignored interrupt from pin %r as we're not fully initialised", pin_name
             )
             return
+        value: Optional[bool] = None
+        if not module.remote_interrupt_for(pin):
+            value = module.get_interrupt_value(pin, *args, **kwargs)
+        self.interrupt_queue.put((pin_name, value, timestamp))
+
+    def handle_interrupts(self, records: List[InterruptRecordType]) -> None:
+        """
+        Handle a batch of interrupts from self.interrupt_queue, in the order that they
+        arrived, by firing a DigitalInputChangedEvent for each of them, or by handing
+        them off to self.handle_remote_interrupt() if they're remote interrupts.
+
+        Interrupts for inputs configured with `interrupt_coalesce: last` are reduced
+        to the latest one for each input.
+        """
+        records = self.interrupt_queue.coalesce(
+            records,
+            lambda name: self.digital_input_configs[name]["interrupt_coalesce"]
+            == COALESCE_LAST,
+        )
+        for pin_name, value, timestamp in records:
+            if value is None:
+                self._trigger_remote_interrupt(pin_name)
+                continue
+            _LOG.info("Handling interrupt callback on pin '%s'", pin_name)
+            self.event_bus.fire(
+                DigitalInputChangedEvent(pin_name, None, value, timestamp)
+            )
+
+    def _trigger_remote_interrupt(self, pin_name: str) -> None:
+        """
+        Handle a remote interrupt on a pin, or handle it again once the one that's
+        already being handled has finished, so that changes in between aren't missed.
+        """
         interrupt_lock = self.interrupt_locks[pin_name]
         if not interrupt_lock.acquire(blocking=False):
-            # This will only happen when the pin is configured with interrupt_for, as we
-            # release the lock locally otherwise.
-            # Hopefully it won't happen at all, but if we miss this interrupt then
-            # the poller will notice that the interrupt is triggered and it'll trigger
-            # the handling of the remote interrupt anyway, once this lock has been
-            # released when the remote interrupt handling tasks have all finished.
-            _LOG.warning(
-                (
-                    "Ignoring interrupt on pin '%s' because we're already busy "
-                    "processing one."
-                ),
+            _LOG.debug(
+                "Queueing remote interrupt on pin '%s' until the current one is handled",
                 pin_name,
             )
+            self.pending_remote_interrupts.add(pin_name)
             return
-        remote_interrupt_for_pin_names: List[str] = []
-        try:
-            _LOG.info("Handling interrupt callback on pin '%s'", pin_name)
-            remote_interrupt_for_pin_names = module.remote_interrupt_for(pin)
-
-            if remote_interrupt_for_pin_names:
-                _LOG.debug("Interrupt on '%s' triggered remote interrupt.", pin_name)
-                self.handle_remote_interrupt(
-                    remote_interrupt_for_pin_names, interrupt_lock
-                )
-                return
-            _LOG.debug("Interrupt is for the '%s' pin itself", pin_name)
-            value = module.get_interrupt_value(pin, *args, **kwargs)
-            self.event_bus.fire(DigitalInputChangedEvent(pin_name, None, value))
-        finally:
-            if not remote_interrupt_for_pin_names:
-                interrupt_lock.release()
+        _LOG.debug("Interrupt on '%s' triggered remote interrupt.", pin_name)
+        in_conf = self.digital_input_configs[pin_name]
+        module = self.gpio_modules[in_conf["module"]]
+        self.handle_remote_interrupt(
+            module.remote_interrupt_for(in_conf["pin"]), interrupt_lock, pin_name
+        )
 
     def handle_remote_interrupt(
-        self, pin_names: List[str], interrupt_lock: threading.Lock
+        self,
+        pin_names: List[str],
+        interrupt_lock: threading.Lock,
+        interrupt_pin_name: Optional[str] = None,
     ) -> None:
         """
         Adds tasks to the event loop to go off and get the values for the pin(s) which have
@@ -978,7 +1663,8 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
         pins to get values for to the module that handles them, and fire a
         DigitalInputChangedEvent for each of the pin values.
 
-        Once all of these tasks have completed, the interrupt lock is released.
+        Once all of these tasks have completed, the interrupt lock is released, and if
+        another interrupt arrived on `interrupt_pin_name` in the meantime, it's handled.
         """
         # IDEA: Possible implementations -@flyte at 30/01/2021, 16:09:35
         # Does the interrupt_for module say that its interrupt pin will be held low
@@ -1023,6 +1709,9 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
                 await asyncio.gather(*remote_interrupt_tasks)
             finally:
                 interrupt_lock.release()
+                if interrupt_pin_name in self.pending_remote_interrupts:
+                    self.pending_remote_interrupts.discard(interrupt_pin_name)
+                    self._trigger_remote_interrupt(interrupt_pin_name)
 
         create_unawaited_task_threadsafe(
             self.loop, self.transient_tasks, await_remote_interrupts()
@@ -1030,113 +1719,90 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
 
     async def _handle_mqtt_msg(self, topic: str, payload: bytes) -> None:
         """
-        Parse all MQTT messages received on our subscriptions and dispatch actions
-        such as changing outputs and sending data to streams accordingly.
+        Dispatch MQTT messages received on our subscriptions to the handlers that were
+        routed to their topics, such as for changing outputs and sending data to streams.
         """
+        routes = self.mqtt_routes.match(topic)
+        if not routes:
+            # We shouldn't get here, because we only subscribe to topics we know.
+            _LOG.debug("Ignoring message to topic '%s' which has no handler", topic)
+            return
+        for route in routes:
+            await route.handler(topic, payload, route.target)
 
-        if not any(
-            topic.endswith(f"/{x}")
-            for x in (SET_SUFFIX, SET_ON_MS_SUFFIX, SET_OFF_MS_SUFFIX, SEND_SUFFIX)
-        ):
-            _LOG.debug(
-                "Ignoring message to topic '%s' which doesn't end with a known suffix",
+    @staticmethod
+    def _decode_digital_output_payload(topic: str, payload: bytes) -> Optional[str]:
+        try:
+            return payload.decode("utf8")
+        except UnicodeDecodeError:
+            _LOG.warning(
+                "Received MQTT message to a digital output topic '%s' that wasn't unicode.",
                 topic,
             )
-            return
-
-        # Handle digital output message
-        if any(
-            topic.endswith(f"/{x}")
-            for x in (SET_SUFFIX, SET_ON_MS_SUFFIX, SET_OFF_MS_SUFFIX)
-        ):
-            try:
-                payload_str = payload.decode("utf8")
-            except UnicodeDecodeError:
-                _LOG.warning(
-                    "Received MQTT message to a digital output topic '%s' that wasn't unicode.",
-                    topic,
-                )
-                return
-            await self._handle_digital_output_msg(topic, payload_str)
-
-        # Handle stream send message
-        if topic.endswith("/send"):
-            await self._handle_stream_send_msg(topic, payload)
-
-        # Ignore unknown topics, although we shouldn't get here, because we only subscribe
-        # to ones we know.
+            return None
 
-    async def _handle_digital_output_msg(self, topic: str, payload: str) -> None:
+    async def _handle_digital_output_msg(
+        self, topic: str, payload: bytes, out_conf: ConfigType
+    ) -> None:
         """
         Handle an MQTT message that intends to set a digital output's state.
         """
-        topic_prefix: str = self.config["mqtt"]["topic_prefix"]
-        try:
-            output_name = output_name_from_topic(topic, topic_prefix, OUTPUT_TOPIC)
-        except ValueError as exc:
-            _LOG.warning("Unable to parse digital output name from topic: %s", exc)
-            return
-        try:
-            out_conf = self.digital_output_configs[output_name]
-        except KeyError:
-            _LOG.warning("No digital output config found named %r", output_name)
+        payload_str = self._decode_digital_output_payload(topic, payload)
+        if payload_str is None:
             return
-        try:
-            module = self.gpio_modules[out_conf["module"]]
-        except KeyError:
-            _LOG.warning("No GPIO module config found named %r", out_conf["module"])
+        self.gpio_output_queues[out_conf["module"]].put_nowait((out_conf, payload_str))
+
+    async def _handle_digital_output_ms_msg(
+        self, topic: str, payload: bytes, out_conf: ConfigType, desired_value: bool
+    ) -> None:
+        """
+        Handle an MQTT message that intends to set a digital output to a state for a
+        number of milliseconds, and then back again.
+        """
+        payload_str = self._decode_digital_output_payload(topic, payload)
+        if payload_str is None:
             return
-        if topic.endswith("/%s" % SET_SUFFIX):
-            # This is a message to set a digital output to a given value
-            self.gpio_output_queues[out_conf["module"]].put_nowait((out_conf, payload))
-        else:
-            # This must be a set_on_ms or set_off_ms topic
-            desired_value = topic.endswith("/%s" % SET_ON_MS_SUFFIX)
+        module = self.gpio_modules[out_conf["module"]]
 
-            async def set_ms() -> None:
-                """
-                Create this task to directly set the outputs, as we don't want to tie up
-                the set_digital_output loop. Creating a bespoke task for the job is the
-                simplest and most effective way of leveraging the asyncio framework.
-                """
-                try:
-                    secs = float(payload) / 1000
-                except ValueError:
-                    _LOG.warning(
-                        "Unable to parse ms value as float from payload %r", payload
-                    )
-                    return
-                _LOG.info(
-                    "Turning output '%s' %s for %s second(s)",
-                    out_conf["name"],
-                    "on" if desired_value else "off",
-                    secs,
-                )
-                await self.set_digital_output(module, out_conf, desired_value)
-                await asyncio.sleep(secs)
-                _LOG.info(
-                    "Turning output '%s' %s after %s second(s) elapsed",
-                    out_conf["name"],
-                    "off" if desired_value else "on",
-                    secs,
+        async def set_ms() -> None:
+            """
+            Create this task to directly set the outputs, as we don't want to tie up
+            the set_digital_output loop. Creating a bespoke task for the job is the
+            simplest and most effective way of leveraging the asyncio framework.
+            """
+            try:
+                secs = float(payload_str) / 1000
+            except ValueError:
+                _LOG.warning(
+                    "Unable to parse ms value as float from payload %r", payload_str
                 )
-                await self.set_digital_output(module, out_conf, not desired_value)
+                return
+            _LOG.info(
+                "Turning output '%s' %s for %s second(s)",
+                out_conf["name"],
+                "on" if desired_value else "off",
+                secs,
+            )
+            await self.set_digital_output(module, out_conf, desired_value)
+            await asyncio.sleep(secs)
+            _LOG.info(
+                "Turning output '%s' %s after %s second(s) elapsed",
+                out_conf["name"],
+                "off" if desired_value else "on",
+                secs,
+            )
+            await self.set_digital_output(module, out_conf, not desired_value)
 
-            task = self.loop.create_task(set_ms())
-            self.transient_tasks.append(task)
+        task = self.loop.create_task(set_ms())
+        self.transient_tasks.add(task)
 
-    async def _handle_stream_send_msg(self, topic: str, payload: bytes) -> None:
-        try:
-            stream_name = output_name_from_topic(
-                topic, self.config["mqtt"]["topic_prefix"], STREAM_TOPIC
-            )
-        except ValueError as exc:
-            _LOG.warning("Unable to parse stream name from topic: %s", exc)
-            return
-        try:
-            self.stream_output_queues[stream_name].put_nowait(payload)
-        except KeyError:
-            _LOG.warning("No stream output queue found named %r", stream_name)
+    async def _handle_stream_send_msg(
+        self, topic: str, payload: bytes, stream_name: str
+    ) -> None:
+        """
+        Handle an MQTT message that contains data to send to a stream.
+        """
+        self.stream_output_queues[stream_name].put_nowait(payload)
 
     async def set_digital_output(
         self, module: GenericGPIO, output_config: ConfigType, value: bool
@@ -1145,39 +1811,102 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
         Set a digital output, taking into account whether it's configured
         to be inverted.
         """
-        set_value = value != output_config["inverted"]
-        await module.async_set_pin(output_config["pin"], set_value)
-        _LOG.info(
-            "Digital output '%s' set to %s (%s)",
-            output_config["name"],
-            set_value,
-            "on" if value else "off",
+        await self.set_digital_outputs(module, [(output_config, value)])
+
+    async def set_digital_outputs(
+        self, module: GenericGPIO, outputs: List[Tuple[ConfigType, bool]]
+    ) -> None:
+        """
+        Set a number of digital outputs on the same GPIO module in one go, taking into
+        account whether each is configured to be inverted.
+        """
+        await module.async_set_pins(
+            {
+                output_config["pin"]: value != output_config["inverted"]
+                for output_config, value in outputs
+            }
         )
-        self.event_bus.fire(DigitalOutputChangedEvent(output_config["name"], value))
+        for output_config, value in outputs:
+            _LOG.info(
+                "Digital output '%s' set to %s (%s)",
+                output_config["name"],
+                value != output_config["inverted"],
+                "on" if value else "off",
+            )
+            self.event_bus.fire(DigitalOutputChangedEvent(output_config["name"], value))
 
     # Tasks
 
     async def _mqtt_task_loop(self) -> None:
         """
-        This loop pulls tasks from `self.mqtt_task_queue` and awaits (runs) them, so that
-        we don't try to run MQTT tasks before the MQTT connection is initialised.
+        This loop pulls requests from `self.mqtt_task_queue` and sends them, so that we
+        don't try to send anything before the MQTT connection is initialised.
+
+        Up to `mqtt.max_inflight` tasks are run at once, so that each publish doesn't
+        have to wait for the broker to acknowledge the one before it. Tasks with the same
+        key (the topic, for publishes) are still run one after another, in order.
         """
         if not self.mqtt_connected.is_set():
             _LOG.debug("_mqtt_task_loop awaiting MQTT connection")
             await self.mqtt_connected.wait()
             _LOG.debug("_mqtt_task_loop unblocked after MQTT connection")
-        while True:
-            entry = await self.mqtt_task_queue.get()
-            _LOG.debug(
-                "Running MQTT task with priority %s: %s", entry.priority, entry.coro
-            )
-            try:
-                await entry.coro
-            except MQTTException:
-                raise
-            except Exception:  # pylint: disable=broad-except
-                _LOG.exception("Exception while handling MQTT task:")
-            self.mqtt_task_queue.task_done()
+
+        loop_task = asyncio.current_task()
+        inflight = asyncio.Semaphore(self.config["mqtt"]["max_inflight"])
+        running: Set["asyncio.Task[None]"] = set()
+        latest: Dict[Optional[str], "asyncio.Task[None]"] = {}
+        failures: List[BaseException] = []
+
+        def task_finished(entry: MQTTQueueEntry, task: "asyncio.Task[None]") -> None:
+            running.discard(task)
+            inflight.release()
+            if latest.get(entry.key) is task:
+                del latest[entry.key]
+            if task.cancelled():
+                return
+            exc = task.exception()
+            if isinstance(exc, MQTTException):
+                # Stop the loop, so that the main loop reconnects to the broker
+                if not failures and loop_task is not None:
+                    failures.append(exc)
+                    loop_task.cancel()
+            elif exc is not None:
+                _LOG.error("Exception while handling MQTT task:", exc_info=exc)
+
+        try:
+            while True:
+                entry = await self.mqtt_task_queue.get()
+                await inflight.acquire()
+                _LOG.debug(
+                    "Running MQTT task with priority %s: %s", entry.priority, entry.request
+                )
+                task = self.loop.create_task(
+                    self._run_mqtt_task(entry, latest.get(entry.key))
+                )
+                latest[entry.key] = task
+                running.add(task)
+                task.add_done_callback(partial(task_finished, entry))
+        except asyncio.CancelledError:
+            if failures:
+                raise failures[0] from None
+            raise
+        finally:
+            for task in running:
+                task.cancel()
+
+    async def _run_mqtt_task(
+        self, entry: MQTTQueueEntry, previous: Optional["asyncio.Task[None]"]
+    ) -> None:
+        """
+        Send a request from the MQTT task queue, once the previous one with the same key
+        has finished.
+        """
+        if previous is not None:
+            await asyncio.wait([previous])
+        if isinstance(entry.request, MQTTSubscribe):
+            await self._mqtt_subscribe(entry.request.topics)
+        else:
+            await self._mqtt_publish(entry.request)
 
     async def _mqtt_keep_alive_loop(self) -> None:
         """
@@ -1254,39 +1983,6 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
                 _LOG.debug("Received message on topic %r: %r", msg.topic, payload_str)
             await self._handle_mqtt_msg(msg.topic, msg.payload)
 
-    async def _remove_finished_transient_tasks(self) -> None:
-        """
-        Remove any finished transient tasks from the list of transient tasks.
-
-        This function runs in an infinite loop, sleeping for 1 second in each iteration.
-        It checks for any finished tasks in the list of transient tasks and removes them.
-        Once the finished tasks are removed, it gathers the results of those tasks and checks
-        for any exceptions. If an exception is found, it raises the exception and logs an error
-        message with the task information.
-
-        Parameters:
-            None
-
-        Returns:
-            None
-        """
-        while True:
-            await asyncio.sleep(1)
-            finished_tasks = [x for x in self.transient_tasks if x.done()]
-            if not finished_tasks:
-                continue
-            for task in finished_tasks:
-                self.transient_tasks.remove(task)
-            results = await asyncio.gather(*finished_tasks, return_exceptions=True)
-            for i, exception in [
-                x for x in enumerate(results) if isinstance(x[1], Exception)
-            ]:
-                task = finished_tasks[i]
-                try:
-                    raise exception
-                except Exception:  # pylint: disable=broad-except
-                    _LOG.exception("Exception in task: %r:", task)
-
     async def digital_output_loop(
         self, module: GenericGPIO, queue: "asyncio.Queue[Tuple[ConfigType, str]]"
     ) -> None:
@@ -1299,28 +1995,60 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
         It may seem like we should use this loop to handle /set_on_ms and /set_off_ms
         messages, but it's actually better that we don't, since any timed stuff would
         hold up /set messages that need to take place immediately.
+
+        Every message already waiting on the queue is taken off it at once and the
+        resulting output values are applied to the module with as few set_pins() calls
+        as possible, so that many outputs changed at the same time are written together.
+        A batch is cut short when an output that's already in it appears again, so that
+        each message is written in the order it was received and pulses aren't lost.
         """
         while True:
-            out_conf, payload = await queue.get()
-            if payload not in (out_conf["on_payload"], out_conf["off_payload"]):
-                _LOG.warning(
-                    "'%s' is not a valid payload for output %s. Only '%s' and '%s' are allowed.",
-                    payload,
-                    out_conf["name"],
-                    out_conf["on_payload"],
-                    out_conf["off_payload"],
-                )
-                continue
+            entries = [await queue.get()]
+            while True:
+                try:
+                    entries.append(queue.get_nowait())
+                except QueueEmpty:
+                    break
 
-            value = payload == out_conf["on_payload"]
-            await self.set_digital_output(module, out_conf, value)
+            outputs: Dict[str, Tuple[ConfigType, bool]] = {}
+            for out_conf, payload in entries:
+                if payload not in (out_conf["on_payload"], out_conf["off_payload"]):
+                    _LOG.warning(
+                        (
+                            "'%s' is not a valid payload for output %s. "
+                            "Only '%s' and '%s' are allowed."
+                        ),
+                        payload,
+                        out_conf["name"],
+                        out_conf["on_payload"],
+                        out_conf["off_payload"],
+                    )
+                    continue
+                if out_conf["name"] in outputs:
+                    await self._set_digital_output_batch(module, list(outputs.values()))
+                    outputs = {}
+                outputs[out_conf["name"]] = (out_conf, payload == out_conf["on_payload"])
+            if outputs:
+                await self._set_digital_output_batch(module, list(outputs.values()))
+
+    async def _set_digital_output_batch(
+        self, module: GenericGPIO, outputs: List[Tuple[ConfigType, bool]]
+    ) -> None:
+        """
+        Write a batch of digital outputs to a module together, and start the timers
+        for any of them which are to be set back after `timed_set_ms`.
+        """
+        await self.set_digital_outputs(module, outputs)
 
+        for out_conf, value in outputs:
             try:
                 msec = out_conf["timed_set_ms"]
             except KeyError:
                 continue
 
-            async def reset_timer(out_conf: ConfigType = out_conf) -> None:
+            async def reset_timer(
+                out_conf: ConfigType = out_conf, value: bool = value, msec: int = msec
+            ) -> None:
                 """
                 Reset the output to the opposite value after x ms.
                 """
@@ -1336,7 +2064,7 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
                 await self.set_digital_output(module, out_conf, not value)
 
             task = self.loop.create_task(reset_timer())
-            self.transient_tasks.append(task)
+            self.transient_tasks.add(task)
 
     async def stream_output_loop(
         self,
@@ -1347,10 +2075,11 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
         """
         Wait for data to appear on the queue, then send it to the stream.
         """
+        framer = self.stream_framers.get(stream_conf["name"])
         while True:
             data = await queue.get()
             try:
-                await module.async_write(data)
+                await module.async_write(data if framer is None else framer.encode(data))
             except Exception:  # pylint: disable=broad-except
                 _LOG.exception(
                     "Exception while sending data to stream '%s':", stream_conf["name"]
@@ -1386,14 +2115,12 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
                         self._mqtt_task_loop(),
                         self._mqtt_rx_loop(),
                         self._mqtt_keep_alive_loop(),
-                        self._remove_finished_transient_tasks(),
+                        self._mqtt_outbox_replay_loop(),
                     )
                 ]
 
-                self.running.set()
-
-                if self.config["mqtt"].get("ha_discovery", {}).get("enabled"):
-                    self._ha_discovery_announce()
+                if self.initialised:
+                    self._announce_ready()
 
                 await asyncio.gather(*self.critical_tasks)
             except asyncio.CancelledError:
@@ -1444,13 +2171,8 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
 
             self.loop.add_signal_handler(sig, signal_handler)
 
-        self._init_gpio_modules()
-        self._init_digital_inputs()
-        self._init_digital_outputs()
-        self._init_sensor_modules()
-        self._init_sensor_inputs()
-        self._init_stream_modules()
-
+        self._init_task = self.loop.create_task(self._initialise())
+        self._init_task.add_done_callback(self._initialise_done)
         self._main_task = self.loop.create_task(self._main_loop())
 
         _LOG.debug("Going Asynchronous")
@@ -1470,14 +2192,60 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
                             module_type,
                             module,
                         )
+            EXECUTORS.shutdown(wait=False)
+        if not self._init_task.cancelled() and self._init_task.exception() is not None:
+            raise cast(BaseException, self._init_task.exception())
         _LOG.debug("run() complete")
 
+    async def _initialise(self) -> None:
+        """
+        Initialise all of the modules and their IO. This runs alongside connecting to
+        MQTT, with the slow parts of setting the modules up done on worker threads.
+        """
+        await self._construct_modules()
+        self._init_gpio_modules()
+        self._init_digital_inputs()
+        self._init_digital_outputs()
+        self._init_sensor_modules()
+        await self._setup_sensor_inputs()
+        self._init_sensor_inputs()
+        self._init_stream_modules()
+        self.initialised = True
+        _LOG.info("Initialised all modules")
+        if self.mqtt_connected.is_set():
+            self._announce_ready()
+
+    def _initialise_done(self, task: "asyncio.Task[None]") -> None:
+        """
+        Stop the server if initialisation failed.
+        """
+        if task.cancelled() or task.exception() is None:
+            return
+        _LOG.error("Unable to initialise:", exc_info=task.exception())
+        if self._main_task is not None:
+            self._main_task.cancel()
+
     async def shutdown(self) -> None:
         """
         Shut down all of the tasks involved in running the server.
         """
+        await self.scheduler.stop()
+        self._stop_stream_reading()
+        for sampler in self.sensor_samplers.values():
+            await self.loop.run_in_executor(None, sampler.stop)
+
         # Cancel our tasks
-        our_tasks: List["asyncio.Task[Any]"] = self.critical_tasks + self.transient_tasks
+        _LOG.debug(
+            "%s transient task(s) still running, %s finished, of which %s failed",
+            len(self.transient_tasks),
+            self.transient_tasks.finished,
+            self.transient_tasks.failed,
+        )
+        our_tasks: List["asyncio.Task[Any]"] = self.critical_tasks + list(
+            self.transient_tasks
+        )
+        if self._init_task is not None and not self._init_task.done():
+            our_tasks.append(self._init_task)
         for task in our_tasks:
             task.cancel()
 
@@ -1488,14 +2256,22 @@ class MqttIo:  # pylint: disable=too-many-instance-attributes
                 continue
             if isinstance(result, Exception):
                 _LOG.error("Task %s raised an exception: %s", results[i], result)
-
-        # Close any remaining unscheduled mqtt coroutines
-        while True:
-            try:
-                mqtt_coro = self.mqtt_task_queue.get_nowait()
-            except QueueEmpty:
-                break
-            mqtt_coro.coro.close()
+        self.interrupt_queue.log_counts()
+
+        if self.outbox is not None:
+            # Keep any messages we haven't sent yet, to send next time. They were all
+            # queued before the messages still in the outbox, so go in front of them.
+            unsent: List[OutboxRecord] = []
+            while not self.mqtt_task_queue.empty():
+                request = self.mqtt_task_queue.get_nowait().request
+                if isinstance(request, MQTTMessageSend):
+                    unsent.append(OutboxRecord(request.created_at, request))
+            self.outbox.prepend(unsent)
+            self.outbox.close()
+        if not self.mqtt_task_queue.empty():
+            _LOG.warning(
+                "Discarding %s unsent MQTT request(s)", self.mqtt_task_queue.qsize()
+            )
 
         if self.mqtt is not None:
             await self._mqtt_publish(
@@ -6,6 +6,25 @@ Feature: Valid main config validation
         Given a valid config
         When we validate the main config
         Then the config validates
+
+    Scenario: Normalised config is cached and reused
+        Given a valid config
+        When we validate the main config with a config cache
+        And we validate the main config with a config cache
+        Then the config validates
+        And the config cache should contain 1 config(s)
+        And the validated mqtt config section should contain
+            """
+            host: localhost
+            port: 1883
+            """
+        Given the mqtt config section dict contains
+            """
+            port: 1884
+            """
+        When we validate the main config with a config cache
+        Then the config cache should contain 1 config(s)
+        And the config cache should only be readable by its owner
     
     # GPIO
 
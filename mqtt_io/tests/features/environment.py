@@ -13,7 +13,6 @@ def before_scenario(context: Any, scenario: Any) -> None:
     context.data = dict(
         raw_config={},
         loop=context.loop,
-        transient_tasks=[],
         event_subs={},
         mocks={},
     )
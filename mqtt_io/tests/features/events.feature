@@ -0,0 +1,37 @@
+Feature: Event bus
+    Scenario: Plain function listeners are called as soon as an event is fired
+        Given a valid config
+        When we validate the main config
+        And we instantiate MqttIo
+        And we subscribe a plain function to SensorReadEvent
+        And we fire a new SensorReadEvent event with
+            """
+            sensor_name: mock
+            value: 1
+            """
+        Then the plain function should have received 1 SensorReadEvent event(s)
+
+    Scenario: Events fired from another thread are dispatched together
+        Given a valid config
+        When we validate the main config
+        And we instantiate MqttIo
+        And we subscribe a plain function to SensorReadEvent
+        And we fire 5 new SensorReadEvent events from another thread with
+            """
+            sensor_name: mock
+            value: 1
+            """
+        Then the events should have been dispatched together
+        And the plain function should have received 5 SensorReadEvent event(s)
+
+    Scenario: Finished listener tasks are forgotten and their failures counted
+        Given a valid config
+        When we validate the main config
+        And we instantiate MqttIo
+        And we subscribe a failing coroutine function to SensorReadEvent
+        And we fire a new SensorReadEvent event with
+            """
+            sensor_name: mock
+            value: 1
+            """
+        Then 0 transient task(s) should be running and 1 should have failed
@@ -0,0 +1,28 @@
+Feature: Interrupts on the gpiod GPIO module
+
+    Scenario Outline: A burst of gpiod events is read at once and debounced
+        Given a gpiod GPIO module with interrupts on pins 4,5 and a bouncetime of 10ms
+        When gpiod pin 4 has a burst of events timestamped on the <clock> clock as <timestamp_type>
+            | ms | edge    |
+            | 0  | rising  |
+            | 3  | falling |
+            | 12 | falling |
+            | 20 | rising  |
+            | 25 | falling |
+        Then the gpiod interrupt callbacks should have been called with
+            | pin | ms | value |
+            | 4   | 0  | high  |
+            | 4   | 12 | low   |
+            | 4   | 25 | low   |
+
+        Examples:
+            | clock     | timestamp_type |
+            | monotonic | nanoseconds    |
+            | monotonic | timedelta      |
+            | realtime  | nanoseconds    |
+            | realtime  | datetime       |
+
+    Scenario: Stopping the gpiod interrupt thread wakes it up straight away
+        Given a gpiod GPIO module with interrupts on pins 4 and a bouncetime of 10ms
+        When we clean up the gpiod GPIO module
+        Then the gpiod interrupt thread should have stopped within 0.5 seconds
@@ -110,7 +110,7 @@ Feature: GPIO module runtime
         And we instantiate MqttIo
         And we initialise GPIO modules
         And we initialise digital inputs
-        # Mock this to stop the digital_input_poller from firing events too
+        # Mock this to stop the poll_digital_inputs job from firing events too
         And we mock _handle_digital_input_value on MqttIo
         And we mock _mqtt_publish on MqttIo
         And we fire a new DigitalInputChangedEvent event with
@@ -141,7 +141,7 @@ Feature: GPIO module runtime
         And we instantiate MqttIo
         And we initialise GPIO modules
         And we initialise digital inputs
-        # Mock this to stop the digital_input_poller from firing events too
+        # Mock this to stop the poll_digital_inputs job from firing events too
         And we mock _handle_digital_input_value on MqttIo
         And we mock _mqtt_publish on MqttIo
         And we fire a new DigitalInputChangedEvent event from another thread with
@@ -173,7 +173,7 @@ Feature: GPIO module runtime
         And we instantiate MqttIo
         And we initialise GPIO modules
         And we initialise digital inputs
-        # Mock this to stop the digital_input_poller from firing events too
+        # Mock this to stop the poll_digital_inputs job from firing events too
         And we mock _handle_digital_input_value on MqttIo
         And we mock _mqtt_publish on MqttIo
         And we fire a new DigitalInputChangedEvent event with
@@ -204,7 +204,7 @@ Feature: GPIO module runtime
         And we instantiate MqttIo
         And we initialise GPIO modules
         And we initialise digital inputs
-        # Mock this to stop the digital_input_poller from firing events too
+        # Mock this to stop the poll_digital_inputs job from firing events too
         And we mock _handle_digital_input_value on MqttIo
         And we mock _mqtt_publish on MqttIo
         And we fire a new DigitalInputChangedEvent event with
@@ -236,7 +236,7 @@ Feature: GPIO module runtime
         And we instantiate MqttIo
         And we initialise GPIO modules
         And we initialise digital inputs
-        # Mock this to stop the digital_input_poller from firing events too
+        # Mock this to stop the poll_digital_inputs job from firing events too
         And we mock _handle_digital_input_value on MqttIo
         And we mock _mqtt_publish on MqttIo
         And we fire a new DigitalInputChangedEvent event with
@@ -249,3 +249,276 @@ Feature: GPIO module runtime
             """
             payload: "ON"
             """
+
+    Scenario: Queued digital output messages are written to the module together
+        Given a valid config
+        And the config has an entry in gpio_modules with
+            """
+            name: mock
+            module: mock
+            """
+        And the config has an entry in digital_outputs with
+            """
+            name: mock0
+            module: mock
+            pin: 0
+            """
+        And the config has an entry in digital_outputs with
+            """
+            name: mock1
+            module: mock
+            pin: 1
+            inverted: yes
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise GPIO modules
+        And we initialise digital outputs
+        And we queue a ON message for digital output mock0
+        And we queue a ON message for digital output mock1
+        And we wait for the digital output loops to handle their queues
+        Then GPIO module mock should have set pins
+            """
+            - {0: true, 1: false}
+            """
+
+    Scenario: Queued pulses on a digital output are all written in order
+        Given a valid config
+        And the config has an entry in gpio_modules with
+            """
+            name: mock
+            module: mock
+            """
+        And the config has an entry in digital_outputs with
+            """
+            name: mock0
+            module: mock
+            pin: 0
+            """
+        And the config has an entry in digital_outputs with
+            """
+            name: mock1
+            module: mock
+            pin: 1
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise GPIO modules
+        And we initialise digital outputs
+        And we queue a ON message for digital output mock0
+        And we queue a ON message for digital output mock1
+        And we queue a OFF message for digital output mock0
+        And we queue a OFF message for digital output mock1
+        And we wait for the digital output loops to handle their queues
+        Then GPIO module mock should have set pins
+            """
+            - {0: true, 1: true}
+            - {0: false, 1: false}
+            """
+
+    Scenario: MQTT messages are routed to the digital outputs they're for
+        Given a valid config
+        And the config has an entry in gpio_modules with
+            """
+            name: mock
+            module: mock
+            """
+        And the config has an entry in digital_outputs with
+            """
+            name: mock0
+            module: mock
+            pin: 0
+            """
+        And the config has an entry in digital_outputs with
+            """
+            name: mock1
+            module: mock
+            pin: 1
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise GPIO modules
+        And we initialise digital outputs
+        And we receive an MQTT message on topic output/mock1/set with payload ON
+        And we receive an MQTT message on topic output/mock2/set with payload ON
+        And we receive an MQTT message on topic output/mock0/unknown with payload ON
+        And we wait for the digital output loops to handle their queues
+        Then GPIO module mock should have set pins
+            """
+            - {1: true}
+            """
+
+    Scenario Outline: Bursts of interrupts are queued instead of dropped
+        Given a valid config
+        And the config has an entry in gpio_modules with
+            """
+            name: mock
+            module: mock
+            """
+        And the config has an entry in digital_inputs with
+            """
+            name: mock0
+            module: mock
+            pin: 0
+            interrupt: both
+            interrupt_coalesce: <coalesce>
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise GPIO modules
+        And we initialise digital inputs
+        And we trigger interrupts on mock0 from another thread with values true, false, true, false
+        Then digital input mock0 should have been published with payloads <payloads>
+        And <coalesced> interrupt(s) should have been coalesced
+        When we shut down MqttIo, watching the interrupt queue's log
+        Then the interrupt queue should have logged <logged>
+
+        Examples:
+            | coalesce | payloads              | coalesced | logged                          |
+            | all      | ON, OFF, ON, OFF      | 0         | nothing                         |
+            | last     | OFF                   | 3         | 0 dropped and 3 coalesced       |
+
+    Scenario: Interrupt timestamps are published in a JSON payload
+        Given a valid config
+        And the config has an entry in gpio_modules with
+            """
+            name: mock
+            module: mock
+            """
+        And the config has an entry in digital_inputs with
+            """
+            name: mock0
+            module: mock
+            pin: 0
+            interrupt: both
+            publish_timestamp: json
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise GPIO modules
+        And we initialise digital inputs
+        And we trigger interrupts on mock0 from another thread with values true
+        Then the MQTT message queued on topic input/mock0 should have its timestamp in its JSON payload
+            """
+            "ON"
+            """
+
+    Scenario Outline: Polled digital inputs are debounced by their filter
+        Given a valid config
+        And the config has an entry in gpio_modules with
+            """
+            name: mock
+            module: mock
+            """
+        And the config has an entry in digital_inputs with
+            """
+            name: mock0
+            module: mock
+            pin: 0
+            # Don't let the scheduled poll read a value too
+            poll_phase: 60
+            filter:
+              type: <type>
+              samples: 3
+              stable_time: 0
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise GPIO modules
+        And we initialise digital inputs
+        And we poll digital input mock0 reading values true, true, false, true, true, false, true, false, false, false
+        Then digital input mock0 should have been published with payloads <payloads>
+
+        Examples:
+            | type        | payloads                            |
+            | consecutive | OFF                                 |
+            | majority    | ON, OFF                             |
+            | stable      | ON, OFF, ON, OFF, ON, OFF           |
+
+    Scenario: Polled digital inputs with a stable filter ignore changes shorter than stable_time
+        Given a valid config
+        And the config has an entry in gpio_modules with
+            """
+            name: mock
+            module: mock
+            """
+        And the config has an entry in digital_inputs with
+            """
+            name: mock0
+            module: mock
+            pin: 0
+            # Don't let the scheduled poll read a value too
+            poll_phase: 60
+            filter:
+              type: stable
+              stable_time: 50
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise GPIO modules
+        And we initialise digital inputs
+        And we poll digital input mock0 reading values at times
+            | ms  | value |
+            | 0   | true  |
+            | 60  | true  |
+            | 100 | false |
+            | 120 | true  |
+            | 200 | true  |
+            | 250 | false |
+            | 280 | false |
+            | 310 | false |
+        Then digital input mock0 should have been published with payloads ON, OFF
+
+    Scenario: Pulses are counted on digital inputs in count mode
+        Given a valid config
+        And the config has an entry in gpio_modules with
+            """
+            name: mock
+            module: mock
+            """
+        And the config has an entry in digital_inputs with
+            """
+            name: meter
+            module: mock
+            pin: 0
+            interrupt: falling
+            count:
+              interval: 60
+              pulses_per_unit: 2
+              digits: 1
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise GPIO modules
+        And we initialise digital inputs
+        And we trigger interrupts on meter from another thread with values false, false, false, false, false
+        And we publish the pulse count for digital input meter
+        Then the pulse count for digital input meter should be published with
+            """
+            count: 5
+            total: 2.5
+            period_min: 0.0
+            period_max: 0.0
+            period_mean: 0.0
+            """
+        And 0 MQTT message(s) should be queued for publishing
+
+    Scenario: Digital inputs in count mode must be interrupts
+        Given a valid config
+        And the config has an entry in gpio_modules with
+            """
+            name: mock
+            module: mock
+            """
+        And the config has an entry in digital_inputs with
+            """
+            name: meter
+            module: mock
+            pin: 0
+            count:
+              interval: 60
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise GPIO modules
+        Then initialising digital inputs should fail with RuntimeConfigError
@@ -0,0 +1,18 @@
+Feature: Installing module requirements
+
+    Scenario Outline: Requirements are checked against the installed distributions
+        When we check whether requirement <requirement> is satisfied
+        Then the requirement should be <state>
+
+        Examples:
+            | requirement         | state       |
+            | PyYAML              | satisfied   |
+            | pyyaml              | satisfied   |
+            | PyYAML>=1.0         | satisfied   |
+            | PyYAML<1.0          | unsatisfied |
+            | not-a-real-package  | unsatisfied |
+
+    Scenario: Missing requirements of all modules are installed with one pip run
+        Given modules requiring PyYAML, not-a-real-package and not-a-real-package, other-fake-package
+        When we install the missing requirements of the modules
+        Then pip should have been run once to install not-a-real-package, other-fake-package
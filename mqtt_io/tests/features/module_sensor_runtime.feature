@@ -0,0 +1,361 @@
+Feature: Sensor module runtime
+    Scenario: Sensor inputs on a module which reads all of its values at once share a read
+        Given a valid config
+        And the config has an entry in sensor_modules with
+            """
+            name: mock
+            module: mock
+            """
+        And the config has an entry in sensor_inputs with
+            """
+            name: mock_temp
+            module: mock
+            type: temperature
+            """
+        And the config has an entry in sensor_inputs with
+            """
+            name: mock_hum
+            module: mock
+            type: humidity
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise sensor modules
+        And we initialise sensor inputs
+        And sensor module mock reads all of its values at once with
+            """
+            temperature: 21.5
+            humidity: 40
+            """
+        And we read sensor inputs mock_temp and mock_hum at the same time
+        Then sensor input mock_temp should have read a value of 21.5
+        And sensor input mock_hum should have read a value of 40
+        And sensor module mock should have 1 call(s) to get_values
+        And sensor module mock should have 0 call(s) to get_value
+
+    Scenario: Modules which read one value at a time can still read all of them
+        Given a valid config
+        And the config has an entry in sensor_modules with
+            """
+            name: mock
+            module: mock
+            """
+        And the config has an entry in sensor_inputs with
+            """
+            name: mock_temp
+            module: mock
+            type: temperature
+            """
+        And the config has an entry in sensor_inputs with
+            """
+            name: mock_hum
+            module: mock
+            type: humidity
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise sensor modules
+        And we initialise sensor inputs
+        And we read all of sensor module mock's values
+        Then sensor module mock should have read the values
+            """
+            temperature: 1
+            humidity: 1
+            """
+        And sensor module mock should have 2 call(s) to get_value
+
+    Scenario: Sensor modules have to implement get_value or get_values
+        When we define a sensor module which implements neither get_value nor get_values
+        Then the sensor module shouldn't be able to be instantiated
+
+    Scenario: Sensor values are reused until the cache TTL expires
+        Given a valid config
+        And the config has an entry in sensor_modules with
+            """
+            name: mock
+            module: mock
+            cache_ttl: 60
+            """
+        And the config has an entry in sensor_inputs with
+            """
+            name: mock_temp
+            module: mock
+            type: temperature
+            """
+        And the config has an entry in sensor_inputs with
+            """
+            name: mock_hum
+            module: mock
+            type: humidity
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise sensor modules
+        And we initialise sensor inputs
+        And sensor module mock reads all of its values at once with
+            """
+            temperature: 21.5
+            humidity: 40
+            """
+        And we read sensor input mock_temp
+        And we read sensor input mock_hum
+        Then sensor input mock_hum should have read a value of 40
+        And sensor module mock should have 1 call(s) to get_values
+
+    Scenario: Sensor values within the deadband aren't published
+        Given a valid config
+        And the config has an entry in sensor_modules with
+            """
+            name: mock
+            module: mock
+            """
+        And the config has an entry in sensor_inputs with
+            """
+            name: mock0
+            module: mock
+            # Don't let the scheduled poll publish a value too
+            phase: 60
+            deadband: 0.5
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise sensor modules
+        And we initialise sensor inputs
+        And we fire a new SensorReadEvent event with
+            """
+            sensor_name: mock0
+            value: 20.0
+            """
+        And we fire a new SensorReadEvent event with
+            """
+            sensor_name: mock0
+            value: 20.3
+            """
+        And we fire a new SensorReadEvent event with
+            """
+            sensor_name: mock0
+            value: 20.6
+            """
+        Then 2 MQTT message(s) should be queued for publishing
+
+    Scenario: Unchanged sensor values aren't published when publishing on change only
+        Given a valid config
+        And the config has an entry in sensor_modules with
+            """
+            name: mock
+            module: mock
+            """
+        And the config has an entry in sensor_inputs with
+            """
+            name: mock0
+            module: mock
+            # Don't let the scheduled poll publish a value too
+            phase: 60
+            publish_on_change_only: yes
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise sensor modules
+        And we initialise sensor inputs
+        And we fire a new SensorReadEvent event with
+            """
+            sensor_name: mock0
+            value: 20.0
+            """
+        And we fire a new SensorReadEvent event with
+            """
+            sensor_name: mock0
+            value: 20.0
+            """
+        And we fire a new SensorReadEvent event with
+            """
+            sensor_name: mock0
+            value: 20.1
+            """
+        Then 2 MQTT message(s) should be queued for publishing
+
+    Scenario: Unchanged sensor values are published after max_silence
+        Given a valid config
+        And the config has an entry in sensor_modules with
+            """
+            name: mock
+            module: mock
+            """
+        And the config has an entry in sensor_inputs with
+            """
+            name: mock0
+            module: mock
+            # Don't let the scheduled poll publish a value too
+            phase: 60
+            publish_on_change_only: yes
+            max_silence: 0
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise sensor modules
+        And we initialise sensor inputs
+        And we fire a new SensorReadEvent event with
+            """
+            sensor_name: mock0
+            value: 20.0
+            """
+        And we fire a new SensorReadEvent event with
+            """
+            sensor_name: mock0
+            value: 20.0
+            """
+        Then 2 MQTT message(s) should be queued for publishing
+
+    Scenario: Aggregated sensor values are published as statistics over the window
+        Given a valid config
+        And the config has an entry in sensor_modules with
+            """
+            name: mock
+            module: mock
+            """
+        And the config has an entry in sensor_inputs with
+            """
+            name: mock0
+            module: mock
+            # Don't let the scheduled poll read a value too
+            phase: 60
+            digits: 1
+            aggregate:
+              window: 10
+              statistics: [count, min, max, mean, p50]
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise sensor modules
+        And we initialise sensor inputs
+        And we mock _mqtt_publish on MqttIo
+        And we fire a new SensorReadEvent event with
+            """
+            sensor_name: mock0
+            value: 1.0
+            """
+        And we fire a new SensorReadEvent event with
+            """
+            sensor_name: mock0
+            value: 4.0
+            """
+        And we fire a new SensorReadEvent event with
+            """
+            sensor_name: mock0
+            value: 2.5
+            """
+        And we publish the aggregate for sensor input mock0
+        Then _mqtt_publish on MqttIo should be called with MQTT message
+            """
+            payload: '{"count": 3, "min": 1.0, "max": 4.0, "mean": 2.5, "p50": 2.5}'
+            """
+
+    Scenario: High-rate sensor readings are handled in batches
+        Given a valid config
+        And the config has an entry in sensor_modules with
+            """
+            name: mock
+            module: mock
+            """
+        And the config has an entry in sensor_inputs with
+            """
+            name: mock0
+            module: mock
+            interval: 0.01
+            high_rate:
+              batch_interval: 60
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we subscribe to SensorReadEvent
+        And we initialise sensor modules
+        And we initialise sensor inputs
+        And we let sensor input mock0 sample for 0.2 seconds
+        Then sensor input mock0 should have sampled at least 5 readings
+        And SensorReadEvent is fired with
+            """
+            sensor_name: mock0
+            value: 1
+            """
+
+    Scenario: High-rate sampling errors are counted rather than each being logged
+        Given a valid config
+        And the config has an entry in sensor_modules with
+            """
+            name: mock
+            module: mock
+            """
+        And the config has an entry in sensor_inputs with
+            """
+            name: mock0
+            module: mock
+            interval: 0.005
+            high_rate:
+              batch_interval: 60
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise sensor modules
+        And sensor module mock fails every read
+        And we initialise sensor inputs
+        And we let sensor input mock0 sample for 0.2 seconds
+        Then sampling sensor input mock0 should have logged one exception and reported at least 5 failed reads
+
+    Scenario: High-rate sampling shares the module's executor with polled reads
+        Given a valid config
+        And the config has an entry in sensor_modules with
+            """
+            name: mock
+            module: mock
+            """
+        And the config has an entry in sensor_inputs with
+            """
+            name: mock0
+            module: mock
+            interval: 0.005
+            high_rate:
+              batch_interval: 60
+            """
+        And the config has an entry in sensor_inputs with
+            """
+            name: mock1
+            module: mock
+            phase: 60
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise sensor modules
+        And sensor module mock keeps track of how it's read
+        And we initialise sensor inputs
+        And we poll sensor input mock1 while sensor input mock0 samples for 0.2 seconds
+        Then sensor input mock0 should have sampled at least 5 readings
+        And sensor module mock should only have been read one at a time, from its executor
+
+    Scenario: Sensor read timestamps are published as MQTT user properties
+        Given a valid config
+        And the config has an entry in sensor_modules with
+            """
+            name: mock
+            module: mock
+            """
+        And the config has an entry in sensor_inputs with
+            """
+            name: mock0
+            module: mock
+            # Don't let the scheduled poll publish a value too
+            phase: 60
+            publish_timestamp: user_property
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise sensor modules
+        And we initialise sensor inputs
+        And we fire a new SensorReadEvent event with
+            """
+            sensor_name: mock0
+            value: 20.5
+            """
+        Then the MQTT message queued on topic sensor/mock0 should have its timestamp in its user properties
+            """
+            20.50
+            """
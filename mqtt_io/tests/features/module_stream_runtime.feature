@@ -0,0 +1,152 @@
+Feature: Stream module runtime
+    Scenario: Streams with a file descriptor are read as soon as data arrives
+        Given a valid config
+        And the config has an entry in stream_modules with
+            """
+            name: mock
+            module: mock
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise stream modules
+        And we collect StreamDataReadEvents
+        And the mock stream mock receives hello
+        Then stream mock should have been read as
+            """
+            [hello]
+            """
+
+    Scenario: Streams are polled instead if reading them when data arrives fails
+        Given a valid config
+        And the config has an entry in stream_modules with
+            """
+            name: mock
+            module: mock
+            read_interval: 5
+            read_phase: 2
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise stream modules
+        And the mock stream mock fails to be read
+        Then stream mock should be polled every 5 seconds, starting 2 seconds after it fell back to polling
+
+    Scenario: Data is held back until a stream has been idle for its idle_timeout
+        Given a valid config
+        And the config has an entry in stream_modules with
+            """
+            name: mock
+            module: mock
+            idle_timeout: 0.1
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise stream modules
+        And we collect StreamDataReadEvents
+        And the mock stream mock receives hel
+        And the mock stream mock receives lo
+        Then stream mock should have been read as
+            """
+            []
+            """
+        When we wait 0.2 seconds
+        Then stream mock should have been read as
+            """
+            [hello]
+            """
+
+    Scenario: Data read from a stream is split into delimited frames
+        Given a valid config
+        And the config has an entry in stream_modules with
+            """
+            name: mock
+            module: mock
+            framing:
+              type: delimiter
+              delimiter: ";"
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise stream modules
+        And we collect StreamDataReadEvents
+        And the mock stream mock receives one;tw
+        And the mock stream mock receives o;three;fo
+        Then stream mock should have been read as
+            """
+            [one, two, three]
+            """
+
+    Scenario Outline: Delimited frames over max_frame bytes are discarded
+        Given a valid config
+        And the config has an entry in stream_modules with
+            """
+            name: mock
+            module: mock
+            framing:
+              type: delimiter
+              delimiter: ";"
+              max_frame: 5
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise stream modules
+        And we collect StreamDataReadEvents
+        And the mock stream mock receives <first>
+        And the mock stream mock receives <second>
+        Then stream mock should have been read as
+            """
+            <frames>
+            """
+
+        Examples:
+            | first  | second | frames    |
+            | 12345  | ;      | ["12345"] |
+            | 123456 | ;7;    | ["7"]     |
+            | 123    | 45;    | ["12345"] |
+            | 123    | 456;7; | ["7"]     |
+
+    Scenario Outline: Escaped SLIP frames of up to max_frame bytes are kept
+        Given a valid config
+        And the config has an entry in stream_modules with
+            """
+            name: mock
+            module: mock
+            framing:
+              type: slip
+              max_frame: 2
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise stream modules
+        And we collect StreamDataReadEvents
+        And the mock stream mock receives the bytes <first>
+        And the mock stream mock receives the bytes <second>
+        Then stream mock should have been read as the bytes
+            """
+            <frames>
+            """
+
+        Examples:
+            | first             | second   | frames |
+            | db dc db dc       | c0       | [c0c0] |
+            | db dc db dc db dc | c0 41 c0 | ["41"] |
+
+    Scenario: Data written to a stream is framed
+        Given a valid config
+        And the config has an entry in stream_modules with
+            """
+            name: mock
+            module: mock
+            framing:
+              type: delimiter
+              delimiter: ";"
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise stream modules
+        And we receive an MQTT message on topic stream/mock/send with payload hello
+        And we wait for the stream output loops to handle their queues
+        Then mock stream mock should have been written
+            """
+            [hello;]
+            """
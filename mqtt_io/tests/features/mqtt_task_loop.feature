@@ -0,0 +1,243 @@
+Feature: MQTT task loop
+    Scenario: MQTT messages on different topics are published concurrently, in order per topic
+        Given a valid config
+        And the mqtt config section dict contains
+            """
+            max_inflight: 4
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we mock _mqtt_publish on MqttIo to take 0.05 seconds
+        And we queue MQTT messages on topic a with payloads
+            """
+            [1, 2, 3]
+            """
+        And we queue MQTT messages on topic b with payloads
+            """
+            [1, 2, 3]
+            """
+        And we run the MQTT task loop for 0.3 seconds
+        Then the MQTT messages on topic a should have been published with payloads
+            """
+            [1, 2, 3]
+            """
+        And the MQTT messages on topic b should have been published with payloads
+            """
+            [1, 2, 3]
+            """
+        And 2 MQTT messages should have been publishing at once
+
+    Scenario: No more than max_inflight MQTT messages are published at once
+        Given a valid config
+        And the mqtt config section dict contains
+            """
+            max_inflight: 2
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we mock _mqtt_publish on MqttIo to take 0.05 seconds
+        And we queue MQTT messages on topic a with payloads
+            """
+            [1]
+            """
+        And we queue MQTT messages on topic b with payloads
+            """
+            [1]
+            """
+        And we queue MQTT messages on topic c with payloads
+            """
+            [1]
+            """
+        And we run the MQTT task loop for 0.2 seconds
+        Then 2 MQTT messages should have been publishing at once
+
+    Scenario: The oldest MQTT messages are dropped when the queue is full
+        Given a valid config
+        And the mqtt config section dict contains
+            """
+            queue_size: 2
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we mock _mqtt_publish on MqttIo to take 0.0 seconds
+        And we queue MQTT messages on topic a with payloads
+            """
+            [1, 2, 3]
+            """
+        And we run the MQTT task loop for 0.05 seconds
+        Then the MQTT messages on topic a should have been published with payloads
+            """
+            [2, 3]
+            """
+
+    Scenario: The newest MQTT messages are dropped when the queue is full
+        Given a valid config
+        And the mqtt config section dict contains
+            """
+            queue_size: 2
+            queue_overflow: drop_newest
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we mock _mqtt_publish on MqttIo to take 0.0 seconds
+        And we queue MQTT messages on topic a with payloads
+            """
+            [1, 2, 3]
+            """
+        And we run the MQTT task loop for 0.05 seconds
+        Then the MQTT messages on topic a should have been published with payloads
+            """
+            [1, 2]
+            """
+
+    Scenario: Queued MQTT messages are replaced by the last value on the same topic
+        Given a valid config
+        And the mqtt config section dict contains
+            """
+            queue_size: 2
+            queue_overflow: last_value
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we mock _mqtt_publish on MqttIo to take 0.0 seconds
+        And we queue MQTT messages on topic a with payloads
+            """
+            [1]
+            """
+        And we queue MQTT messages on topic b with payloads
+            """
+            [1, 2, 3]
+            """
+        And we run the MQTT task loop for 0.05 seconds
+        Then the MQTT messages on topic a should have been published with payloads
+            """
+            [1]
+            """
+        And the MQTT messages on topic b should have been published with payloads
+            """
+            [3]
+            """
+
+    Scenario: MQTT messages sent while disconnected are stored in the outbox and replayed
+        Given a valid config
+        And the MQTT outbox is stored in a temporary directory
+        When we validate the main config
+        And we instantiate MqttIo
+        And we mock _mqtt_publish on MqttIo to take 0.01 seconds
+        And we queue MQTT messages on topic a with payloads
+            """
+            [1, 2, 3]
+            """
+        Then the MQTT outbox should be not empty
+        When we run the MQTT task loop for 0.3 seconds
+        Then the MQTT messages on topic a should have been published with payloads
+            """
+            [1, 2, 3]
+            """
+        And the MQTT outbox should be empty
+
+    Scenario: MQTT user properties are kept in the outbox
+        Given a valid config
+        And the MQTT outbox is stored in a temporary directory
+        When we validate the main config
+        And we instantiate MqttIo
+        And we mock _mqtt_publish on MqttIo to take 0.01 seconds
+        And we queue an MQTT message on topic a with user properties [["timestamp", "123.5"]]
+        Then the MQTT outbox should be not empty
+        When we run the MQTT task loop for 0.1 seconds
+        Then the MQTT message on topic a should have been published with user properties [["timestamp", "123.5"]]
+
+    Scenario: MQTT messages sent while the outbox is being replayed don't overtake it
+        Given a valid config
+        And the MQTT outbox is stored in a temporary directory
+        When we validate the main config
+        And we instantiate MqttIo
+        And we mock _mqtt_publish on MqttIo to take 0.01 seconds
+        And we queue MQTT messages on topic a with payloads
+            """
+            [1, 2, 3]
+            """
+        And a message on topic a with payload 4 is queued while the MQTT outbox reads its message with payload 3
+        And we run the MQTT task loop for 0.3 seconds
+        Then the MQTT messages on topic a should have been published with payloads
+            """
+            [1, 2, 3, 4]
+            """
+
+    Scenario: Unsent MQTT messages are kept in front of the outbox when shutting down
+        Given a valid config
+        And the MQTT outbox is stored in a temporary directory
+        When we validate the main config
+        And we instantiate MqttIo
+        And MqttIo is connected to MQTT
+        And we queue MQTT messages on topic a with payloads
+            """
+            [1, 2]
+            """
+        And MqttIo is disconnected from MQTT
+        And we queue MQTT messages on topic a with payloads
+            """
+            [3, 4]
+            """
+        And we shut down MqttIo
+        Then the MQTT outbox should contain messages on topic a from before shutting down with payloads
+            """
+            [1, 2, 3, 4]
+            """
+
+    Scenario Outline: Digital output and stream subscriptions are sent together
+        Given a valid config
+        And the mqtt config section dict contains
+            """
+            wildcard_subscriptions: <wildcard>
+            """
+        And the config has an entry in gpio_modules with
+            """
+            name: mock
+            module: mock
+            """
+        And the config has an entry in digital_outputs with
+            """
+            name: mock0
+            module: mock
+            pin: 0
+            """
+        And the config has an entry in digital_outputs with
+            """
+            name: mock1
+            module: mock
+            pin: 1
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise GPIO modules
+        And we initialise digital outputs
+        And we fire a new DigitalSubscribeEvent event with
+            """
+            {}
+            """
+        Then a single MQTT subscription should be queued for topics
+            """
+            <topics>
+            """
+
+        Examples:
+            | wildcard | topics                                                                                                       |
+            | no       | [output/mock0/set, output/mock0/set_on_ms, output/mock0/set_off_ms, output/mock1/set, output/mock1/set_on_ms, output/mock1/set_off_ms] |
+            | yes      | [output/+/+]                                                                                                 |
+
+    Scenario Outline: User properties are only sent with MQTT v5
+        Given a valid config
+        And the mqtt config section dict contains
+            """
+            protocol: "<protocol>"
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we publish a message with user properties using the configured MQTT client
+        Then the MQTT library should have been asked to publish with user properties <props>
+
+        Examples:
+            | protocol | props                    |
+            | 5        | [["timestamp", "123.5"]] |
+            | 3.1.1    | none                     |
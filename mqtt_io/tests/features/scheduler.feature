@@ -0,0 +1,20 @@
+Feature: Scheduler for periodic jobs
+    Scenario: Job is run on every interval
+        Given a scheduler
+        When we add a job named fast with an interval of 0.05 seconds which takes 0.0 seconds
+        And we run the scheduler for 0.27 seconds
+        Then job fast should have run between 5 and 6 times
+        And job fast should have 0 overruns
+
+    Scenario: Job is skipped while its previous run is still in progress
+        Given a scheduler
+        When we add a job named slow with an interval of 0.05 seconds which takes 0.12 seconds
+        And we run the scheduler for 0.27 seconds
+        Then job slow should have run between 2 and 3 times
+        And job slow should have some overruns
+
+    Scenario: Job isn't run until its phase has elapsed
+        Given a scheduler
+        When we add a job named late with an interval of 0.05 seconds and a phase of 0.2 seconds
+        And we run the scheduler for 0.1 seconds
+        Then job late should have run between 0 and 0 times
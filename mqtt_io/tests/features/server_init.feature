@@ -1 +1,52 @@
 Feature: Tests for initialisation of the main server component
+
+    Scenario: Modules are constructed at the same time
+        Given a valid config
+        And the config has an entry in sensor_modules with
+            """
+            name: mock1
+            module: mock
+            setup_delay: 0.3
+            """
+        And the config has an entry in sensor_modules with
+            """
+            name: mock2
+            module: mock
+            setup_delay: 0.3
+            """
+        And the config has an entry in sensor_inputs with
+            """
+            name: mock_sensor
+            module: mock1
+            phase: 60
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise MqttIo alongside connecting to MQTT
+        Then MqttIo should have been initialised within 0.5 seconds
+        And sensor module mock1 should be initialised
+        And sensor module mock2 should be initialised
+        And sensor module mock1 should have 1 call(s) to setup_sensor
+
+    Scenario: Modules which share an executor are constructed one after another
+        Given a valid config
+        And the config has an entry in sensor_modules with
+            """
+            name: mock1
+            module: mock
+            executor: shared
+            setup_delay: 0.3
+            """
+        And the config has an entry in sensor_modules with
+            """
+            name: mock2
+            module: mock
+            executor: shared
+            setup_delay: 0.3
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise MqttIo alongside connecting to MQTT
+        Then MqttIo should have taken at least 0.6 seconds to initialise
+        And sensor module mock1 should be initialised
+        And sensor module mock2 should be initialised
@@ -48,10 +48,35 @@ Feature: Tests for the successful initialisation of the GPIO aspects of the serv
         And mock0 pin should have been set up as an input
         And GPIO module mock shouldn't have a setup_interrupt() call for mock0
         And mock0 shouldn't be configured as a remote interrupt
-        And a digital input poller task is added for mock0
+        And a digital input poller job is scheduled for mock0
         And GPIO module mock shouldn't have an output queue initialised
         And a digital output loop task isn't added for GPIO module mock
 
+    Scenario: Polled digital inputs on the same module share a poller
+        Given a valid config
+        And the config has an entry in gpio_modules with
+            """
+            name: mock
+            module: mock
+            """
+        And the config has an entry in digital_inputs with
+            """
+            name: mock0
+            module: mock
+            pin: 0
+            """
+        And the config has an entry in digital_inputs with
+            """
+            name: mock1
+            module: mock
+            pin: 1
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise GPIO modules
+        And we initialise digital inputs
+        Then digital inputs mock0 and mock1 should share a digital input poller job
+
     Scenario: Initialising an interrupt digital input
         Given a valid config
         And the config has an entry in gpio_modules with
@@ -79,7 +104,8 @@ Feature: Tests for the successful initialisation of the GPIO aspects of the serv
         And GPIO module mock should have a setup_interrupt_callback() call for mock0
         And mock0 shouldn't be configured as a remote interrupt
         And mock0 should be configured as a rising interrupt
-        And a digital input poller task isn't added for mock0
+        And GPIO module mock should have 1 call(s) to start_interrupts
+        And a digital input poller job isn't scheduled for mock0
         And GPIO module mock shouldn't have an output queue initialised
         And a digital output loop task isn't added for GPIO module mock
 
@@ -126,8 +152,8 @@ Feature: Tests for the successful initialisation of the GPIO aspects of the serv
         And mock1 should be configured as a remote interrupt
         And mock0 should be configured as a rising interrupt
         And mock1 should be configured as a falling interrupt
-        And a digital input poller task isn't added for mock0
-        And a digital input poller task is added for mock1
+        And a digital input poller job isn't scheduled for mock0
+        And a digital input poller job is scheduled for mock1
         And GPIO module mock shouldn't have an output queue initialised
         And a digital output loop task isn't added for GPIO module mock
 
@@ -155,7 +181,7 @@ Feature: Tests for the successful initialisation of the GPIO aspects of the serv
         And GPIO module mock should have a setup_pin() call for mock0
         And mock0 pin should have been set up as an output
         And GPIO module mock should have an output queue initialised
-        And a digital input poller task isn't added for mock0
+        And a digital input poller job isn't scheduled for mock0
         And a digital output loop task is added for GPIO module mock
 
     Scenario: Digital output publishes initial high/on value when publish_initial=True
@@ -373,4 +399,46 @@ Feature: Tests for the successful initialisation of the GPIO aspects of the serv
         Then _mqtt_publish on MqttIo should be called with MQTT message
             """
             payload: "OFF"
-            """
\ No newline at end of file
+            """
+    Scenario: GPIO modules on the same bus share an executor
+        Given a valid config
+        And the config has an entry in gpio_modules with
+            """
+            name: mock
+            module: mock
+            executor: i2c-1
+            """
+        And the config has an entry in gpio_modules with
+            """
+            name: mock2
+            module: mock
+            executor: i2c-1
+            """
+        And the config has an entry in gpio_modules with
+            """
+            name: mock3
+            module: mock
+            """
+        And the config has an entry in digital_inputs with
+            """
+            name: mock_in
+            module: mock
+            pin: 0
+            """
+        And the config has an entry in digital_inputs with
+            """
+            name: mock2_in
+            module: mock2
+            pin: 0
+            """
+        And the config has an entry in digital_inputs with
+            """
+            name: mock3_in
+            module: mock3
+            pin: 0
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise GPIO modules
+        Then GPIO modules mock and mock2 should share an executor
+        And GPIO modules mock and mock3 shouldn't share an executor
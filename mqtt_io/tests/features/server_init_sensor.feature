@@ -22,3 +22,79 @@ Feature: Tests for the successful initialisation of the Sensor aspects of the se
             """
             test: true
             """
+
+    Scenario: Sensor modules on the board's default I2C bus share an executor
+        Given a valid config
+        And the mock sensor module uses the board's default I2C bus
+        And the config has an entry in sensor_modules with
+            """
+            name: mock
+            module: mock
+            """
+        And the config has an entry in sensor_modules with
+            """
+            name: mock2
+            module: mock
+            """
+        And the config has an entry in sensor_modules with
+            """
+            name: mock3
+            module: mock
+            executor: i2c-3
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise sensor modules
+        Then sensor modules mock and mock2 should share an executor
+        And sensor modules mock and mock3 shouldn't share an executor
+
+    Scenario: Sensor modules on the board's default I2C bus share its numbered executor
+        Given a valid config
+        And the mock sensor module uses the board's default I2C bus
+        And Blinka says that the board's default I2C port is bus 1
+        And the config has an entry in sensor_modules with
+            """
+            name: mock
+            module: mock
+            """
+        And the config has an entry in sensor_modules with
+            """
+            name: mock2
+            module: mock
+            executor: i2c-1
+            """
+        And the config has an entry in sensor_modules with
+            """
+            name: mock3
+            module: mock
+            executor: i2c-3
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise sensor modules
+        Then sensor modules mock and mock2 should share an executor
+        And sensor modules mock and mock3 shouldn't share an executor
+
+    Scenario: GPIO and sensor modules with the same name don't share an executor
+        Given a valid config
+        And the config has an entry in gpio_modules with
+            """
+            name: mock
+            module: mock
+            """
+        And the config has an entry in digital_outputs with
+            """
+            name: mock0
+            module: mock
+            pin: 0
+            """
+        And the config has an entry in sensor_modules with
+            """
+            name: mock
+            module: mock
+            """
+        When we validate the main config
+        And we instantiate MqttIo
+        And we initialise gpio modules
+        And we initialise sensor modules
+        Then gpio module mock and sensor module mock shouldn't share an executor
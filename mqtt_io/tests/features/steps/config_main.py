@@ -1,3 +1,6 @@
+import os
+import stat
+import tempfile
 from typing import Any
 import yaml # type: ignore
 from behave import given, then, when  # type: ignore
@@ -44,6 +47,32 @@ def step(context):
         context.data["validation_error"] = exc
 
 
+@when("we validate the main config with a config cache")  # type: ignore[no-redef]
+def step(context: Any) -> None:
+    cache_dir = context.data.get("config_cache_dir")
+    if cache_dir is None:
+        tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        context.add_cleanup(tmpdir.cleanup)
+        cache_dir = context.data["config_cache_dir"] = tmpdir.name
+    context.data["config"] = validate_and_normalise_main_config(
+        context.data["raw_config"], cache_dir
+    )
+
+
+@then("the config cache should contain {count:d} config(s)")  # type: ignore[no-redef]
+def step(context: Any, count: int) -> None:
+    cached = os.listdir(context.data["config_cache_dir"])
+    assert len(cached) == count, f"Config cache contains {cached}"
+
+
+@then("the config cache should only be readable by its owner")  # type: ignore[no-redef]
+def step(context: Any) -> None:
+    cache_dir = context.data["config_cache_dir"]
+    for name in os.listdir(cache_dir):
+        mode = stat.S_IMODE(os.stat(os.path.join(cache_dir, name)).st_mode)
+        assert mode == 0o600, f"{name} has permissions {oct(mode)}"
+
+
 @then("config validation fails")  # type: ignore[no-redef]
 def step(context):
     print("--- Config file ---")
@@ -64,3 +93,11 @@ def step(context):
     assert (
         "config" in context.data
     ), 'Validated config should be in context.data["config"] (test error)'
+
+
+@then("the validated {section} config section should contain")  # type: ignore[no-redef]
+def step(context: Any, section: str) -> None:
+    data = yaml.safe_load(context.text)
+    config = context.data["config"][section]
+    for key, value in data.items():
+        assert config[key] == value, f"{section}.{key} is {config[key]!r}, not {value!r}"
@@ -1,6 +1,6 @@
 import asyncio
 import concurrent.futures
-from typing import Any, Dict, Type
+from typing import Any, Dict, List, Type
 
 import yaml # type: ignore
 from behave import given, then, when  # type: ignore
@@ -25,6 +25,57 @@ def step(context: Any, event_type_name: str) -> None:
     mqttio.event_bus.subscribe(event_type, mock_sub)
 
 
+@when("we subscribe a plain function to {event_type_name}")  # type: ignore[no-redef]
+def step(context: Any, event_type_name: str) -> None:
+    mqttio: MqttIo = context.data["mqttio"]
+    event_type = getattr(events, event_type_name)
+    received: List[events.Event] = []
+    context.data["event_subs"][event_type_name] = received
+    mqttio.event_bus.subscribe(event_type, received.append)
+
+
+@when("we subscribe a failing coroutine function to {event_type_name}")  # type: ignore[no-redef]
+def step(context: Any, event_type_name: str) -> None:
+    mqttio: MqttIo = context.data["mqttio"]
+    event_type = getattr(events, event_type_name)
+
+    async def fail(event: events.Event) -> None:
+        raise RuntimeError("Failing on purpose")
+
+    mqttio.event_bus.subscribe(event_type, fail)
+
+
+@when("we fire {count:d} new {event_type_name} events from another thread with")  # type: ignore[no-redef]
+@async_run_until_complete(loop="loop")
+async def step(context: Any, count: int, event_type_name: str) -> None:
+    data: Dict[str, Any] = yaml.safe_load(context.text)
+    mqttio: MqttIo = context.data["mqttio"]
+    event_type: Type[events.Event] = getattr(events, event_type_name)
+
+    def fire_all() -> List[Any]:
+        futures = []
+        for _ in range(count):
+            futures.extend(mqttio.event_bus.fire(event_type(**data)))
+        return futures
+
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        futures = executor.submit(fire_all).result()
+    context.data["fire_futures"] = futures
+    await asyncio.gather(*futures)
+
+
+@then("the events should have been dispatched together")  # type: ignore[no-redef]
+def step(context: Any) -> None:
+    futures = context.data["fire_futures"]
+    assert len(set(map(id, futures))) == 1, "Events were dispatched separately"
+
+
+@then("the plain function should have received {count:d} {event_type_name} event(s)")  # type: ignore[no-redef]
+def step(context: Any, count: int, event_type_name: str) -> None:
+    received = context.data["event_subs"][event_type_name]
+    assert len(received) == count, f"Received {len(received)} events instead of {count}"
+
+
 @when("we fire a new {event_type_name} event with")  # type: ignore[no-redef]
 @async_run_until_complete(loop="loop")
 async def step(context: Any, event_type_name: str) -> None:
@@ -34,7 +85,7 @@ async def step(context: Any, event_type_name: str) -> None:
     event_type: Type[events.Event] = getattr(events, event_type_name)
     event = event_type(**data)
     task_futures = mqttio.event_bus.fire(event)
-    await asyncio.gather(*task_futures)
+    await asyncio.gather(*task_futures, return_exceptions=True)
 
 
 @when("we fire a new {event_type_name} event from another thread with")  # type: ignore[no-redef]
@@ -68,3 +119,10 @@ def step(context: Any, event_type_name: str) -> None:
     event = mock_sub.call_args.args[0]
     for key, value in data.items():
         assert getattr(event, key) == value, f"Expecting event.{key} to be {value}"
+
+
+@then("{running:d} transient task(s) should be running and {failed:d} should have failed")  # type: ignore[no-redef]
+def step(context: Any, running: int, failed: int) -> None:
+    tasks = context.data["mqttio"].transient_tasks
+    assert len(tasks) == running, f"{len(tasks)} transient tasks are running"
+    assert tasks.failed == failed, f"{tasks.failed} transient tasks have failed"
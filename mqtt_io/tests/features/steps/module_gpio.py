@@ -1,9 +1,16 @@
 import asyncio
-from typing import Any
+import json
+import threading
+from typing import Any, List, Set
+from unittest.mock import Mock, patch
 
+import yaml  # type: ignore
 from behave import given, then, when  # type: ignore
 from behave.api.async_step import async_run_until_complete  # type: ignore
+from mqtt_io import interrupts
+from mqtt_io.events import Timestamp
 from mqtt_io.modules.gpio import InterruptEdge, PinDirection
+from mqtt_io.mqtt import MQTTMessageSend
 from mqtt_io.server import MqttIo
 
 # pylint: disable=function-redefined,protected-access
@@ -80,39 +87,40 @@ def step(
         assert relevant_call_args is None
 
 
-@then("a digital input poller task {is_isnt} added for {pin_name}")  # type: ignore[no-redef]
+def get_poller_jobs_pin_names(mqttio: MqttIo) -> List[Set[str]]:
+    """
+    Get the names of the digital inputs polled by each of the scheduler's jobs.
+    """
+    return [
+        {in_conf["name"] for in_conf in job.callback.args[1]}  # type: ignore[attr-defined]
+        for job in mqttio.scheduler.jobs
+        if getattr(job.callback, "func", None) == mqttio.poll_digital_inputs
+    ]
+
+
+@then("a digital input poller job {is_isnt} scheduled for {pin_name}")  # type: ignore[no-redef]
 def step(context: Any, is_isnt: str, pin_name: str):
     assert is_isnt in ("is", "isn't")
     mqttio = context.data["mqttio"]
-
-    poller_task_pin_names = {
-        get_coro(task).cr_frame.f_locals["in_conf"]["name"]
-        for task in mqttio.transient_tasks
-        if isinstance(task, asyncio.Task)  # concurrent.Future doesn't have get_coro()
-        and get_coro(task).__name__ == "digital_input_poller"
-    }
+    poller_job_pin_names = set().union(*get_poller_jobs_pin_names(mqttio))
     if is_isnt == "is":
         assert (
-            pin_name in poller_task_pin_names
-        ), "Should have a digital input poller task added to transient_tasks"
+            pin_name in poller_job_pin_names
+        ), "Should have a digital input poller job added to the scheduler"
     else:
         assert (
-            pin_name not in poller_task_pin_names
-        ), "Shouldn't have a digital input poller task added to transient_tasks"
+            pin_name not in poller_job_pin_names
+        ), "Shouldn't have a digital input poller job added to the scheduler"
 
-    poller_task_pin_names = {
-        get_coro(task).cr_frame.f_locals["in_conf"]["name"]
-        for task in asyncio.all_tasks(loop=mqttio.loop)
-        if get_coro(task).__name__ == "digital_input_poller"
-    }
-    if is_isnt == "is":
-        assert (
-            pin_name in poller_task_pin_names
-        ), "Should have a digital input poller task added to the event loop"
-    else:
-        assert (
-            pin_name not in poller_task_pin_names
-        ), "Shouldn't have a digital input poller task added to the event loop"
+
+@then("digital inputs {pin_names} should share a digital input poller job")  # type: ignore[no-redef]
+def step(context: Any, pin_names: str):
+    mqttio = context.data["mqttio"]
+    expected_names = set(pin_names.split(" and "))
+    poller_jobs_pin_names = get_poller_jobs_pin_names(mqttio)
+    assert (
+        expected_names in poller_jobs_pin_names
+    ), f"Should have a single poller job for {expected_names}: {poller_jobs_pin_names}"
 
 
 @then("a digital output loop task {is_isnt} added for GPIO module {module_name}")  # type: ignore[no-redef]
@@ -185,6 +193,34 @@ async def step(context: Any, pin_name: str, value_str: str, last_value_str: str)
     await mqttio._handle_digital_input_value(in_conf, value, last_value)
 
 
+@when("we queue a {payload} message for digital output {pin_name}")  # type: ignore[no-redef]
+def step(context: Any, payload: str, pin_name: str) -> None:
+    mqttio: MqttIo = context.data["mqttio"]
+    out_conf = mqttio.digital_output_configs[pin_name]
+    mqttio.gpio_output_queues[out_conf["module"]].put_nowait((out_conf, payload))
+
+
+@when("we wait for the digital output loops to handle their queues")  # type: ignore[no-redef]
+@async_run_until_complete(loop="loop")
+async def step(context: Any) -> None:
+    mqttio: MqttIo = context.data["mqttio"]
+    for _ in range(100):
+        if all(queue.empty() for queue in mqttio.gpio_output_queues.values()):
+            break
+        await asyncio.sleep(0.01)
+    # Give the executor a chance to run set_pins()
+    await asyncio.sleep(0.1)
+
+
+@then("GPIO module {module_name} should have set pins")  # type: ignore[no-redef]
+def step(context: Any, module_name: str) -> None:
+    data = yaml.safe_load(context.text)
+    mqttio: MqttIo = context.data["mqttio"]
+    module = mqttio.gpio_modules[module_name]
+    calls = [args[0] for args, _ in module.set_pins.call_args_list]
+    assert calls == data, f"set_pins() was called with {calls}, not {data}"
+
+
 @when("we set digital output {pin_name} to {on_off}")  # type: ignore[no-redef]
 @async_run_until_complete(loop="loop")
 async def step(context: Any, pin_name: str, on_off: str) -> None:
@@ -193,3 +229,168 @@ async def step(context: Any, pin_name: str, on_off: str) -> None:
     out_conf = mqttio.digital_output_configs[pin_name]
     module = mqttio.gpio_modules[out_conf["module"]]
     await mqttio.set_digital_output(module, out_conf, on_off == "on")
+
+
+@then("GPIO modules {module_a} and {module_b} {should_shouldnt} share an executor")  # type: ignore[no-redef]
+def step(context: Any, module_a: str, module_b: str, should_shouldnt: str) -> None:
+    assert should_shouldnt in ("should", "shouldn't")
+    mqttio = context.data["mqttio"]
+    shared = (
+        mqttio.gpio_modules[module_a].executor is mqttio.gpio_modules[module_b].executor
+    )
+    if should_shouldnt == "should":
+        assert shared, f"{module_a} and {module_b} should share an executor"
+    else:
+        assert not shared, f"{module_a} and {module_b} shouldn't share an executor"
+
+
+@when("we trigger interrupts on {pin_name} from another thread with values {values}")  # type: ignore[no-redef]
+@async_run_until_complete(loop="loop")
+async def step(context: Any, pin_name: str, values: str) -> None:
+    mqttio: MqttIo = context.data["mqttio"]
+    in_conf = mqttio.digital_input_configs[pin_name]
+    module = mqttio.gpio_modules[in_conf["module"]]
+    module.get_interrupt_value = Mock(  # type: ignore[method-assign]
+        side_effect=lambda pin, *args, **kwargs: kwargs["value"]
+    )
+    callback = next(
+        call[0][3]
+        for call in module.setup_interrupt_callback.call_args_list  # type: ignore[attr-defined]
+        if call[0][0] == in_conf["pin"]
+    )
+    mqttio.running.set()
+
+    def trigger() -> None:
+        for value in values.split(", "):
+            callback(value=value == "true")
+
+    # Block the loop until they've all been triggered, so that they're drained together
+    thread = threading.Thread(target=trigger)
+    thread.start()
+    thread.join()
+    # Let the interrupt queue be drained
+    await asyncio.sleep(0.05)
+
+
+@then("digital input {pin_name} should have been published with payloads {payloads}")  # type: ignore[no-redef]
+def step(context: Any, pin_name: str, payloads: str) -> None:
+    mqttio: MqttIo = context.data["mqttio"]
+    published: List[str] = []
+    while not mqttio.mqtt_task_queue.empty():
+        msg = mqttio.mqtt_task_queue.get_nowait().request
+        if isinstance(msg, MQTTMessageSend) and msg.topic.endswith(f"/input/{pin_name}"):
+            assert msg.payload is not None
+            published.append(msg.payload.decode("utf8"))
+    assert published == payloads.split(", "), published
+
+
+@then("{count:d} interrupt(s) should have been coalesced")  # type: ignore[no-redef]
+def step(context: Any, count: int) -> None:
+    mqttio: MqttIo = context.data["mqttio"]
+    assert mqttio.interrupt_queue.coalesced == count, mqttio.interrupt_queue.coalesced
+    assert mqttio.interrupt_queue.dropped == 0
+
+
+@when("we shut down MqttIo, watching the interrupt queue's log")  # type: ignore[no-redef]
+@async_run_until_complete(loop="loop")
+async def step(context: Any) -> None:
+    with patch.object(
+        interrupts._LOG, "info", wraps=interrupts._LOG.info
+    ) as log_info:
+        await context.data["mqttio"].shutdown()
+    context.data["mocks"]["interrupts_log_info"] = log_info
+
+
+@then("the interrupt queue should have logged {logged}")  # type: ignore[no-redef]
+def step(context: Any, logged: str) -> None:
+    logged_counts = [
+        call.args[1:]
+        for call in context.data["mocks"]["interrupts_log_info"].call_args_list
+        if call.args[0].startswith("Interrupt queue dropped")
+    ]
+    if logged == "nothing":
+        assert not logged_counts, logged_counts
+        return
+    dropped, _, _, coalesced, _ = logged.split()
+    assert logged_counts == [(int(dropped), int(coalesced))], logged_counts
+
+
+@when(  # type: ignore[no-redef]
+    "we poll digital input {pin_name} reading values at times"
+)
+@async_run_until_complete(loop="loop")
+async def step(context: Any, pin_name: str) -> None:
+    mqttio: MqttIo = context.data["mqttio"]
+    in_conf = mqttio.digital_input_configs[pin_name]
+    module = mqttio.gpio_modules[in_conf["module"]]
+    poll = next(
+        job.callback
+        for job in mqttio.scheduler.jobs
+        if getattr(job.callback, "func", None) == mqttio.poll_digital_inputs
+        and in_conf in job.callback.args[1]  # type: ignore[attr-defined]
+    )
+    start = Timestamp.now()
+    for row in context.table:
+        offset = int(row["ms"]) / 1000
+        module.get_pins = Mock(  # type: ignore[method-assign]
+            return_value={in_conf["pin"]: row["value"] == "true"}
+        )
+        with patch.object(
+            Timestamp,
+            "now",
+            return_value=Timestamp(start.monotonic + offset, start.wall + offset),
+        ):
+            await poll()
+
+
+@when("we poll digital input {pin_name} reading values {values}")  # type: ignore[no-redef]
+@async_run_until_complete(loop="loop")
+async def step(context: Any, pin_name: str, values: str) -> None:
+    mqttio: MqttIo = context.data["mqttio"]
+    in_conf = mqttio.digital_input_configs[pin_name]
+    module = mqttio.gpio_modules[in_conf["module"]]
+    poll = next(
+        job.callback
+        for job in mqttio.scheduler.jobs
+        if getattr(job.callback, "func", None) == mqttio.poll_digital_inputs
+        and in_conf in job.callback.args[1]  # type: ignore[attr-defined]
+    )
+    for value in values.split(", "):
+        module.get_pins = Mock(  # type: ignore[method-assign]
+            return_value={in_conf["pin"]: value == "true"}
+        )
+        await poll()
+
+
+@when("we publish the pulse count for digital input {pin_name}")  # type: ignore[no-redef]
+@async_run_until_complete(loop="loop")
+async def step(context: Any, pin_name: str) -> None:
+    mqttio: MqttIo = context.data["mqttio"]
+    await mqttio.publish_pulse_count(mqttio.digital_input_configs[pin_name])
+
+
+@then("the pulse count for digital input {pin_name} should be published with")  # type: ignore[no-redef]
+def step(context: Any, pin_name: str) -> None:
+    mqttio: MqttIo = context.data["mqttio"]
+    expected = yaml.safe_load(context.text)
+    entry = mqttio.mqtt_task_queue.get_nowait()
+    msg = entry.request
+    assert isinstance(msg, MQTTMessageSend)
+    assert msg.topic.endswith(f"/input/{pin_name}"), msg.topic
+    assert msg.payload is not None
+    data = json.loads(msg.payload)
+    for key, value in expected.items():
+        assert data[key] == value, f"Expecting {key} to be {value}: {data}"
+    assert data["rate"] > 0, data
+    assert data["period_min"] <= data["period_mean"] <= data["period_max"], data
+
+
+@then("initialising digital inputs should fail with {exc_name}")  # type: ignore[no-redef]
+def step(context: Any, exc_name: str) -> None:
+    mqttio: MqttIo = context.data["mqttio"]
+    try:
+        mqttio._init_digital_inputs()
+    except Exception as exc:  # pylint: disable=broad-except
+        assert type(exc).__name__ == exc_name, exc
+    else:
+        raise AssertionError(f"Should have raised {exc_name}")
@@ -0,0 +1,213 @@
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from types import ModuleType, SimpleNamespace
+from typing import Any, Dict, List
+from unittest.mock import Mock, patch
+
+from behave import given, then, when  # type: ignore
+from mqtt_io.modules.gpio import InterruptEdge, PinDirection, PinPUD
+from mqtt_io.modules.gpio import gpiod
+
+# pylint: disable=function-redefined
+
+EDGES = {"rising": 1, "falling": 2}
+
+
+class FakeLine:
+    """
+    A gpiod line whose events are added by the tests, with a pipe standing in for its
+    event file descriptor.
+    """
+
+    def __init__(self) -> None:
+        self.events: List[SimpleNamespace] = []
+        self.lock = threading.Lock()
+        self.read_fd, self.write_fd = os.pipe()
+
+    def request(self, *args: Any) -> None:
+        pass
+
+    def release(self) -> None:
+        pass
+
+    def get_value(self) -> int:
+        return 0
+
+    def event_get_fd(self) -> int:
+        return self.read_fd
+
+    def event_read_multiple(self) -> List[SimpleNamespace]:
+        with self.lock:
+            events, self.events = self.events, []
+            os.read(self.read_fd, 4096)
+        return events
+
+    def add_events(self, events: List[SimpleNamespace]) -> None:
+        with self.lock:
+            self.events.extend(events)
+            os.write(self.write_fd, b"\0")
+
+    def close(self) -> None:
+        os.close(self.read_fd)
+        os.close(self.write_fd)
+
+
+class FakeChip:
+    """
+    A gpiod chip which hands out fake lines.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.lines: Dict[int, FakeLine] = {}
+
+    def get_line(self, pin: int) -> FakeLine:
+        return self.lines.setdefault(pin, FakeLine())
+
+    def get_lines(self, pins: List[int]) -> Mock:
+        for pin in pins:
+            self.get_line(pin)
+        return Mock()
+
+
+def fake_gpiod_module() -> ModuleType:
+    """
+    Make a stand-in for the gpiod bindings, with just what the gpiod module uses.
+    """
+    module = ModuleType("gpiod")
+    module.chip = FakeChip  # type: ignore[attr-defined]
+    module.line_request = type(  # type: ignore[attr-defined]
+        "line_request",
+        (),
+        {
+            name: i
+            for i, name in enumerate(
+                (
+                    "DIRECTION_AS_IS",
+                    "DIRECTION_INPUT",
+                    "DIRECTION_OUTPUT",
+                    "EVENT_RISING_EDGE",
+                    "EVENT_FALLING_EDGE",
+                    "EVENT_BOTH_EDGES",
+                    "FLAG_BIAS_DISABLE",
+                    "FLAG_BIAS_PULL_UP",
+                    "FLAG_BIAS_PULL_DOWN",
+                )
+            )
+        },
+    )
+    module.line_event = SimpleNamespace(  # type: ignore[attr-defined]
+        RISING_EDGE=EDGES["rising"], FALLING_EDGE=EDGES["falling"]
+    )
+    return module
+
+
+def kernel_timestamp(clock: str, timestamp_type: str, secs: float) -> Any:
+    """
+    Make a line event timestamp for a time on the given clock, in the form that some
+    version of the bindings gives it.
+    """
+    timestamp_ns = int(secs * 1_000_000_000)
+    if timestamp_type == "nanoseconds":
+        return timestamp_ns
+    if timestamp_type == "timedelta":
+        return timedelta(microseconds=timestamp_ns // 1000)
+    assert timestamp_type == "datetime", timestamp_type
+    assert clock == "realtime", "Only realtime timestamps are given as datetimes"
+    return datetime.fromtimestamp(secs)
+
+
+@given(  # type: ignore[no-redef]
+    "a gpiod GPIO module with interrupts on pins {pins} and a bouncetime of {bouncetime:d}ms"
+)
+def step(context: Any, pins: str, bouncetime: int) -> None:
+    patcher = patch.dict(sys.modules, {"gpiod": fake_gpiod_module()})
+    patcher.start()
+    context.add_cleanup(patcher.stop)
+    module = gpiod.GPIO({"name": "gpiod", "chip": "/dev/gpiochip0"})
+    calls: List[Dict[str, Any]] = []
+    for pin in (int(x) for x in pins.split(",")):
+
+        def callback(pin: int = pin, **kwargs: Any) -> None:
+            calls.append(dict(pin=pin, **kwargs))
+
+        module.setup_pin(pin, PinDirection.INPUT, PinPUD.OFF, {})
+        module.setup_interrupt_callback(
+            pin, InterruptEdge.BOTH, {"bouncetime": bouncetime}, callback
+        )
+    module.start_interrupts()
+
+    def cleanup() -> None:
+        if module.interrupt_thread is not None and module.interrupt_thread.is_alive():
+            module.cleanup()
+        for line in module.chip.lines.values():
+            line.close()
+
+    context.add_cleanup(cleanup)
+    context.data["gpiod_module"] = module
+    context.data["gpiod_calls"] = calls
+
+
+@when(  # type: ignore[no-redef]
+    "gpiod pin {pin:d} has a burst of events timestamped on the {clock} clock as "
+    "{timestamp_type}"
+)
+def step(context: Any, pin: int, clock: str, timestamp_type: str) -> None:
+    assert clock in ("monotonic", "realtime"), clock
+    # The events happened a second ago, which is where the callbacks should place them
+    now = time.monotonic() if clock == "monotonic" else time.time()
+    context.data["gpiod_base_time"] = time.monotonic() - 1
+    context.data["gpiod_module"].chip.lines[pin].add_events(
+        [
+            SimpleNamespace(
+                event_type=EDGES[row["edge"]],
+                timestamp=kernel_timestamp(
+                    clock, timestamp_type, now - 1 + int(row["ms"]) / 1000
+                ),
+            )
+            for row in context.table
+        ]
+    )
+
+
+@then("the gpiod interrupt callbacks should have been called with")  # type: ignore[no-redef]
+def step(context: Any) -> None:
+    calls = context.data["gpiod_calls"]
+    expected = [
+        (int(row["pin"]), int(row["ms"]), row["value"] == "high") for row in context.table
+    ]
+    deadline = time.monotonic() + 1
+    while len(calls) < len(expected) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # Give it the chance to make any calls that it shouldn't have
+    time.sleep(0.05)
+    assert len(calls) == len(expected), calls
+    base_time = context.data["gpiod_base_time"]
+    for call, (pin, millis, value) in zip(calls, expected):
+        assert call["pin"] == pin, call
+        assert call["pin_value"] == value, call
+        # Allow for the time between reading the two clocks
+        assert abs(call["timestamp"] - (base_time + millis / 1000)) < 0.005, (
+            call,
+            base_time + millis / 1000,
+        )
+
+
+@when("we clean up the gpiod GPIO module")  # type: ignore[no-redef]
+def step(context: Any) -> None:
+    start = time.monotonic()
+    context.data["gpiod_module"].cleanup()
+    context.data["gpiod_cleanup_secs"] = time.monotonic() - start
+
+
+@then(  # type: ignore[no-redef]
+    "the gpiod interrupt thread should have stopped within {secs:f} seconds"
+)
+def step(context: Any, secs: float) -> None:
+    thread = context.data["gpiod_module"].interrupt_thread
+    assert not thread.is_alive(), "Interrupt thread should have stopped"
+    cleanup_secs = context.data["gpiod_cleanup_secs"]
+    assert cleanup_secs < secs, f"Stopping took {cleanup_secs} seconds"
@@ -0,0 +1,247 @@
+import asyncio
+import sys
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List
+from unittest.mock import Mock, patch
+
+import yaml
+from behave import given, then, when  # type: ignore
+from behave.api.async_step import async_run_until_complete  # type: ignore
+from mqtt_io.modules import BOARD_I2C_EXECUTOR_KEY, board_i2c_executor_key
+from mqtt_io import sampler as sampler_module
+from mqtt_io import server as server_module
+from mqtt_io.modules.sensor import GenericSensor, mock
+
+# pylint: disable=function-redefined,protected-access
+
+
+@when("sensor module {module_name} reads all of its values at once with")  # type: ignore[no-redef]
+def step(context: Any, module_name: str) -> None:
+    mqttio = context.data["mqttio"]
+    module = mqttio.sensor_modules[module_name]
+    module.get_values = Mock(return_value=yaml.safe_load(context.text))
+
+
+@when(  # type: ignore[no-redef]
+    "we define a sensor module which implements neither get_value nor get_values"
+)
+def step(context: Any) -> None:
+    class Sensor(GenericSensor):  # pylint: disable=abstract-method
+        """
+        Sensor module which can't read anything.
+        """
+
+    context.data["sensor_class"] = Sensor
+
+
+@then("the sensor module shouldn't be able to be instantiated")  # type: ignore[no-redef]
+def step(context: Any) -> None:
+    try:
+        context.data["sensor_class"]({"name": "broken"})
+    except TypeError as exc:
+        assert "get_value" in str(exc), exc
+    else:
+        raise AssertionError("Sensor module should be abstract")
+
+
+@when("we read all of sensor module {module_name}'s values")  # type: ignore[no-redef]
+def step(context: Any, module_name: str) -> None:
+    mqttio = context.data["mqttio"]
+    context.data["module_values"] = mqttio.sensor_modules[module_name].get_values()
+
+
+@then("sensor module {module_name} should have read the values")  # type: ignore[no-redef]
+def step(context: Any, module_name: str) -> None:
+    expected = yaml.safe_load(context.text)
+    actual = context.data["module_values"]
+    assert actual == expected, f"{module_name} read {actual} instead of {expected}"
+
+
+@when("we read sensor input {sensor_names}")  # type: ignore[no-redef]
+@when("we read sensor inputs {sensor_names} at the same time")  # type: ignore[no-redef]
+@async_run_until_complete(loop="loop")
+async def step(context: Any, sensor_names: str) -> None:
+    mqttio = context.data["mqttio"]
+    names = sensor_names.split(" and ")
+    confs = [mqttio.sensor_input_configs[name] for name in names]
+    values = await asyncio.gather(
+        *(mqttio.sensor_modules[conf["module"]].async_get_value(conf) for conf in confs)
+    )
+    context.data.setdefault("sensor_values", {}).update(dict(zip(names, values)))
+
+
+@then("sensor input {sensor_name} should have read a value of {value:g}")  # type: ignore[no-redef]
+def step(context: Any, sensor_name: str, value: float) -> None:
+    actual = context.data["sensor_values"][sensor_name]
+    assert actual == value, f"{sensor_name} should have read {value} but read {actual}"
+
+
+@then("{count:d} MQTT message(s) should be queued for publishing")  # type: ignore[no-redef]
+def step(context: Any, count: int) -> None:
+    mqttio = context.data["mqttio"]
+    queued = mqttio.mqtt_task_queue.qsize()
+    assert queued == count, f"Should have {count} message(s) queued, but have {queued}"
+
+
+@when("we publish the aggregate for sensor input {sensor_name}")  # type: ignore[no-redef]
+@async_run_until_complete(loop="loop")
+async def step(context: Any, sensor_name: str) -> None:
+    mqttio = context.data["mqttio"]
+    await mqttio.publish_sensor_aggregate(mqttio.sensor_input_configs[sensor_name])
+
+
+@when("we let sensor input {sensor_name} sample for {secs:f} seconds")  # type: ignore[no-redef]
+@async_run_until_complete(loop="loop")
+async def step(context: Any, sensor_name: str, secs: float) -> None:
+    mqttio = context.data["mqttio"]
+    sampler = mqttio.sensor_samplers[sensor_name]
+    await asyncio.sleep(secs)
+    sampler.stop()
+    context.data.setdefault("sample_counts", {})[sensor_name] = len(sampler.samples)
+    await mqttio.handle_sensor_samples(mqttio.sensor_input_configs[sensor_name])
+
+
+@then(  # type: ignore[no-redef]
+    "sensor input {sensor_name} should have sampled at least {count:d} readings"
+)
+def step(context: Any, sensor_name: str, count: int) -> None:
+    actual = context.data["sample_counts"][sensor_name]
+    assert actual >= count, f"Should have sampled at least {count} but sampled {actual}"
+
+
+@when("sensor module {module_name} fails every read")  # type: ignore[no-redef]
+def step(context: Any, module_name: str) -> None:
+    mqttio = context.data["mqttio"]
+    mqttio.sensor_modules[module_name].get_value = Mock(
+        side_effect=RuntimeError("Failing on purpose")
+    )
+    for name, logger, method in (
+        ("sampler_exception", sampler_module._LOG, "exception"),
+        ("server_warning", server_module._LOG, "warning"),
+    ):
+        patcher = patch.object(logger, method, wraps=getattr(logger, method))
+        context.data["mocks"][name] = patcher.start()
+        context.add_cleanup(patcher.stop)
+
+
+@then(  # type: ignore[no-redef]
+    "sampling sensor input {sensor_name} should have logged one exception and reported "
+    "at least {count:d} failed reads"
+)
+def step(context: Any, sensor_name: str, count: int) -> None:
+    mocks = context.data["mocks"]
+    assert mocks["sampler_exception"].call_count == 1, mocks["sampler_exception"]
+    (call,) = [
+        call
+        for call in mocks["server_warning"].call_args_list
+        if call.args[0].startswith("Failed to read sensor")
+    ]
+    assert call.args[1] == sensor_name, call
+    assert call.args[2] >= count, call
+    sampler = context.data["mqttio"].sensor_samplers[sensor_name]
+    assert sampler.errors == 0, "The errors should have been reset once reported"
+
+
+@when("sensor module {module_name} keeps track of how it's read")  # type: ignore[no-redef]
+def step(context: Any, module_name: str) -> None:
+    mqttio = context.data["mqttio"]
+    module = mqttio.sensor_modules[module_name]
+    lock = threading.Lock()
+    reads: Dict[str, Any] = dict(active=0, overlapped=0, threads=set())
+
+    def get_value(sens_conf: Any) -> int:
+        with lock:
+            reads["active"] += 1
+            if reads["active"] > 1:
+                reads["overlapped"] += 1
+            reads["threads"].add(threading.current_thread().name)
+        time.sleep(0.002)
+        with lock:
+            reads["active"] -= 1
+        return 1
+
+    module.get_value = get_value
+    context.data["module_reads"] = reads
+
+
+@when(  # type: ignore[no-redef]
+    "we poll sensor input {polled_name} while sensor input {sampled_name} samples "
+    "for {secs:f} seconds"
+)
+@async_run_until_complete(loop="loop")
+async def step(context: Any, polled_name: str, sampled_name: str, secs: float) -> None:
+    mqttio = context.data["mqttio"]
+    sampler = mqttio.sensor_samplers[sampled_name]
+    conf = mqttio.sensor_input_configs[polled_name]
+    module = mqttio.sensor_modules[conf["module"]]
+    values: List[Any] = []
+    deadline = time.monotonic() + secs
+    while time.monotonic() < deadline:
+        values.append(await module.async_get_value(conf))
+    sampler.stop()
+    context.data.setdefault("sample_counts", {})[sampled_name] = len(sampler.samples)
+    context.data["polled_values"] = values
+
+
+@then(  # type: ignore[no-redef]
+    "sensor module {module_name} should only have been read one at a time, from its "
+    "executor"
+)
+def step(context: Any, module_name: str) -> None:
+    reads = context.data["module_reads"]
+    assert context.data["polled_values"], "Sensor should have been polled"
+    assert not reads["overlapped"], f"{reads['overlapped']} read(s) overlapped"
+    assert len(reads["threads"]) == 1, reads["threads"]
+    (thread_name,) = reads["threads"]
+    assert thread_name.startswith(f"mqtt_io-module:sensor:{module_name}"), thread_name
+
+
+@given("the mock sensor module uses the board's default I2C bus")  # type: ignore[no-redef]
+def step(context: Any) -> None:
+    patcher = patch.object(mock.Sensor, "EXECUTOR_KEY", BOARD_I2C_EXECUTOR_KEY)
+    patcher.start()
+    context.add_cleanup(patcher.stop)
+
+
+@given("Blinka says that the board's default I2C port is bus {bus_num:d}")  # type: ignore[no-redef]
+def step(context: Any, bus_num: int) -> None:
+    scl, sda = object(), object()
+    patcher = patch.dict(
+        sys.modules,
+        {
+            "board": SimpleNamespace(SCL=scl, SDA=sda),
+            "microcontroller": SimpleNamespace(),
+            "microcontroller.pin": SimpleNamespace(
+                i2cPorts=((0, object(), object()), (bus_num, scl, sda))
+            ),
+        },
+    )
+    patcher.start()
+    board_i2c_executor_key.cache_clear()
+    context.add_cleanup(board_i2c_executor_key.cache_clear)
+    context.add_cleanup(patcher.stop)
+
+
+@then("sensor modules {module_a} and {module_b} {should_shouldnt} share an executor")  # type: ignore[no-redef]
+def step(context: Any, module_a: str, module_b: str, should_shouldnt: str) -> None:
+    assert should_shouldnt in ("should", "shouldn't")
+    mqttio = context.data["mqttio"]
+    shared = (
+        mqttio.sensor_modules[module_a].executor
+        is mqttio.sensor_modules[module_b].executor
+    )
+    if should_shouldnt == "should":
+        assert shared, f"{module_a} and {module_b} should share an executor"
+    else:
+        assert not shared, f"{module_a} and {module_b} shouldn't share an executor"
+
+
+@then("gpio module {gpio_name} and sensor module {sensor_name} shouldn't share an executor")  # type: ignore[no-redef]
+def step(context: Any, gpio_name: str, sensor_name: str) -> None:
+    mqttio = context.data["mqttio"]
+    assert (
+        mqttio.gpio_modules[gpio_name].executor
+        is not mqttio.sensor_modules[sensor_name].executor
+    ), f"{gpio_name} and {sensor_name} shouldn't share an executor"
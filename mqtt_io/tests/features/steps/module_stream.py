@@ -0,0 +1,116 @@
+import asyncio
+import os
+from typing import Any, List
+from unittest.mock import Mock
+
+import yaml  # type: ignore
+from behave import then, when  # type: ignore
+from behave.api.async_step import async_run_until_complete  # type: ignore
+from mqtt_io.events import StreamDataReadEvent
+from mqtt_io.server import MqttIo
+
+# pylint: disable=function-redefined,protected-access
+
+
+@when("we collect StreamDataReadEvents")  # type: ignore[no-redef]
+def step(context: Any) -> None:
+    mqttio: MqttIo = context.data["mqttio"]
+    received: List[StreamDataReadEvent] = []
+    context.data["stream_reads"] = received
+    mqttio.event_bus.subscribe(StreamDataReadEvent, received.append)
+
+
+@when("the mock stream {stream_name} receives the bytes {hex_data}")  # type: ignore[no-redef]
+@async_run_until_complete(loop="loop")
+async def step(context: Any, stream_name: str, hex_data: str) -> None:
+    mqttio: MqttIo = context.data["mqttio"]
+    module = mqttio.stream_modules[stream_name]
+    os.write(module.pipe_in, bytes.fromhex(hex_data))  # type: ignore[attr-defined]
+    # Give the loop a chance to notice
+    await asyncio.sleep(0.01)
+
+
+@when("the mock stream {stream_name} receives {data}")  # type: ignore[no-redef]
+@async_run_until_complete(loop="loop")
+async def step(context: Any, stream_name: str, data: str) -> None:
+    mqttio: MqttIo = context.data["mqttio"]
+    module = mqttio.stream_modules[stream_name]
+    os.write(module.pipe_in, data.encode("utf8"))  # type: ignore[attr-defined]
+    # Give the loop a chance to notice
+    await asyncio.sleep(0.01)
+
+
+@when("the mock stream {stream_name} fails to be read")  # type: ignore[no-redef]
+@async_run_until_complete(loop="loop")
+async def step(context: Any, stream_name: str) -> None:
+    mqttio: MqttIo = context.data["mqttio"]
+    module = mqttio.stream_modules[stream_name]
+    module.read = Mock(side_effect=OSError("Mock read failure"))  # type: ignore[assignment]
+    os.write(module.pipe_in, b"x")  # type: ignore[attr-defined]
+    # Give the loop a chance to notice
+    await asyncio.sleep(0.01)
+
+
+@then(  # type: ignore[no-redef]
+    "stream {stream_name} should be polled every {interval:g} seconds, starting "
+    "{phase:g} seconds after it fell back to polling"
+)
+def step(context: Any, stream_name: str, interval: float, phase: float) -> None:
+    mqttio: MqttIo = context.data["mqttio"]
+    assert stream_name not in mqttio.stream_readers, "Stream should no longer be watched"
+    jobs = [
+        job
+        for job in mqttio.scheduler.jobs
+        if job.name == f"stream poller for {stream_name}"
+    ]
+    assert len(jobs) == 1, f"Should have one poller job, not {len(jobs)}"
+    assert jobs[0].interval == interval, jobs[0].interval
+    assert jobs[0].phase == phase, jobs[0].phase
+
+
+@when("we wait {secs:f} seconds")  # type: ignore[no-redef]
+@async_run_until_complete(loop="loop")
+async def step(context: Any, secs: float) -> None:
+    await asyncio.sleep(secs)
+
+
+@then("stream {stream_name} should have been read as")  # type: ignore[no-redef]
+def step(context: Any, stream_name: str) -> None:
+    expected = [x.encode("utf8") for x in yaml.safe_load(context.text)]
+    reads = [
+        event.data
+        for event in context.data["stream_reads"]
+        if event.stream_name == stream_name
+    ]
+    assert reads == expected, f"Stream was read as {reads}, not {expected}"
+
+
+@then("stream {stream_name} should have been read as the bytes")  # type: ignore[no-redef]
+def step(context: Any, stream_name: str) -> None:
+    expected = [bytes.fromhex(x) for x in yaml.safe_load(context.text)]
+    reads = [
+        event.data
+        for event in context.data["stream_reads"]
+        if event.stream_name == stream_name
+    ]
+    assert reads == expected, f"Stream was read as {reads}, not {expected}"
+
+
+@when("we wait for the stream output loops to handle their queues")  # type: ignore[no-redef]
+@async_run_until_complete(loop="loop")
+async def step(context: Any) -> None:
+    mqttio: MqttIo = context.data["mqttio"]
+    for _ in range(100):
+        if all(queue.empty() for queue in mqttio.stream_output_queues.values()):
+            break
+        await asyncio.sleep(0.01)
+    # Give the executor a chance to run write()
+    await asyncio.sleep(0.1)
+
+
+@then("mock stream {stream_name} should have been written")  # type: ignore[no-redef]
+def step(context: Any, stream_name: str) -> None:
+    expected = [x.encode("utf8") for x in yaml.safe_load(context.text)]
+    module = context.data["mqttio"].stream_modules[stream_name]
+    written = module.written
+    assert written == expected, f"Stream was written {written}, not {expected}"
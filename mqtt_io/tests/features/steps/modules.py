@@ -0,0 +1,43 @@
+from types import ModuleType
+from typing import Any, List
+from unittest.mock import patch
+
+from behave import given, then, when  # type: ignore
+from mqtt_io import modules
+
+# pylint: disable=function-redefined
+
+
+@when("we check whether requirement {requirement} is satisfied")
+def step(context: Any, requirement: str) -> None:
+    context.data["satisfied"] = modules.requirement_satisfied(requirement)
+
+
+@then("the requirement should be {state}")  # type: ignore[no-redef]
+def step(context: Any, state: str) -> None:
+    assert context.data["satisfied"] == (state == "satisfied")
+
+
+@given("modules requiring {requirements}")  # type: ignore[no-redef]
+def step(context: Any, requirements: str) -> None:
+    mods: List[ModuleType] = []
+    for i, reqs in enumerate(requirements.split(" and ")):
+        mod = ModuleType(f"fake_module_{i}")
+        setattr(mod, "REQUIREMENTS", tuple(req.strip() for req in reqs.split(",")))
+        mods.append(mod)
+    context.data["modules"] = mods
+
+
+@when("we install the missing requirements of the modules")  # type: ignore[no-redef]
+def step(context: Any) -> None:
+    with patch("mqtt_io.modules.check_call") as check_call:
+        modules.install_missing_modules_requirements(context.data["modules"])
+    context.data["check_call"] = check_call
+
+
+@then("pip should have been run once to install {requirements}")  # type: ignore[no-redef]
+def step(context: Any, requirements: str) -> None:
+    check_call = context.data["check_call"]
+    assert check_call.call_count == 1, check_call.call_args_list
+    args = check_call.call_args[0][0]
+    assert args[-len(requirements.split(", ")) :] == requirements.split(", "), args
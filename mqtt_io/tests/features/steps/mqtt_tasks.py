@@ -0,0 +1,243 @@
+import asyncio
+import json
+import tempfile
+import time
+from typing import Any, Dict, List
+from unittest.mock import AsyncMock, Mock
+
+import yaml
+from behave import given, then, when  # type: ignore
+from behave.api.async_step import async_run_until_complete  # type: ignore
+from mqtt_io.mqtt import AbstractMQTTClient, MQTTMessageSend
+from mqtt_io.mqtt.outbox import Outbox
+from mqtt_io.mqtt.queue import MQTTSubscribe
+
+# pylint: disable=function-redefined,protected-access
+
+
+@given("the MQTT outbox is stored in a temporary directory")  # type: ignore[no-redef]
+def step(context: Any) -> None:
+    tmpdir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+    context.add_cleanup(tmpdir.cleanup)
+    mqtt_config = context.data["raw_config"].setdefault("mqtt", {})
+    mqtt_config["outbox"] = dict(path=tmpdir.name, replay_rate=1000)
+
+
+@when("we mock _mqtt_publish on MqttIo to take {secs:f} seconds")  # type: ignore[no-redef]
+def step(context: Any, secs: float) -> None:
+    mqttio = context.data["mqttio"]
+    state: Dict[str, Any] = {
+        "running": 0,
+        "max_running": 0,
+        "published": {},
+        "messages": [],
+    }
+    context.data["mqtt_publishes"] = state
+
+    async def mqtt_publish(msg: MQTTMessageSend, wait: bool = True) -> None:
+        state["running"] += 1
+        state["max_running"] = max(state["max_running"], state["running"])
+        await asyncio.sleep(secs)
+        state["running"] -= 1
+        published: List[bytes] = state["published"].setdefault(msg.topic, [])
+        published.append(msg.payload)
+        state["messages"].append(msg)
+
+    mqttio._mqtt_publish = mqtt_publish
+
+
+@when("we queue MQTT messages on topic {topic} with payloads")  # type: ignore[no-redef]
+def step(context: Any, topic: str) -> None:
+    mqttio = context.data["mqttio"]
+    for payload in yaml.safe_load(context.text):
+        mqttio._queue_mqtt_publish(MQTTMessageSend(topic, str(payload).encode("utf8")))
+
+
+@when(  # type: ignore[no-redef]
+    "we queue an MQTT message on topic {topic} with user properties {props}"
+)
+def step(context: Any, topic: str, props: str) -> None:
+    mqttio = context.data["mqttio"]
+    user_properties = [tuple(prop) for prop in yaml.safe_load(props)]
+    mqttio._queue_mqtt_publish(
+        MQTTMessageSend(topic, b"1", user_properties=user_properties)
+    )
+
+
+@when("we run the MQTT task loop for {secs:f} seconds")  # type: ignore[no-redef]
+@async_run_until_complete(loop="loop")
+async def step(context: Any, secs: float) -> None:
+    mqttio = context.data["mqttio"]
+    mqttio.mqtt_connected.set()
+    tasks = [
+        asyncio.ensure_future(mqttio._mqtt_task_loop()),
+        asyncio.ensure_future(mqttio._mqtt_outbox_replay_loop()),
+    ]
+    await asyncio.sleep(secs)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@then("the MQTT messages on topic {topic} should have been published with payloads")  # type: ignore[no-redef]
+def step(context: Any, topic: str) -> None:
+    expected = [str(payload).encode("utf8") for payload in yaml.safe_load(context.text)]
+    published = context.data["mqtt_publishes"]["published"].get(topic, [])
+    assert published == expected, f"Published {published} instead of {expected}"
+
+
+@then(  # type: ignore[no-redef]
+    "the MQTT message on topic {topic} should have been published with user "
+    "properties {props}"
+)
+def step(context: Any, topic: str, props: str) -> None:
+    expected = [tuple(prop) for prop in yaml.safe_load(props)]
+    messages = [
+        msg for msg in context.data["mqtt_publishes"]["messages"] if msg.topic == topic
+    ]
+    assert len(messages) == 1, messages
+    assert messages[0].user_properties == expected, messages[0]
+
+
+@then("{count:d} MQTT messages should have been publishing at once")  # type: ignore[no-redef]
+def step(context: Any, count: int) -> None:
+    max_running = context.data["mqtt_publishes"]["max_running"]
+    assert (
+        max_running == count
+    ), f"{max_running} MQTT messages were publishing at once instead of {count}"
+
+
+@when("MqttIo is {state} MQTT")  # type: ignore[no-redef]
+def step(context: Any, state: str) -> None:
+    assert state in ("connected to", "disconnected from")
+    mqttio = context.data["mqttio"]
+    if state == "connected to":
+        mqttio.mqtt_connected.set()
+    else:
+        mqttio.mqtt_connected.clear()
+
+
+@when(  # type: ignore[no-redef]
+    "a message on topic {topic} with payload {payload} is queued while the MQTT outbox "
+    "reads its message with payload {last}"
+)
+def step(context: Any, topic: str, payload: str, last: str) -> None:
+    mqttio = context.data["mqttio"]
+    peek = mqttio.outbox.peek
+
+    def slow_peek() -> Any:
+        record = peek()
+        if record is not None and record.msg.payload == last.encode("utf8"):
+            # Arrives before the replay loop gets the record back from the executor
+            mqttio.loop.call_soon_threadsafe(
+                mqttio._queue_mqtt_publish,
+                MQTTMessageSend(topic, payload.encode("utf8")),
+            )
+        return record
+
+    mqttio.outbox.peek = slow_peek
+
+
+@when("we shut down MqttIo")  # type: ignore[no-redef]
+@async_run_until_complete(loop="loop")
+async def step(context: Any) -> None:
+    mqttio = context.data["mqttio"]
+    context.data["shutdown_time"] = time.time()
+    await mqttio.shutdown()
+
+
+@then(  # type: ignore[no-redef]
+    "the MQTT outbox should contain messages on topic {topic} from before shutting "
+    "down with payloads"
+)
+def step(context: Any, topic: str) -> None:
+    expected = [str(payload).encode("utf8") for payload in yaml.safe_load(context.text)]
+    outbox_conf = context.data["mqttio"].config["mqtt"]["outbox"]
+    outbox = Outbox(
+        outbox_conf["path"], outbox_conf["max_size"], outbox_conf["segment_size"]
+    )
+    records = []
+    while True:
+        record = outbox.peek()
+        if record is None:
+            break
+        outbox.commit()
+        records.append(record)
+    outbox.close()
+    payloads = [record.msg.payload for record in records if record.msg.topic == topic]
+    assert payloads == expected, f"Outbox contains {payloads} instead of {expected}"
+    for record in records:
+        assert record.timestamp < context.data["shutdown_time"], record
+
+
+@then("the MQTT outbox should be {state}")  # type: ignore[no-redef]
+def step(context: Any, state: str) -> None:
+    assert state in ("empty", "not empty")
+    empty = context.data["mqttio"].outbox.empty()
+    assert empty == (state == "empty"), f"MQTT outbox should be {state}"
+
+
+@then("a single MQTT subscription should be queued for topics")  # type: ignore[no-redef]
+def step(context: Any) -> None:
+    mqttio = context.data["mqttio"]
+    prefix = mqttio.config["mqtt"]["topic_prefix"]
+    expected = ["/".join((prefix, topic)) for topic in yaml.safe_load(context.text)]
+    queue = mqttio.mqtt_task_queue
+    subs = []
+    while not queue.empty():
+        request = queue.get_nowait().request
+        if isinstance(request, MQTTSubscribe):
+            subs.append(request.topics)
+    assert subs == [expected], f"Subscriptions {subs} were queued instead of {expected}"
+
+
+@then("the MQTT message queued on topic {topic} should have its timestamp in {where}")  # type: ignore[no-redef]
+def step(context: Any, topic: str, where: str) -> None:
+    mqttio = context.data["mqttio"]
+    topic = "/".join((mqttio.config["mqtt"]["topic_prefix"], topic))
+    msgs: List[MQTTMessageSend] = []
+    while not mqttio.mqtt_task_queue.empty():
+        request = mqttio.mqtt_task_queue.get_nowait().request
+        if isinstance(request, MQTTMessageSend) and request.topic == topic:
+            msgs.append(request)
+    assert len(msgs) == 1, msgs
+    msg = msgs[0]
+    assert msg.payload is not None
+    if where == "its JSON payload":
+        data = json.loads(msg.payload)
+        assert data["value"] == yaml.safe_load(context.text), data
+        timestamps = (data["timestamp"], data["monotonic"])
+    else:
+        assert where == "its user properties", where
+        assert msg.payload == str(context.text).encode("utf8"), msg.payload
+        props = dict(msg.user_properties or [])
+        timestamps = (float(props["timestamp"]), float(props["monotonic"]))
+    wall, monotonic = timestamps
+    assert 0 <= time.time() - wall < 5, wall
+    assert 0 <= time.monotonic() - monotonic < 5, monotonic
+
+
+@when("we publish a message with user properties using the configured MQTT client")  # type: ignore[no-redef]
+@async_run_until_complete(loop="loop")
+async def step(context: Any) -> None:
+    mqttio = context.data["mqttio"]
+    client = AbstractMQTTClient.get_implementation(
+        mqttio.config["mqtt"]["client_module"]
+    )(mqttio.mqtt_client_options)
+    # Stand in for the underlying library's client, so that we can see what it's given
+    client._client = Mock(publish=AsyncMock())
+    await client.publish(
+        MQTTMessageSend("test", b"1", user_properties=[("timestamp", "123.5")])
+    )
+    context.data["library_publish"] = client._client.publish
+
+
+@then("the MQTT library should have been asked to publish with user properties {props}")  # type: ignore[no-redef]
+def step(context: Any, props: str) -> None:
+    properties = context.data["library_publish"].call_args.kwargs["properties"]
+    if props == "none":
+        assert properties is None, properties
+    else:
+        assert properties is not None
+        expected = [tuple(prop) for prop in yaml.safe_load(props)]
+        assert properties.UserProperty == expected, properties
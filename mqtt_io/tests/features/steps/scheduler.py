@@ -0,0 +1,75 @@
+import asyncio
+from typing import Any
+
+from behave import given, then, when  # type: ignore
+from behave.api.async_step import async_run_until_complete  # type: ignore
+from mqtt_io.scheduler import Job, Scheduler
+
+# pylint: disable=function-redefined
+
+
+def get_job(context: Any, name: str) -> Job:
+    """
+    Get a job from the scheduler by its name.
+    """
+    scheduler: Scheduler = context.data["scheduler"]
+    return next(job for job in scheduler.jobs if job.name == name)
+
+
+@given("a scheduler")  # type: ignore[no-redef]
+def step(context: Any) -> None:
+    context.data["scheduler"] = Scheduler(context.loop)
+
+
+@when(  # type: ignore[no-redef]
+    "we add a job named {name} with an interval of {interval:f} seconds "
+    "which takes {duration:f} seconds"
+)
+def step(context: Any, name: str, interval: float, duration: float) -> None:
+    scheduler: Scheduler = context.data["scheduler"]
+
+    async def callback() -> None:
+        await asyncio.sleep(duration)
+
+    scheduler.add_job(name, interval, callback)
+
+
+@when(  # type: ignore[no-redef]
+    "we add a job named {name} with an interval of {interval:f} seconds "
+    "and a phase of {phase:f} seconds"
+)
+def step(context: Any, name: str, interval: float, phase: float) -> None:
+    scheduler: Scheduler = context.data["scheduler"]
+
+    async def callback() -> None:
+        pass
+
+    scheduler.add_job(name, interval, callback, phase=phase)
+
+
+@when("we run the scheduler for {secs:f} seconds")  # type: ignore[no-redef]
+@async_run_until_complete(loop="loop")
+async def step(context: Any, secs: float) -> None:
+    scheduler: Scheduler = context.data["scheduler"]
+    await asyncio.sleep(secs)
+    await scheduler.stop()
+
+
+@then(  # type: ignore[no-redef]
+    "job {name} should have run between {minimum:d} and {maximum:d} times"
+)
+def step(context: Any, name: str, minimum: int, maximum: int) -> None:
+    job = get_job(context, name)
+    assert minimum <= job.runs <= maximum, f"Job ran {job.runs} time(s)"
+
+
+@then("job {name} should have {count:d} overruns")  # type: ignore[no-redef]
+def step(context: Any, name: str, count: int) -> None:
+    job = get_job(context, name)
+    assert job.overruns == count, f"Job had {job.overruns} overrun(s)"
+
+
+@then("job {name} should have some overruns")  # type: ignore[no-redef]
+def step(context: Any, name: str) -> None:
+    job = get_job(context, name)
+    assert job.overruns > 0, "Job should have had some overruns"
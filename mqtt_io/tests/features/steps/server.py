@@ -1,4 +1,5 @@
 import asyncio
+import time
 from inspect import iscoroutinefunction
 from typing import Any, Union
 from unittest.mock import Mock
@@ -15,7 +16,7 @@ try:
 except ImportError:
     from mock import AsyncMock  # type: ignore
 
-# pylint: disable=function-redefined
+# pylint: disable=function-redefined,protected-access
 
 
 @when("we instantiate MqttIo")  # type: ignore[no-redef]
@@ -23,6 +24,31 @@ def step(context: Any) -> None:
     context.data["mqttio"] = MqttIo(context.data["config"], loop=context.data["loop"])
 
 
+@when("we initialise MqttIo alongside connecting to MQTT")  # type: ignore[no-redef]
+@async_run_until_complete(loop="loop")
+async def step(context: Any) -> None:
+    mqttio: MqttIo = context.data["mqttio"]
+    start = time.monotonic()
+    await mqttio._initialise()
+    context.data["init_secs"] = time.monotonic() - start
+
+
+@then("MqttIo should have been initialised within {secs:f} seconds")  # type: ignore[no-redef]
+def step(context: Any, secs: float) -> None:
+    assert context.data["mqttio"].initialised, "MqttIo should be initialised"
+    init_secs = context.data["init_secs"]
+    assert init_secs < secs, f"Initialising took {init_secs} seconds"
+
+
+@then(  # type: ignore[no-redef]
+    "MqttIo should have taken at least {secs:f} seconds to initialise"
+)
+def step(context: Any, secs: float) -> None:
+    assert context.data["mqttio"].initialised, "MqttIo should be initialised"
+    init_secs = context.data["init_secs"]
+    assert init_secs >= secs, f"Initialising took {init_secs} seconds"
+
+
 @when("we initialise {target}")  # type: ignore[no-redef]
 def step(context: Any, target: str) -> None:
     target = target.lower().replace(" ", "_")
@@ -40,6 +66,14 @@ def step(context: Any, method_name: str) -> None:
     setattr(mqttio, method_name, mock)
 
 
+@when("we receive an MQTT message on topic {topic} with payload {payload}")  # type: ignore[no-redef]
+@async_run_until_complete(loop="loop")
+async def step(context: Any, topic: str, payload: str) -> None:
+    mqttio: MqttIo = context.data["mqttio"]
+    topic = "/".join((mqttio.config["mqtt"]["topic_prefix"], topic))
+    await mqttio._handle_mqtt_msg(topic, payload.encode("utf8"))
+
+
 @when("we {lock_unlock} interrupt lock for {pin_name}")  # type: ignore[no-redef]
 def step(context: Any, lock_unlock: str, pin_name: str) -> None:
     assert lock_unlock in ("lock", "unlock")
@@ -85,9 +119,17 @@ def step(context: Any, method_name: str):
 
 
 @then("_mqtt_publish on MqttIo should be called with MQTT message")  # type: ignore[no-redef]
-def step(context: Any):
+@async_run_until_complete(loop="loop")
+async def step(context: Any):
+    mqttio: MqttIo = context.data["mqttio"]
     mock: Union[Mock, AsyncMock] = context.data["mocks"]["mqttio._mqtt_publish"]
     data = yaml.safe_load(context.text)
+    # Messages are queued for the MQTT task loop to publish, so publish any that are
+    # still waiting in the queue.
+    while not mqttio.mqtt_task_queue.empty():
+        entry = mqttio.mqtt_task_queue.get_nowait()
+        if isinstance(entry.request, MQTTMessageSend):
+            await mqttio._mqtt_publish(entry.request)
     assert mock.called, "_mqtt_publish should have been called"
     msg: MQTTMessageSend = mock.call_args.args[0]
     assert isinstance(msg, MQTTMessageSend), "Should have been called with an MQTTMessage"
@@ -2,28 +2,53 @@
 Utils for MQTT IO project.
 """
 import asyncio
-from typing import Any, Coroutine, List, Optional, cast
+import logging
+from typing import Any, Coroutine, Iterator, Optional, Set
 
+_LOG = logging.getLogger(__name__)
 
-class PriorityCoro:
+
+class TaskSet:
     """
-    An object for adding a coroutine to an asyncio.PriorityQueue.
+    Keeps hold of tasks which are left to run in the background, so that they aren't
+    garbage collected before they finish, and can be cancelled on shutdown. Tasks are
+    forgotten as soon as they finish, and any exception they raised is logged then.
     """
 
-    def __init__(self, coro: Coroutine[Any, Any, Any], priority: int):
-        self.coro = coro
-        self.priority = priority
+    def __init__(self) -> None:
+        self._tasks: Set["asyncio.Task[Any]"] = set()
+        self.started = 0
+        self.finished = 0
+        self.failed = 0
+
+    def add(self, task: "asyncio.Task[Any]") -> None:
+        """
+        Keep track of a task until it's done.
+        """
+        self._tasks.add(task)
+        self.started += 1
+        task.add_done_callback(self._task_done)
+
+    def _task_done(self, task: "asyncio.Task[Any]") -> None:
+        self._tasks.discard(task)
+        self.finished += 1
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc is not None:
+            self.failed += 1
+            _LOG.error("Exception in task: %r:", task, exc_info=exc)
 
-    def __lt__(self, other: Any) -> bool:
-        return cast(bool, self.priority < other.priority)
+    def __len__(self) -> int:
+        return len(self._tasks)
 
-    def __eq__(self, other: Any) -> bool:
-        return cast(bool, self.priority == other.priority)
+    def __iter__(self) -> Iterator["asyncio.Task[Any]"]:
+        return iter(list(self._tasks))
 
 
 def create_unawaited_task_threadsafe(
     loop: asyncio.AbstractEventLoop,
-    transient_tasks: List["asyncio.Task[Any]"],
+    transient_tasks: TaskSet,
     coro: Coroutine[Any, Any, None],
     task_future: Optional["asyncio.Future[asyncio.Task[Any]]"] = None,
 ) -> None:
@@ -33,7 +58,7 @@ def create_unawaited_task_threadsafe(
 
     def callback() -> None:
         task = loop.create_task(coro)
-        transient_tasks.append(task)
+        transient_tasks.add(task)
         if task_future is not None:
             task_future.set_result(task)
 